@@ -9,9 +9,11 @@ import com.lynxanalytics.biggraph.BigGraphEnvironment
 import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_operations._
 import com.lynxanalytics.biggraph.graph_util.HadoopFile
+import com.lynxanalytics.biggraph.graph_util.LoggedEnvironment
 import com.lynxanalytics.biggraph.graph_util.Timestamp
 import com.lynxanalytics.biggraph.spark_util.SQLHelper
 import com.lynxanalytics.biggraph.serving
+import com.lynxanalytics.biggraph.{ bigGraphLogger => log }
 import org.apache.spark.sql.SQLContext
 import play.api.libs.json
 
@@ -309,6 +311,46 @@ class SQLController(val env: BigGraphEnvironment, ops: OperationRepository) {
       data = tableContents.rows)
   }
 
+  // Exports the whole table into a single Parquet file that can be downloaded with downloadFile.
+  // The file is named after the table, so downloading the same table again reuses the export
+  // instead of writing a new file every time. Exports that have not been downloaded for
+  // KITE_DOWNLOAD_EXPORT_MAX_AGE_HOURS are deleted.
+  def exportTableForDownload(user: serving.User, table: Table): serving.DownloadFileRequest = {
+    assert(!user.wizardOnly, s"User ${user.email} is restricted to using wizards.")
+    val file = downloadExportsDir / s"download-${table.gUID}.parquet"
+    deleteOldDownloadExports(except = file)
+    def exportFile(version: Long): Unit = {
+      val op = ExportTableToStructuredFile(
+        path = file.symbolicName,
+        format = "parquet",
+        version = version,
+        saveMode = "overwrite",
+        forDownload = true)
+      dataManager.get(op(op.t, table).result.exportResult)
+    }
+    exportFile(version = 0)
+    // The export operation is cached, but the file may have been deleted since.
+    if (!(file / "_SUCCESS").exists) exportFile(version = Timestamp.toLong)
+    // The age of the export counts from the last download.
+    file.fs.setTimes(file.path, System.currentTimeMillis, -1)
+    serving.DownloadFileRequest(file.symbolicName, stripHeaders = false)
+  }
+
+  private def downloadExportsDir = HadoopFile("DATA$/exports")
+  private val downloadExportMaxAgeMillis =
+    LoggedEnvironment.envOrElse("KITE_DOWNLOAD_EXPORT_MAX_AGE_HOURS", "24").toDouble * 3600000
+
+  private def deleteOldDownloadExports(except: HadoopFile): Unit = synchronized {
+    val now = System.currentTimeMillis
+    for (f <- (downloadExportsDir / "download-*").list if f.symbolicName != except.symbolicName) {
+      val age = now - f.fs.getFileStatus(f.path).getModificationTime
+      if (age > downloadExportMaxAgeMillis) {
+        log.info(s"Deleting ${f.symbolicName}, it was last downloaded $age ms ago.")
+        f.delete()
+      }
+    }
+  }
+
   def exportSQLQueryToCSV(
     user: serving.User, request: SQLExportToCSVRequest) = async[SQLExportToFileResult] {
     assert(!user.wizardOnly, s"User ${user.email} is restricted to using wizards.")
@@ -110,16 +110,28 @@ class BuildSegmentationOperations(env: SparkFreeEnvironment) extends ProjectOper
       Choice(
         "directions",
         "Edge direction",
-        options = FEOption.list("ignore directions", "require both directions")))
+        options = FEOption.list("ignore directions", "require both directions", "follow directions")),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = project.hasEdgeBundle
     def apply() = {
       val directions = params("directions")
-      val symmetric = directions match {
-        case "ignore directions" => project.edgeBundle.addReversed
-        case "require both directions" => project.edgeBundle.makeSymmetric
+      val result = directions match {
+        case "follow directions" =>
+          val op = graph_operations.StronglyConnectedComponents()
+          op(op.es, project.edgeBundle).result
+        case _ =>
+          val symmetric = directions match {
+            case "ignore directions" => project.edgeBundle.addReversed
+            case "require both directions" => project.edgeBundle.makeSymmetric
+          }
+          if (params("sphynx") == "yes") {
+            val op = graph_operations.SphynxConnectedComponents()
+            op(op.es, symmetric).result
+          } else {
+            val op = graph_operations.ConnectedComponents()
+            op(op.es, symmetric).result
+          }
       }
-      val op = graph_operations.ConnectedComponents()
-      val result = op(op.es, symmetric).result
       val segmentation = project.segmentation(params("name"))
       segmentation.setVertexSet(result.segments, idAttr = "id")
       segmentation.notes = s"Find connected components (edges: $directions)"
@@ -255,6 +267,45 @@ class BuildSegmentationOperations(env: SparkFreeEnvironment) extends ProjectOper
     }
   })
 
+  register("Find Louvain clustering")(new ProjectTransformation(_) {
+    params ++= List(
+      Param("name", "Segmentation name", defaultValue = "louvain_clusters"),
+      Choice("weights", "Weight attribute", options =
+        FEOption.noWeight +: project.edgeAttrList[Double]),
+      Param(
+        "max_iterations",
+        "Maximum number of levels",
+        defaultValue = "-1"),
+      Param(
+        "min_increment_per_iteration",
+        "Minimal modularity increment in a level to keep going",
+        defaultValue = "0.0001"),
+      RandomSeed("seed", "Seed", context.box))
+    def enabled = project.hasEdgeBundle
+    def apply() = {
+      val edgeBundle = project.edgeBundle
+      val weightsName = params("weights")
+      val weights =
+        if (weightsName == FEOption.noWeight.id) edgeBundle.const(1.0)
+        else project.edgeAttributes(weightsName).runtimeSafeCast[Double]
+      val result = {
+        val op = graph_operations.LouvainClustering(
+          params("max_iterations").toInt,
+          params("min_increment_per_iteration").toDouble,
+          params("seed").toInt)
+        op(op.es, edgeBundle)(op.weights, weights).result
+      }
+      val segmentation = project.segmentation(params("name"))
+      segmentation.setVertexSet(result.clusters, idAttr = "id")
+      segmentation.notes =
+        if (weightsName == FEOption.noWeight.id) "Louvain clustering"
+        else s"Louvain clustering by $weightsName"
+      segmentation.belongsTo = result.belongsTo
+      segmentation.newVertexAttribute("size", computeSegmentSizes(segmentation))
+      segmentation.scalars("modularity") = result.modularity
+    }
+  })
+
   register("Find triangles")(new ProjectTransformation(_) {
     params ++= List(
       Param("name", "Segmentation name", defaultValue = "triangles"),
@@ -426,7 +477,8 @@ class BuildSegmentationOperations(env: SparkFreeEnvironment) extends ProjectOper
       Param("name", "Segmentation name", defaultValue = "bucketing"),
       Choice("attr", "Attribute", options = project.vertexAttrList[Double]),
       NonNegDouble("interval_size", "Interval size"),
-      Choice("overlap", "Overlap", options = FEOption.noyes))
+      Choice("overlap", "Overlap", options = FEOption.noyes),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = FEStatus.assert(
       project.vertexAttrList[Double].nonEmpty, "No numeric vertex attributes.")
     override def summary = {
@@ -441,10 +493,14 @@ class BuildSegmentationOperations(env: SparkFreeEnvironment) extends ProjectOper
       val attr = project.vertexAttributes(attrName).runtimeSafeCast[Double]
       val overlap = params("overlap") == "yes"
       val intervalSize = params("interval_size").toDouble
-      val bucketing = {
-        val op = graph_operations.DoubleBucketing(intervalSize, overlap)
-        op(op.attr, attr).result
-      }
+      val bucketing =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxDoubleBucketing(intervalSize, overlap)
+          op(op.attr, attr).result
+        } else {
+          val op = graph_operations.DoubleBucketing(intervalSize, overlap)
+          op(op.attr, attr).result
+        }
       val segmentation = project.segmentation(params("name"))
       segmentation.setVertexSet(bucketing.segments, idAttr = "id")
       segmentation.notes = summary
@@ -564,7 +620,8 @@ class BuildSegmentationOperations(env: SparkFreeEnvironment) extends ProjectOper
       Choice("begin_attr", "Begin attribute", options = project.vertexAttrList[Double]),
       Choice("end_attr", "End attribute", options = project.vertexAttrList[Double]),
       NonNegDouble("interval_size", "Interval size"),
-      Choice("overlap", "Overlap", options = FEOption.noyes))
+      Choice("overlap", "Overlap", options = FEOption.noyes),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = FEStatus.assert(
       project.vertexAttrList[Double].size >= 2,
       "Less than two numeric vertex attributes.")
@@ -583,10 +640,14 @@ class BuildSegmentationOperations(env: SparkFreeEnvironment) extends ProjectOper
       val endAttr = project.vertexAttributes(endAttrName).runtimeSafeCast[Double]
       val overlap = params("overlap") == "yes"
       val intervalSize = params("interval_size").toDouble
-      val bucketing = {
-        val op = graph_operations.IntervalBucketing(intervalSize, overlap)
-        op(op.beginAttr, beginAttr)(op.endAttr, endAttr).result
-      }
+      val bucketing =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxIntervalBucketing(intervalSize, overlap)
+          op(op.beginAttr, beginAttr)(op.endAttr, endAttr).result
+        } else {
+          val op = graph_operations.IntervalBucketing(intervalSize, overlap)
+          op(op.beginAttr, beginAttr)(op.endAttr, endAttr).result
+        }
       val segmentation = project.segmentation(params("name"))
       segmentation.setVertexSet(bucketing.segments, idAttr = "id")
       segmentation.notes = summary
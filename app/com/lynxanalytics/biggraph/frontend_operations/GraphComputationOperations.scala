@@ -64,13 +64,21 @@ class GraphComputationOperations(env: SparkFreeEnvironment) extends ProjectOpera
   })
 
   register("Compute clustering coefficient")(new ProjectTransformation(_) {
-    params += Param("name", "Attribute name", defaultValue = "clustering_coefficient")
+    params ++= List(
+      Param("name", "Attribute name", defaultValue = "clustering_coefficient"),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = project.hasEdgeBundle
     def apply() = {
       assert(params("name").nonEmpty, "Please set an attribute name.")
-      val op = graph_operations.ClusteringCoefficient()
-      project.newVertexAttribute(
-        params("name"), op(op.es, project.edgeBundle).result.clustering, help)
+      val clustering =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxClusteringCoefficient()
+          op(op.es, project.edgeBundle).result.clustering
+        } else {
+          val op = graph_operations.ClusteringCoefficient()
+          op(op.es, project.edgeBundle).result.clustering
+        }
+      project.newVertexAttribute(params("name"), clustering, help)
     }
   })
 
@@ -113,11 +121,30 @@ class GraphComputationOperations(env: SparkFreeEnvironment) extends ProjectOpera
   })
 
   register("Compute embeddedness")(new ProjectTransformation(_) {
-    params += Param("name", "Attribute name", defaultValue = "embeddedness")
+    params ++= List(
+      Param("name", "Attribute name", defaultValue = "embeddedness"),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = project.hasEdgeBundle
     def apply() = {
-      val op = graph_operations.Embeddedness()
-      project.newEdgeAttribute(params("name"), op(op.es, project.edgeBundle).result.embeddedness, help)
+      val embeddedness =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxEmbeddedness()
+          op(op.es, project.edgeBundle).result.embeddedness
+        } else {
+          val op = graph_operations.Embeddedness()
+          op(op.es, project.edgeBundle).result.embeddedness
+        }
+      project.newEdgeAttribute(params("name"), embeddedness, help)
+    }
+  })
+
+  register("Compute triangle count")(new ProjectTransformation(_) {
+    params += Param("name", "Attribute name", defaultValue = "triangles")
+    def enabled = project.hasEdgeBundle
+    def apply() = {
+      assert(params("name").nonEmpty, "Please set an attribute name.")
+      val op = graph_operations.TriangleCount()
+      project.newVertexAttribute(params("name"), op(op.es, project.edgeBundle).result.triangles, help)
     }
   })
 
@@ -184,6 +211,61 @@ class GraphComputationOperations(env: SparkFreeEnvironment) extends ProjectOpera
     }
   })
 
+  register("Compute personalized PageRank")(new ProjectTransformation(_) {
+    params ++= List(
+      Param("name", "Attribute name", defaultValue = "personalized_page_rank"),
+      Choice("weights", "Weight attribute",
+        options = FEOption.noWeight +: project.edgeAttrList[Double]),
+      Choice("personalization", "Personalization attribute", options = project.vertexAttrList[Double]),
+      NonNegInt("iterations", "Maximum number of iterations", default = 100),
+      NonNegDouble("tolerance", "Tolerance", defaultValue = "0.000001"),
+      Ratio("damping", "Damping factor", defaultValue = "0.85"),
+      Choice("direction", "Direction",
+        options = Direction.attrOptionsWithDefault("outgoing edges")))
+    def enabled = project.hasEdgeBundle && FEStatus.assert(
+      project.vertexAttrList[Double].nonEmpty, "No numeric vertex attributes.")
+    def apply() = {
+      assert(params("name").nonEmpty, "Please set an attribute name.")
+      val op = graph_operations.PersonalizedPageRank(
+        params("damping").toDouble, params("iterations").toInt, params("tolerance").toDouble)
+      val direction = Direction(
+        params("direction"),
+        project.edgeBundle, reversed = true)
+      val es = direction.edgeBundle
+      val weights =
+        if (params("weights") == FEOption.noWeight.id) es.const(1.0)
+        else direction.pull(project.edgeAttributes(params("weights"))).runtimeSafeCast[Double]
+      val personalization = project.vertexAttributes(params("personalization")).runtimeSafeCast[Double]
+      project.newVertexAttribute(
+        params("name"),
+        op(op.es, es)(op.weights, weights)(op.personalization, personalization).result.pagerank,
+        help)
+    }
+  })
+
+  register("Compute hub and authority scores")(new ProjectTransformation(_) {
+    params ++= List(
+      Param("hub_name", "Hub attribute name", defaultValue = "hub"),
+      Param("authority_name", "Authority attribute name", defaultValue = "authority"),
+      Choice("weights", "Weight attribute",
+        options = FEOption.noWeight +: project.edgeAttrList[Double]),
+      NonNegInt("iterations", "Maximum number of iterations", default = 100),
+      NonNegDouble("tolerance", "Tolerance", defaultValue = "0.000001"))
+    def enabled = project.hasEdgeBundle
+    def apply() = {
+      assert(params("hub_name").nonEmpty, "Please set a hub attribute name.")
+      assert(params("authority_name").nonEmpty, "Please set an authority attribute name.")
+      val op = graph_operations.HITS(params("iterations").toInt, params("tolerance").toDouble)
+      val es = project.edgeBundle
+      val weights =
+        if (params("weights") == FEOption.noWeight.id) es.const(1.0)
+        else project.edgeAttributes(params("weights")).runtimeSafeCast[Double]
+      val result = op(op.es, es)(op.weights, weights).result
+      project.newVertexAttribute(params("hub_name"), result.hub, help)
+      project.newVertexAttribute(params("authority_name"), result.authority, help)
+    }
+  })
+
   register("Find Steiner tree")(new ProjectTransformation(_) {
     params ++= List(
       Param("ename", "Output edge attribute name", defaultValue = "arc"),
@@ -232,7 +314,8 @@ class GraphComputationOperations(env: SparkFreeEnvironment) extends ProjectOpera
       Choice(
         "starting_distance", "Starting distance attribute",
         options = project.vertexAttrList[Double]),
-      NonNegInt("iterations", "Maximum number of iterations", default = 10))
+      NonNegInt("iterations", "Maximum number of iterations", default = 10),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = project.hasEdgeBundle
     def apply() = {
       assert(params("name").nonEmpty, "Please set an attribute name.")
@@ -240,16 +323,21 @@ class GraphComputationOperations(env: SparkFreeEnvironment) extends ProjectOpera
       val startingDistance = project
         .vertexAttributes(startingDistanceAttr)
         .runtimeSafeCast[Double]
-      val op = graph_operations.ShortestPath(params("iterations").toInt)
       val edgeDistance =
         if (params("edge_distance") == FEOption.unitDistances.id) {
           project.edgeBundle.const(1.0)
         } else {
           project.edgeAttributes(params("edge_distance")).runtimeSafeCast[Double]
         }
-      project.newVertexAttribute(
-        params("name"),
-        op(op.es, project.edgeBundle)(op.edgeDistance, edgeDistance)(op.startingDistance, startingDistance).result.distance, help)
+      val distance =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxShortestPath(params("iterations").toInt)
+          op(op.es, project.edgeBundle)(op.edgeDistance, edgeDistance)(op.startingDistance, startingDistance).result.distance
+        } else {
+          val op = graph_operations.ShortestPath(params("iterations").toInt)
+          op(op.es, project.edgeBundle)(op.edgeDistance, edgeDistance)(op.startingDistance, startingDistance).result.distance
+        }
+      project.newVertexAttribute(params("name"), distance, help)
     }
   })
 
@@ -130,11 +130,17 @@ class StructureOperations(env: SparkFreeEnvironment) extends ProjectOperations(e
   })
 
   register("Replace edges with triadic closure")(new ProjectTransformation(_) {
+    params += Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes)
     def enabled = project.hasEdgeBundle
     def apply() = {
-      val op = graph_operations.ConcatenateBundlesMulti()
-      val result = op(op.edgesAB, project.edgeBundle)(
-        op.edgesBC, project.edgeBundle).result
+      val result =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxConcatenateBundlesMulti()
+          op(op.edgesAB, project.edgeBundle)(op.edgesBC, project.edgeBundle).result
+        } else {
+          val op = graph_operations.ConcatenateBundlesMulti()
+          op(op.edgesAB, project.edgeBundle)(op.edgesBC, project.edgeBundle).result
+        }
 
       // saving attributes and original edges
       val origEdgeAttrs = project.edgeAttributes.toIndexedSeq
@@ -19,7 +19,8 @@ class SubgraphOperations(env: SparkFreeEnvironment) extends ProjectOperations(en
       Ratio("ratio", "Fraction of vertices to use as starting points", defaultValue = "0.0001"),
       NonNegInt("radius", "Radius", default = 3),
       Param("attrName", "Attribute name", defaultValue = "distance_from_start_point"),
-      RandomSeed("seed", "Seed", context.box))
+      RandomSeed("seed", "Seed", context.box),
+      Choice("sphynx", "Compute on Sphynx", options = FEOption.noyes))
     def enabled = project.hasEdgeBundle
     def apply() = {
       val ratio = params("ratio")
@@ -36,13 +37,20 @@ class SubgraphOperations(env: SparkFreeEnvironment) extends ProjectOperations(en
       val edgeLength = project.edgeBundle.const(1.0)
 
       // Running shortest path from vertices with attribute startingDistance.
-      val distance = {
-        val op = graph_operations.ShortestPath(params("radius").toInt)
-        op(op.vs, project.vertexSet)(
-          op.es, project.edgeBundle)(
-            op.edgeDistance, edgeLength)(
-              op.startingDistance, startingDistance).result.distance
-      }
+      val distance =
+        if (params("sphynx") == "yes") {
+          val op = graph_operations.SphynxShortestPath(params("radius").toInt)
+          op(op.vs, project.vertexSet)(
+            op.es, project.edgeBundle)(
+              op.edgeDistance, edgeLength)(
+                op.startingDistance, startingDistance).result.distance
+        } else {
+          val op = graph_operations.ShortestPath(params("radius").toInt)
+          op(op.vs, project.vertexSet)(
+            op.es, project.edgeBundle)(
+              op.edgeDistance, edgeLength)(
+                op.startingDistance, startingDistance).result.distance
+        }
       project.newVertexAttribute(params("attrName"), distance)
 
       // Filtering on distance attribute.
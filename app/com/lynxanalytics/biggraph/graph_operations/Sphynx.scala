@@ -234,3 +234,197 @@ case class OneHotEncoder(categories: Seq[String]) extends TypedMetaGraphOp[OneHo
   override def toJson = Json.obj(
     "categories" -> categories)
 }
+
+object PersonalizedPageRank extends OpFromJson {
+  class Input extends MagicInputSignature {
+    val (vs, es) = graph
+    val weights = edgeAttribute[Double](es)
+    val personalization = vertexAttribute[Double](vs)
+  }
+  class Output(implicit
+      instance: MetaGraphOperationInstance,
+      inputs: Input) extends MagicOutput(instance) {
+    val pagerank = vertexAttribute[Double](inputs.vs.entity)
+  }
+  def fromJson(j: JsValue) = PersonalizedPageRank(
+    (j \ "dampingFactor").as[Double],
+    (j \ "maxIterations").as[Int],
+    (j \ "tolerance").as[Double])
+}
+case class PersonalizedPageRank(dampingFactor: Double, maxIterations: Int, tolerance: Double)
+  extends TypedMetaGraphOp[PersonalizedPageRank.Input, PersonalizedPageRank.Output] {
+  @transient override lazy val inputs = new PersonalizedPageRank.Input()
+  def outputMeta(instance: MetaGraphOperationInstance) = new PersonalizedPageRank.Output()(instance, inputs)
+  override def toJson = Json.obj(
+    "dampingFactor" -> dampingFactor,
+    "maxIterations" -> maxIterations,
+    "tolerance" -> tolerance)
+}
+
+object HITS extends OpFromJson {
+  class Input extends MagicInputSignature {
+    val (vs, es) = graph
+    val weights = edgeAttribute[Double](es)
+  }
+  class Output(implicit
+      instance: MetaGraphOperationInstance,
+      inputs: Input) extends MagicOutput(instance) {
+    val hub = vertexAttribute[Double](inputs.vs.entity)
+    val authority = vertexAttribute[Double](inputs.vs.entity)
+  }
+  def fromJson(j: JsValue) = HITS(
+    (j \ "maxIterations").as[Int],
+    (j \ "tolerance").as[Double])
+}
+case class HITS(maxIterations: Int, tolerance: Double)
+  extends TypedMetaGraphOp[HITS.Input, HITS.Output] {
+  @transient override lazy val inputs = new HITS.Input()
+  def outputMeta(instance: MetaGraphOperationInstance) = new HITS.Output()(instance, inputs)
+  override def toJson = Json.obj(
+    "maxIterations" -> maxIterations,
+    "tolerance" -> tolerance)
+}
+
+object StronglyConnectedComponents extends OpFromJson {
+  def fromJson(j: JsValue) = StronglyConnectedComponents()
+}
+case class StronglyConnectedComponents() extends TypedMetaGraphOp[GraphInput, Segmentation] {
+  @transient override lazy val inputs = new GraphInput
+  def outputMeta(instance: MetaGraphOperationInstance) = {
+    implicit val inst = instance
+    new Segmentation(
+      inputs.vs.entity,
+      EdgeBundleProperties(
+        isFunction = true,
+        isEverywhereDefined = true,
+        isReverseEverywhereDefined = true))
+  }
+}
+
+object LouvainClustering extends OpFromJson {
+  class Input extends MagicInputSignature {
+    val (vs, es) = graph
+    val weights = edgeAttribute[Double](es)
+  }
+  class Output(implicit
+      instance: MetaGraphOperationInstance,
+      inputs: Input) extends MagicOutput(instance) {
+    val clusters = vertexSet
+    val belongsTo = edgeBundle(
+      inputs.vs.entity,
+      clusters,
+      properties = EdgeBundleProperties.partialFunction)
+    val modularity = scalar[Double]
+  }
+  def fromJson(j: JsValue) = LouvainClustering(
+    (j \ "maxIterations").as[Int],
+    (j \ "minIncrementPerIteration").as[Double],
+    (j \ "seed").as[Int])
+}
+case class LouvainClustering(maxIterations: Int, minIncrementPerIteration: Double, seed: Int)
+  extends TypedMetaGraphOp[LouvainClustering.Input, LouvainClustering.Output] {
+  @transient override lazy val inputs = new LouvainClustering.Input()
+  def outputMeta(instance: MetaGraphOperationInstance) = new LouvainClustering.Output()(instance, inputs)
+  override def toJson = Json.obj(
+    "maxIterations" -> maxIterations,
+    "minIncrementPerIteration" -> minIncrementPerIteration,
+    "seed" -> seed)
+}
+
+object TriangleCount extends OpFromJson {
+  class Output(implicit instance: MetaGraphOperationInstance, inputs: GraphInput)
+    extends MagicOutput(instance) {
+    val triangles = vertexAttribute[Double](inputs.vs.entity)
+  }
+  def fromJson(j: JsValue) = TriangleCount()
+}
+case class TriangleCount() extends TypedMetaGraphOp[GraphInput, TriangleCount.Output] {
+  @transient override lazy val inputs = new GraphInput
+  def outputMeta(instance: MetaGraphOperationInstance) = new TriangleCount.Output()(instance, inputs)
+}
+
+// Sphynx implementations of Spark operations. They have the same signatures as the Spark
+// operations, but separate names, so the Spark implementations remain the default.
+object SphynxEmbeddedness extends OpFromJson {
+  def fromJson(j: JsValue) = SphynxEmbeddedness()
+}
+case class SphynxEmbeddedness() extends TypedMetaGraphOp[GraphInput, Embeddedness.Output] {
+  @transient override lazy val inputs = new GraphInput
+  def outputMeta(instance: MetaGraphOperationInstance) = new Embeddedness.Output()(instance, inputs)
+}
+
+object SphynxClusteringCoefficient extends OpFromJson {
+  def fromJson(j: JsValue) = SphynxClusteringCoefficient()
+}
+case class SphynxClusteringCoefficient()
+  extends TypedMetaGraphOp[GraphInput, ClusteringCoefficient.Output] {
+  @transient override lazy val inputs = new GraphInput
+  def outputMeta(instance: MetaGraphOperationInstance) =
+    new ClusteringCoefficient.Output()(instance, inputs)
+}
+
+object SphynxConcatenateBundlesMulti extends OpFromJson {
+  def fromJson(j: JsValue) = SphynxConcatenateBundlesMulti()
+}
+case class SphynxConcatenateBundlesMulti()
+  extends TypedMetaGraphOp[ConcatenateBundlesMulti.Input, ConcatenateBundlesMulti.Output] {
+  @transient override lazy val inputs = new ConcatenateBundlesMulti.Input()
+  def outputMeta(instance: MetaGraphOperationInstance) =
+    new ConcatenateBundlesMulti.Output()(instance, inputs)
+}
+
+object SphynxConnectedComponents extends OpFromJson {
+  def fromJson(j: JsValue) = SphynxConnectedComponents()
+}
+case class SphynxConnectedComponents() extends TypedMetaGraphOp[GraphInput, Segmentation] {
+  @transient override lazy val inputs = new GraphInput
+  def outputMeta(instance: MetaGraphOperationInstance) = {
+    implicit val inst = instance
+    new Segmentation(
+      inputs.vs.entity,
+      EdgeBundleProperties(
+        isFunction = true,
+        isEverywhereDefined = true,
+        isReverseEverywhereDefined = true))
+  }
+}
+
+object SphynxShortestPath extends OpFromJson {
+  def fromJson(j: JsValue) = SphynxShortestPath((j \ "maxIterations").as[Int])
+}
+case class SphynxShortestPath(maxIterations: Int)
+  extends TypedMetaGraphOp[ShortestPath.Input, ShortestPath.Output] {
+  @transient override lazy val inputs = new ShortestPath.Input()
+  def outputMeta(instance: MetaGraphOperationInstance) = new ShortestPath.Output()(instance, inputs)
+  override def toJson = Json.obj("maxIterations" -> maxIterations)
+}
+
+object SphynxDoubleBucketing extends OpFromJson {
+  def fromJson(j: JsValue) =
+    SphynxDoubleBucketing((j \ "bucketWidth").as[Double], (j \ "overlap").as[Boolean])
+}
+case class SphynxDoubleBucketing(bucketWidth: Double, overlap: Boolean)
+  extends TypedMetaGraphOp[DoubleBucketing.Input, DoubleBucketing.Output] {
+  @transient override lazy val inputs = new DoubleBucketing.Input
+  def outputMeta(instance: MetaGraphOperationInstance) = {
+    val properties =
+      if (overlap) EdgeBundleProperties.default else EdgeBundleProperties.partialFunction
+    new DoubleBucketing.Output(properties)(instance, inputs)
+  }
+  override def toJson = Json.obj("bucketWidth" -> bucketWidth, "overlap" -> overlap)
+}
+
+object SphynxIntervalBucketing extends OpFromJson {
+  def fromJson(j: JsValue) =
+    SphynxIntervalBucketing((j \ "bucketWidth").as[Double], (j \ "overlap").as[Boolean])
+}
+case class SphynxIntervalBucketing(bucketWidth: Double, overlap: Boolean)
+  extends TypedMetaGraphOp[IntervalBucketing.Input, IntervalBucketing.Output] {
+  @transient override lazy val inputs = new IntervalBucketing.Input
+  def outputMeta(instance: MetaGraphOperationInstance) = {
+    val properties =
+      if (overlap) EdgeBundleProperties.default else EdgeBundleProperties.partialFunction
+    new IntervalBucketing.Output(properties)(instance, inputs)
+  }
+  override def toJson = Json.obj("bucketWidth" -> bucketWidth, "overlap" -> overlap)
+}
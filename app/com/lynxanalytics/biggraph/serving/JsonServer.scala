@@ -48,6 +48,32 @@ abstract class JsonServer extends mvc.Controller {
     }
   }
 
+  // The largest request body that a gzipped request can decompress to.
+  val maxGzippedJsonBytes =
+    LoggedEnvironment.envOrElse("KITE_MAX_GZIPPED_JSON_MB", "100").toLong * 1024 * 1024
+
+  // Like parse.json, but also accepts request bodies compressed with "Content-Encoding: gzip".
+  // The Python API compresses large workspaces.
+  val jsonOrGzippedJson: mvc.BodyParser[json.JsValue] = parse.using { request =>
+    if (request.headers.get("Content-Encoding") == Some("gzip")) {
+      parse.raw.validate { raw =>
+        val file = new java.io.FileInputStream(raw.asFile)
+        try {
+          // Reads one byte more than the limit to see if it is exceeded.
+          val in = new org.apache.commons.io.input.BoundedInputStream(
+            new java.util.zip.GZIPInputStream(file), maxGzippedJsonBytes + 1)
+          val bytes = org.apache.commons.io.IOUtils.toByteArray(in)
+          if (bytes.length > maxGzippedJsonBytes) {
+            Left(EntityTooLarge(s"The request is larger than $maxGzippedJsonBytes bytes."))
+          } else Right(json.Json.parse(bytes))
+        } catch {
+          // Invalid gzip and invalid JSON both end up here.
+          case e: java.io.IOException => Left(BadRequest(s"Invalid gzipped JSON: ${e.getMessage}"))
+        } finally file.close()
+      }
+    } else parse.json
+  }
+
   def jsonPostCommon[I: json.Reads, R](
     user: User,
     request: mvc.Request[json.JsValue], logRequest: Boolean = true)(
@@ -69,7 +95,7 @@ abstract class JsonServer extends mvc.Controller {
   def jsonPost[I: json.Reads, O: json.Writes](
     handler: (User, I) => O,
     logRequest: Boolean = true) = {
-    action(parse.json) { (user, request) =>
+    action(jsonOrGzippedJson) { (user, request) =>
       jsonPostCommon(user, request, logRequest) { (user: User, i: I) =>
         Ok(json.Json.toJson(handler(user, i)))
       }
@@ -79,7 +105,7 @@ abstract class JsonServer extends mvc.Controller {
   def jsonFuturePost[I: json.Reads, O: json.Writes](
     handler: (User, I) => Future[O],
     logRequest: Boolean = true) = {
-    asyncAction(parse.json) { (user, request) =>
+    asyncAction(jsonOrGzippedJson) { (user, request) =>
       jsonPostCommon(user, request, logRequest) { (user: User, i: I) =>
         handler(user, i).map(o => Ok(json.Json.toJson(o)))
       }
@@ -446,6 +472,15 @@ object ProductionJsonServer extends JsonServer {
     val table = workspaceController.getOutput(user, request.id).table
     sqlController.getTableSample(table, request.sampleRows)
   }
+  def downloadTable = action(parse.anyContent) {
+    (user, request) => jsonQuery(user, request)(downloadTableData)
+  }
+  // Sends the whole table as a Parquet file. The sample size in the request is ignored.
+  def downloadTableData(user: serving.User, request: GetTableOutputRequest): mvc.Result = {
+    implicit val metaManager = workspaceController.metaManager
+    val table = workspaceController.getOutput(user, request.id).table
+    Downloads.downloadFile(user, sqlController.exportTableForDownload(user, table))
+  }
   def getTableBrowserNodesForBox =
     jsonGet(sqlController.getTableBrowserNodesForBox(workspaceController))
 
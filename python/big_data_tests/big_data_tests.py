@@ -5,6 +5,7 @@ This script runs big data tests. Example usage:
    ./big_data_tests.py --test compute_embeddedness,centrality --vertex_file  'DATA$/exports/graph_10_vertices' --edge_file 'DATA$/exports/graph_10_edges'
 
 This runs two tests: compute_embeddedness and centrality, plus all other tests that these two depend on.
+With --parallelism N up to N tests run at the same time, once the tests they depend on are done.
 The two input files specify the vertices and the edges. These must be in Parquet format.
 
 This command:
@@ -13,15 +14,39 @@ This command:
 
 will run all the tests.
 
+Instead of input files you can use a generated graph. See graph_generator.py for the options.
+
+  ./big_data_tests.py --generate scale=7,distribution=power_law
+
+The files are generated into the "parquet" directory next to this script, which LynxKite must be
+able to access with the PARQUET$ prefix. (This is set up by run_test.sh.)
+
+To track performance across releases, run the tests several times and save the statistics:
+
+  ./big_data_tests.py --vertex_file ... --edge_file ... --warmup 1 --repeat 5 --output new.json
+
+Each round imports the input files again and uses new random seeds for the tests that do not read
+them, so everything is computed from scratch. Compare the results with an earlier run. The exit code is 1 if a test got slower than the threshold:
+
+  ./big_data_tests.py --vertex_file ... --edge_file ... --repeat 5 --compare old.json
+
 You can add more tests at the end of this file; use the @bdtest directive.
 '''
 
+import graph_generator
 import lynx.kite
 import sys
 import time
 import argparse
+import csv
+import json
+import math
+import os
+import platform
+import socket
+import statistics
+import concurrent.futures
 from inspect import signature
-from functools import lru_cache
 from collections import namedtuple
 
 
@@ -29,10 +54,10 @@ def get_args():
   parser = argparse.ArgumentParser()
   parser.add_argument('--tests', type=str, default='all',
                       help='Comma separated list of the tests to run. The default "all" means run all.')
-  parser.add_argument('--vertex_file', type=str, required=True,
+  parser.add_argument('--vertex_file', type=str,
                       help='LynxKite-type (prefixed) path to the Parquet file specifying the vertices, e.g., DATA$/exports/testgraph_vertices')
 
-  parser.add_argument('--edge_file', type=str, required=True,
+  parser.add_argument('--edge_file', type=str,
                       help='LynxKite-type (prefixed) path to the Parquet file specifying the edges, e.g., DATA$/exports/testgraph_edges')
 
   parser.add_argument('--src', type=str, default='src',
@@ -43,13 +68,60 @@ def get_args():
 
   parser.add_argument('--vertex_set_size', type=int, default=100000,
                       help='The vertex set size for tests that want to start with "Create Vertrices"')
-  return parser.parse_args()
+
+  parser.add_argument('--repeat', type=int, default=1,
+                      help='The number of measured rounds. '
+                      'Each round computes everything from scratch.')
+
+  parser.add_argument('--warmup', type=int, default=0,
+                      help='The number of rounds to run before the measured rounds. '
+                      'Their times are discarded.')
+
+  parser.add_argument('--output', type=str,
+                      help='Save the timings to this file. '
+                      'CSV if the name ends with ".csv", JSON otherwise.')
+
+  parser.add_argument('--compare', type=str,
+                      help='A JSON file saved with --output earlier. '
+                      'Exits with 1 if a test got slower.')
+
+  parser.add_argument('--threshold', type=float, default=0.2,
+                      help='The relative increase of the median time '
+                      'that counts as slower for --compare.')
+
+  parser.add_argument('--parallelism', type=int, default=1,
+                      help='The maximal number of tests to run at the same time.')
+
+  parser.add_argument('--generate', type=str,
+                      help='Generate the input graph instead of using --vertex_file and '
+                      '--edge_file, e.g. "scale=7,distribution=uniform,degree=5,seed=1".')
+
+  parser.add_argument('--generate_dir', type=str,
+                      default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parquet'),
+                      help='The local directory for the generated files.')
+
+  parser.add_argument('--generate_prefix', type=str, default='PARQUET$',
+                      help='The LynxKite prefix that points to --generate_dir.')
+  args = parser.parse_args()
+  if args.generate:
+    spec = graph_generator.parse_spec(args.generate)
+    paths = graph_generator.generate(args.generate_dir, **spec)
+    args.vertex_file, args.edge_file = [
+        args.generate_prefix + '/' + os.path.basename(p) for p in paths]
+    args.src, args.dst = 'src', 'dst'
+  elif not (args.vertex_file and args.edge_file):
+    parser.error('Specify --vertex_file and --edge_file or use --generate.')
+  return args
 
 
 ARGS = get_args()
 TESTS = {}
 LK = lynx.kite.LynxKite()
-COMPUTE_RESULT = namedtuple('COMPUTE_RESULT', ['lk_state', 'time_taken', 'test_name'])
+# The number of rounds started so far, including the warmup rounds.
+ROUND = 0
+# The start and end times are in seconds from the start of the round.
+COMPUTE_RESULT = namedtuple(
+    'COMPUTE_RESULT', ['lk_state', 'time_taken', 'test_name', 'start', 'end'])
 
 
 def bdtest():
@@ -57,29 +129,181 @@ def bdtest():
   def inner(op):
     input_names = list(signature(op).parameters.keys())
     assert(all([i in TESTS for i in input_names]))
+    assert op.__name__ not in TESTS, f'Duplicate test name: {op.__name__}'
     TESTS[op.__name__] = (input_names, op)
   return inner
 
 
-@lru_cache(maxsize=None)
-def compute(test):
-  input_names, op = TESTS[test]
-  inputs = [compute(inp_name).lk_state for inp_name in input_names]
+def compute(test, inputs, round_start):
+  _, op = TESTS[test]
   print(f'Running {test}', file=sys.stderr)
   start = time.monotonic()
   lk_state = op(*inputs)
   lk_state.compute()
-  time_taken = time.monotonic() - start
-  return COMPUTE_RESULT(lk_state=lk_state, time_taken=time_taken, test_name=test)
+  end = time.monotonic()
+  return COMPUTE_RESULT(
+      lk_state=lk_state, time_taken=end - start, test_name=test,
+      start=start - round_start, end=end - round_start)
+
+
+def with_dependencies(tests):
+  '''The given tests and all the tests they depend on.'''
+  needed = set()
+  to_visit = list(tests)
+  while to_visit:
+    test = to_visit.pop()
+    if test not in needed:
+      needed.add(test)
+      to_visit.extend(TESTS[test][0])
+  return needed
+
+
+def run_tests(tests, parallelism):
+  '''Runs the tests and the tests they depend on. A test starts when its inputs are ready
+  and fewer than "parallelism" tests are running. Returns the results of all the tests run.'''
+  # Tests are defined after their inputs, so this order is also a valid serial order.
+  order = list(TESTS.keys())
+  waiting = sorted(with_dependencies(tests), key=order.index)
+  results = {}
+  running = {}
+  round_start = time.monotonic()
+  with concurrent.futures.ThreadPoolExecutor(parallelism) as pool:
+    while waiting or running:
+      for test in list(waiting):
+        if len(running) >= parallelism:
+          break
+        input_names = TESTS[test][0]
+        if all(i in results for i in input_names):
+          inputs = [results[i].lk_state for i in input_names]
+          running[pool.submit(compute, test, inputs, round_start)] = test
+          waiting.remove(test)
+      done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+      for future in done:
+        results[running.pop(future)] = future.result()
+  return results
+
+
+def print_timeline(results, width=60):
+  '''Shows when each test was running.'''
+  total = max(r.end for r in results.values())
+  for r in sorted(results.values(), key=lambda r: r.start):
+    begin = int(r.start / total * width)
+    end = max(begin + 1, int(r.end / total * width))
+    bar = ' ' * begin + '#' * (end - begin) + ' ' * (width - end)
+    print(f'{r.test_name:50} |{bar}| {r.start:8.2f} - {r.end:8.2f}', file=sys.stderr)
+
+
+def round_seed(seed):
+  '''A random seed that is different in every round.'''
+  return str(seed + 1000 * ROUND)
+
+
+def run_round(tests_to_run):
+  '''Computes the tests from scratch. Returns the results of the tests.'''
+  # The imports are done again and the tests that do not depend on them use round_seed(),
+  # so all the results will have new GUIDs.
+  global ROUND
+  ROUND += 1
+  all_results = run_tests(tests_to_run, ARGS.parallelism)
+  print_timeline(all_results)
+  results = {t: all_results[t] for t in tests_to_run}
+  for result in results.values():
+    print(f'Computing {result.test_name} took {result.time_taken:.2f} seconds')
+  return results
+
+
+def percentile(values, p):
+  '''The nearest-rank percentile.'''
+  values = sorted(values)
+  return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(rounds):
+  '''Statistics of the times taken by each test over several rounds.'''
+  return {
+      test: dict(
+          times=times,
+          min=min(times),
+          median=statistics.median(times),
+          p95=percentile(times, 95))
+      for test in rounds[0]
+      for times in [[r[test].time_taken for r in rounds]]}
+
+
+def timelines(rounds):
+  '''The start and end times of the tests in each round.'''
+  return [{test: [r.start, r.end] for test, r in results.items()} for results in rounds]
+
+
+def metadata():
+  return dict(
+      lynxkite_version=LK._ask('/ajax/getGlobalSettings').version,
+      lynxkite_address=LK.address(),
+      host=socket.gethostname(),
+      platform=platform.platform(),
+      python=platform.python_version(),
+      cpu_count=os.cpu_count(),
+      time=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+      vertex_file=ARGS.vertex_file,
+      edge_file=ARGS.edge_file,
+      generate=ARGS.generate,
+      repeat=ARGS.repeat,
+      warmup=ARGS.warmup,
+      parallelism=ARGS.parallelism)
+
+
+def save(path, report):
+  if path.endswith('.csv'):
+    meta = report['metadata']
+    with open(path, 'w', newline='') as f:
+      w = csv.writer(f)
+      w.writerow(['test', 'runs', 'min', 'median', 'p95', 'lynxkite_version', 'host'])
+      for test, stats in report['tests'].items():
+        w.writerow([test, len(stats['times']), stats['min'], stats['median'], stats['p95'],
+                    meta['lynxkite_version'], meta['host']])
+  else:
+    with open(path, 'w') as f:
+      json.dump(report, f, indent=2)
+
+
+def compare(baseline_path, tests, threshold):
+  '''Prints the tests where the median time increased by more than "threshold" relative
+  to the baseline. Returns whether there were any.'''
+  with open(baseline_path) as f:
+    baseline = json.load(f)
+  print(f'Comparing to {baseline_path} (LynxKite {baseline["metadata"]["lynxkite_version"]})')
+  slower = False
+  for test, stats in tests.items():
+    if test not in baseline['tests']:
+      print(f'{test}: not in the baseline')
+      continue
+    old = baseline['tests'][test]['median']
+    new = stats['median']
+    change = (new - old) / old if old > 0 else 0
+    flag = ''
+    if change > threshold:
+      flag = '  SLOWER'
+      slower = True
+    print(f'{test}: {old:.2f} -> {new:.2f} seconds ({change:+.0%}){flag}')
+  return slower
 
 
 def main():
   tests_to_run = ARGS.tests.split(',') if ARGS.tests != 'all' else list(TESTS.keys())
   unknown = [t for t in tests_to_run if t not in TESTS.keys()]
   assert len(unknown) == 0, f'Unknown test(s): {unknown}\nAvaliable: {TESTS.keys()}'
-  for result in [compute(t) for t in tests_to_run]:
-    t = "{:.2f}".format(result.time_taken)
-    print(f'Computing {result.test_name} took {result.time_taken:.2f} seconds')
+  for i in range(ARGS.warmup):
+    print(f'Warmup round {i + 1} of {ARGS.warmup}', file=sys.stderr)
+    run_round(tests_to_run)
+  rounds = []
+  for i in range(ARGS.repeat):
+    print(f'Round {i + 1} of {ARGS.repeat}', file=sys.stderr)
+    rounds.append(run_round(tests_to_run))
+  report = dict(metadata=metadata(), tests=summarize(rounds), timelines=timelines(rounds))
+  if ARGS.output:
+    save(ARGS.output, report)
+  if ARGS.compare and compare(ARGS.compare, report['tests'], ARGS.threshold):
+    sys.exit(1)
 
 
 # TESTS
@@ -141,11 +365,33 @@ def clustering_coefficient(graph):
   return LK.approximateClusteringCoefficient(graph, name='clustering_coefficient')
 
 
+@bdtest()
+def compute_clustering_coefficient(graph):
+  return LK.computeClusteringCoefficient(graph, name='clustering_coefficient')
+
+
+@bdtest()
+def compute_clustering_coefficient_sphynx(graph):
+  # Same input as compute_clustering_coefficient for comparison.
+  return LK.computeClusteringCoefficient(graph, name='clustering_coefficient', sphynx='yes')
+
+
 @bdtest()
 def compute_embeddedness(graph):
   return LK.computeEmbeddedness(graph, name='embeddedness')
 
 
+@bdtest()
+def compute_embeddedness_sphynx(graph):
+  # Same input as compute_embeddedness for comparison.
+  return LK.computeEmbeddedness(graph, name='embeddedness', sphynx='yes')
+
+
+@bdtest()
+def compute_triangle_count(graph):
+  return LK.computeTriangleCount(graph, name='triangles')
+
+
 @bdtest()
 def segment_by_interval(random_attributes):
   r = random_attributes
@@ -159,6 +405,19 @@ def segment_by_interval(random_attributes):
   return r
 
 
+@bdtest()
+def segment_by_interval_sphynx(random_attributes):
+  # Same input as segment_by_interval for comparison.
+  r = random_attributes
+  r = LK.renameVertexAttributes(r, change_rnd_std_normal2='i_begin')
+  r = LK.deriveVertexAttribute(r, output='i_end', expr='i_begin + Math.abs(rnd_std_normal)')
+  r = LK.segmentByInterval(r, begin_attr='i_begin', end_attr='i_end', interval_size='0.01',
+                           name='seg_interval', overlap='no', sphynx='yes')
+  r = LK.segmentByInterval(r, begin_attr='i_begin', end_attr='i_end', interval_size='0.01',
+                           name='seg_interval_overlap', overlap='yes', sphynx='yes')
+  return r
+
+
 @bdtest()
 def weighted_aggregate_from_segmentation(segment_by_interval):
   return LK.weightedAggregateFromSegmentation(segment_by_interval, apply_to_graph='.seg_interval',
@@ -183,6 +442,19 @@ def segmentations(random_attributes):
   return r
 
 
+@bdtest()
+def segmentations_sphynx(random_attributes):
+  # Same input as segmentations for comparison. The String segmentation has no Sphynx version.
+  r = random_attributes
+  r = LK.segmentByDoubleAttribute(r, attr='rnd_std_normal', interval_size='0.01',
+                                  name='seg', overlap='no', sphynx='yes')
+  r = LK.segmentByDoubleAttribute(r, attr='rnd_std_normal', interval_size='0.01',
+                                  name='seg_overlap', overlap='yes', sphynx='yes')
+  r = LK.deriveVertexAttribute(r, output='x', expr='"%.7f".format(rnd_std_uniform)')
+  r = LK.segmentByStringAttribute(r, attr='x', name='seg_string')
+  return r
+
+
 @bdtest()
 def combine_segmentations(segmentations):
   return LK.combineSegmentations(segmentations, name='seg_combined',
@@ -195,6 +467,28 @@ def find_connected_components(graph):
       graph, name='connected_components', directions='ignore directions')
 
 
+@bdtest()
+def find_connected_components_sphynx(graph):
+  # Same input as find_connected_components for comparison.
+  return LK.findConnectedComponents(
+      graph, name='connected_components', directions='ignore directions', sphynx='yes')
+
+
+@bdtest()
+def compute_distance_via_shortest_path(random_attributes):
+  return LK.computeDistanceViaShortestPath(
+      random_attributes, name='shortest_distance', edge_distance='rnd_std_uniform',
+      starting_distance='rnd_std_uniform', iterations='10')
+
+
+@bdtest()
+def compute_distance_via_shortest_path_sphynx(random_attributes):
+  # Same input as compute_distance_via_shortest_path for comparison.
+  return LK.computeDistanceViaShortestPath(
+      random_attributes, name='shortest_distance', edge_distance='rnd_std_uniform',
+      starting_distance='rnd_std_uniform', iterations='10', sphynx='yes')
+
+
 @bdtest()
 def filter_high_degree_vertices(degree):
   return LK.filterByAttributes(degree, filterva_degree='<5000')
@@ -217,12 +511,6 @@ def create_edges_from_cooccurrence(find_maximal_cliques):
   return LK.createEdgesFromCooccurrence(edgeless, apply_to_graph='.maximal_cliques')
 
 
-@bdtest()
-def create_edges_from_cooccurrence(find_maximal_cliques):
-  edgeless = LK.discardEdges(find_maximal_cliques)
-  return LK.createEdgesFromCooccurrence(edgeless, apply_to_graph='.maximal_cliques')
-
-
 @bdtest()
 def self_segmentation(random_attributes):
   edgeless = LK.discardEdges(random_attributes)
@@ -285,12 +573,14 @@ def even_distribution():
   a = ARGS.vertex_set_size
   b = a // 10
   g = LK.createVertices(size=a)
+  # This test does not read the input files. New seeds make sure it is not cached across rounds.
   g = LK.addRandomVertexAttribute(
       g,
       name='rnd_std_uniform',
       dist='Standard Uniform',
-      seed='4242567')
-  g = LK.addRandomVertexAttribute(g, name='rnd_std_normal', dist='Standard Normal', seed='4242568')
+      seed=round_seed(4242567))
+  g = LK.addRandomVertexAttribute(
+      g, name='rnd_std_normal', dist='Standard Normal', seed=round_seed(4242568))
   g = LK.deriveVertexAttribute(g, output='label', expr=f'Math.floor(rnd_std_uniform*{b})')
   g = LK.deriveVertexAttribute(g, output='label2', expr=f'Math.floor(rnd_std_normal)')
   return g
@@ -314,6 +604,13 @@ def find_modular_clustering(filter_high_degree_vertices):
                                   max_iterations='30', min_increment_per_iteration='0.001')
 
 
+@bdtest()
+def find_louvain_clustering(filter_high_degree_vertices):
+  # Same input as find_modular_clustering for comparison.
+  return LK.findLouvainClustering(filter_high_degree_vertices, name='louvain_clusters',
+                                  weights='!no weight', seed='1')
+
+
 @bdtest()
 def compute_pagerank(random_attributes):
   g = random_attributes
@@ -332,12 +629,40 @@ def compute_pagerank(random_attributes):
   return g
 
 
+@bdtest()
+def compute_personalized_pagerank(random_attributes):
+  return LK.computePersonalizedPageRank(
+      random_attributes,
+      name='personalized_page_rank',
+      weights='rnd_std_uniform',
+      personalization='rnd_std_uniform',
+      iterations='100',
+      tolerance='0.000001',
+      damping='0.85')
+
+
+@bdtest()
+def compute_hub_and_authority_scores(random_attributes):
+  return LK.computeHubAndAuthorityScores(
+      random_attributes,
+      weights='rnd_std_uniform',
+      iterations='100',
+      tolerance='0.000001')
+
+
 @bdtest()
 def create_snowball_sample(graph):
   return LK.createSnowballSample(graph, attrName='distance_from_start_point',
                                  ratio='0.0001', radius='1', seed='123454321')
 
 
+@bdtest()
+def create_snowball_sample_sphynx(graph):
+  # Same input as create_snowball_sample for comparison.
+  return LK.createSnowballSample(graph, attrName='distance_from_start_point',
+                                 ratio='0.0001', radius='1', seed='123454321', sphynx='yes')
+
+
 @bdtest()
 def replace_edges_with_triadic_closure(filter_high_degree_vertices_1000):
   g = LK.filterByAttributes(filter_high_degree_vertices_1000, filterva_degree='<100')
@@ -345,6 +670,14 @@ def replace_edges_with_triadic_closure(filter_high_degree_vertices_1000):
   return LK.replaceEdgesWithTriadicClosure(g)
 
 
+@bdtest()
+def replace_edges_with_triadic_closure_sphynx(filter_high_degree_vertices_1000):
+  # Same input as replace_edges_with_triadic_closure for comparison.
+  g = LK.filterByAttributes(filter_high_degree_vertices_1000, filterva_degree='<100')
+  g = LK.addRandomEdgeAttribute(g, name='attr', dist='Standard Uniform', seed='1234321')
+  return LK.replaceEdgesWithTriadicClosure(g, sphynx='yes')
+
+
 @bdtest()
 def graph_union(graph):
   return LK.graphUnion(graph, graph)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+'''
+Generates seeded random graphs for the big data tests, so they can run without downloading data.
+
+   ./graph_generator.py --scale 7 --distribution power_law --output_dir parquet
+
+This writes a graph with 10^7 edges to parquet/power_law_scale7_degree10_seed0_vertices.parquet
+and parquet/power_law_scale7_degree10_seed0_edges.parquet. The vertex file has a "vertex_id"
+column, the edge file has "src" and "dst" columns, as expected by big_data_tests.py. The files are
+written in batches, so graphs larger than the memory can be generated too.
+
+The distributions:
+
+ - uniform: Both ends of each edge are picked uniformly at random.
+ - power_law: Both ends of each edge are picked with a probability proportional to
+   (vertex_id + 1)^(-1 / (exponent - 1)). The degrees follow a power law with the given exponent.
+ - lattice: A square grid where each vertex is connected to its right and lower neighbor,
+   like in tools/lattice.py. The degree and the seed are not used.
+'''
+import argparse
+import math
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DISTRIBUTIONS = ['uniform', 'power_law', 'lattice']
+# The number of rows to generate and write at once.
+BATCH_SIZE = 10_000_000
+
+
+def batches(count):
+  '''The (start, end) ranges of the batches for generating "count" rows.'''
+  for start in range(0, count, BATCH_SIZE):
+    yield start, min(count, start + BATCH_SIZE)
+
+
+def write_parquet(path, schema, batch_iterator):
+  tmp = path + '.tmp'
+  with pq.ParquetWriter(tmp, schema) as writer:
+    for columns in batch_iterator:
+      writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+  os.rename(tmp, path)
+
+
+def power_law_ids(rng, n, vertex_count, exponent):
+  '''Samples vertex IDs from a discretized power-law distribution by inverse transform sampling.'''
+  a = 1 / (exponent - 1)
+  u = rng.random(n)
+  top = (vertex_count + 1)**(1 - a)
+  x = ((top - 1) * u + 1)**(1 / (1 - a))
+  return np.minimum(x.astype(np.int64) - 1, vertex_count - 1)
+
+
+def lattice_edges(width, height, start, end):
+  '''Edges "start" to "end" of the lattice. Edge 2i goes right from vertex i, edge 2i+1 goes down.
+  Edges that would leave the lattice are left out.'''
+  e = np.arange(start, end)
+  v = e // 2
+  down = e % 2 == 1
+  x, y = v // height, v % height
+  keep = np.where(down, y < height - 1, x < width - 1)
+  v, down = v[keep], down[keep]
+  return v, np.where(down, v + 1, v + height)
+
+
+def generate(output_dir, scale, distribution='power_law', degree=10, seed=0, exponent=2.5):
+  '''Generates a graph with about 10^scale edges and the given average out-degree.
+  Returns the paths of the vertex and edge files. Existing files are not generated again.'''
+  assert distribution in DISTRIBUTIONS, f'Unknown distribution: {distribution}'
+  edge_count = int(10**scale)
+  if distribution == 'lattice':
+    width = height = max(2, int(math.sqrt(edge_count / 2)))
+    vertex_count = width * height
+  else:
+    vertex_count = max(1, int(edge_count / degree))
+  name = f'{distribution}_scale{scale:g}_degree{degree:g}_seed{seed}'
+  if distribution == 'power_law' and exponent != 2.5:
+    name += f'_exponent{exponent:g}'
+  vertices_path = f'{output_dir}/{name}_vertices.parquet'
+  edges_path = f'{output_dir}/{name}_edges.parquet'
+  os.makedirs(output_dir, exist_ok=True)
+  if not os.path.exists(vertices_path):
+    write_parquet(
+        vertices_path, pa.schema([('vertex_id', pa.int64())]),
+        ([pa.array(np.arange(start, end))] for start, end in batches(vertex_count)))
+  if not os.path.exists(edges_path):
+    rng = np.random.default_rng(seed)
+
+    def edge_batches():
+      if distribution == 'lattice':
+        for start, end in batches(2 * vertex_count):
+          src, dst = lattice_edges(width, height, start, end)
+          yield [pa.array(src), pa.array(dst)]
+      else:
+        for start, end in batches(edge_count):
+          if distribution == 'uniform':
+            src = rng.integers(0, vertex_count, end - start)
+            dst = rng.integers(0, vertex_count, end - start)
+          else:
+            src = power_law_ids(rng, end - start, vertex_count, exponent)
+            dst = power_law_ids(rng, end - start, vertex_count, exponent)
+          yield [pa.array(src), pa.array(dst)]
+    write_parquet(edges_path, pa.schema([('src', pa.int64()), ('dst', pa.int64())]), edge_batches())
+  return vertices_path, edges_path
+
+
+def parse_spec(spec):
+  '''Parses a specification like "scale=7,distribution=uniform" into arguments for generate().'''
+  types = dict(scale=float, distribution=str, degree=float, seed=int, exponent=float)
+  kwargs = {}
+  for item in spec.split(','):
+    key, value = item.split('=', 1)
+    assert key in types, f'Unknown setting: {key}. Available: {", ".join(types)}'
+    kwargs[key] = types[key](value)
+  assert 'scale' in kwargs, 'The scale must be specified, e.g. "scale=6" for a million edges.'
+  return kwargs
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--scale', type=float, required=True,
+                      help='The graph will have about 10^scale edges.')
+  parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='power_law')
+  parser.add_argument('--degree', type=float, default=10, help='The average out-degree.')
+  parser.add_argument('--exponent', type=float, default=2.5,
+                      help='The exponent of the power-law degree distribution.')
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--output_dir', type=str, default='parquet')
+  args = parser.parse_args()
+  for path in generate(
+          args.output_dir, args.scale, args.distribution, args.degree, args.seed, args.exponent):
+    print(path)
+
+
+if __name__ == '__main__':
+  main()
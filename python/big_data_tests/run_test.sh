@@ -1,5 +1,9 @@
 #!/bin/bash -xue
 # Run this script to update the results.txt file.
+# Extra arguments are passed to big_data_tests.py. For example:
+#   ./run_test.sh --repeat 3 --output results.json
+# Use a generated graph instead of downloading the test data from S3:
+#   ./run_test.sh --generate scale=6
 
 cd $(dirname $0)
 
@@ -19,8 +23,10 @@ function download() {
     cd ..
 }
 
-download local_test_vertices.parquet
-download local_test_edges.parquet
+if [[ "$*" != *--generate* ]]; then
+  download local_test_vertices.parquet
+  download local_test_edges.parquet
+fi
 
 HERE=`pwd`
 KITEPORT=33087
@@ -53,4 +59,4 @@ trap stop_kite EXIT
 ../../tools/wait_for_port.sh $KITEPORT
 export LYNXKITE_ADDRESS=http://localhost:$KITEPORT
 ./big_data_tests.py --vertex_file 'PARQUET$/local_test_vertices.parquet' \
-                    --edge_file 'PARQUET$/local_test_edges.parquet' > results.txt
+                    --edge_file 'PARQUET$/local_test_edges.parquet' "$@" > results.txt
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+'''
+Benchmarks the workspace building code of the Python API without a LynxKite server.
+
+   PYTHONPATH=src ./client_benchmark.py --shapes wide,deep --sizes 100,200,400
+
+The workspaces are built with an offline box catalog that contains a few common boxes. The shapes:
+
+ - wide: Many SQL boxes reading the same graph. Each of them is computed.
+ - deep: A long chain of SQL boxes. Each of them is computed.
+ - nested: Custom boxes nested into each other. Each level has an SQL box that is computed. The
+   outermost custom box is used twice, so every nested custom box is shared by two paths.
+
+The size is the number of SQL boxes. For each shape and size this measures building the workspace,
+Workspace.to_json(), _layout(), BoxPath.dependencies() and serialize_deps() on the side effects.
+
+The time of each step is expected to grow with the size of its result. This is linear, except:
+
+ - deep: Every computed box depends on all the boxes before it. BoxPath.dependencies() returns
+   these n^2 / 2 pairs and serialize_deps() reads them.
+ - nested: Each of the n / 2 nested workspaces lists the side effects of all the workspaces
+   inside it, so building them creates n^2 / 8 box paths. The dependencies are like in "deep".
+
+Between consecutive sizes the growth rate is reported as an exponent: 1 is linear, 2 is
+quadratic. With --tolerance the benchmark fails if a step grows faster than its expected exponent
+(in EXPECTED_EXPONENTS) plus the tolerance. Small sizes are dominated by noise, so use sizes where
+the steps take at least a few milliseconds.
+
+It also measures the time of "import lynx.kite" in a new Python process, and lists the slow
+modules that it loads. (They should only be loaded when they are used.)
+'''
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import types
+from lynx import kite
+from lynx.kite import LynxKite, BoxCatalog, Workspace, BoxPath, SideEffectCollector, subworkspace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Operation ID, inputs and outputs of the boxes in the offline box catalog.
+OFFLINE_BOXES = {
+    'createExampleGraph': ('Create example graph', [], ['graph']),
+    'sql1': ('SQL1', ['input'], ['table']),
+    'sql2': ('SQL2', ['one', 'two'], ['table']),
+    'input': ('Input', [], ['input']),
+    'output': ('Output', ['output'], []),
+    'computeInputs': ('Compute inputs', ['input'], []),
+    'saveToSnapshot': ('Save to snapshot', ['state'], []),
+    'importSnapshot': ('Import snapshot', [], ['state']),
+    'exportToCSV': ('Export to CSV', ['table'], ['exported']),
+    'exportToParquet': ('Export to Parquet', ['table'], ['exported']),
+    'externalComputation1': ('External computation 1', ['1'], ['table']),
+}
+
+
+def offline_box_catalog() -> BoxCatalog:
+  return BoxCatalog({
+      name: types.SimpleNamespace(
+          operationId=op, inputs=inputs, outputs=outputs, categoryId='Workflow')
+      for name, (op, inputs, outputs) in OFFLINE_BOXES.items()})
+
+
+def offline_lk() -> LynxKite:
+  '''A LynxKite connection that can build workspaces but not send them anywhere.'''
+  return LynxKite(address='http://offline.invalid/', box_catalog=offline_box_catalog())
+
+
+def wide(lk, size):
+  eg = lk.createExampleGraph()
+  sec = SideEffectCollector()
+  for i in range(size):
+    sec.compute(eg.sql(f'select {i} as x from vertices'))
+  return Workspace(
+      name='wide', terminal_boxes=sec.top_level_side_effects,
+      side_effect_paths=list(sec.all_triggerables()))
+
+
+def deep(lk, size):
+  t = lk.createExampleGraph().sql('select * from vertices')
+  sec = SideEffectCollector()
+  for i in range(size - 1):
+    t = sec.compute(t).sql(f'select *, {i} as x{i} from input')
+  sec.compute(t)
+  return Workspace(
+      name='deep', terminal_boxes=sec.top_level_side_effects,
+      side_effect_paths=list(sec.all_triggerables()))
+
+
+def nested(lk, size):
+  def level(i, inner):
+    def fn(t, sec=SideEffectCollector.AUTO):
+      t = sec.compute(t.sql(f'select *, {i} as x{i} from input'))
+      return inner(t).register(sec) if inner else t
+    fn.__name__ = f'level{i}'
+    return subworkspace(fn)
+  outermost = None
+  for i in reversed(range(max(1, size // 2))):
+    outermost = level(i, outermost)
+  sec = SideEffectCollector()
+  t = lk.createExampleGraph().sql('select * from vertices')
+  t = outermost(outermost(t).register(sec)).register(sec)
+  sec.compute(t)
+  return Workspace(
+      name='nested', terminal_boxes=sec.top_level_side_effects,
+      side_effect_paths=list(sec.all_triggerables()))
+
+
+# Modules that "import lynx.kite" should not load.
+SLOW_MODULES = ['requests', 'asyncio', 'pandas', 'pyarrow', 'lynx.operations']
+IMPORT_CODE = f'''
+import json, sys, time
+start = time.perf_counter()
+import lynx.kite
+seconds = time.perf_counter() - start
+print(json.dumps(dict(seconds=seconds, loaded=[m for m in {SLOW_MODULES!r} if m in sys.modules])))
+'''
+
+
+def import_time(repeat):
+  '''The fastest of "repeat" imports of lynx.kite in new processes and the slow modules loaded.'''
+  env = dict(os.environ)
+  # Import the same lynx.kite that is benchmarked.
+  src = os.path.dirname(os.path.dirname(os.path.abspath(kite.__file__)))
+  env['PYTHONPATH'] = os.pathsep.join([src] + [p for p in [env.get('PYTHONPATH')] if p])
+  runs = [json.loads(subprocess.check_output([sys.executable, '-c', IMPORT_CODE], env=env))
+          for _ in range(repeat)]
+  return min(r['seconds'] for r in runs), runs[0]['loaded']
+
+
+SHAPES = {f.__name__: f for f in [wide, deep, nested]}
+STEPS = ['build', 'to_json', 'layout', 'dependencies', 'serialize_deps']
+# The growth of the result of each step. (See the module docstring.)
+EXPECTED_EXPONENTS = {
+    'wide': dict(build=1, to_json=1, layout=1, dependencies=1, serialize_deps=1),
+    'deep': dict(build=1, to_json=1, layout=1, dependencies=2, serialize_deps=2),
+    'nested': dict(build=2, to_json=1, layout=1, dependencies=2, serialize_deps=2),
+}
+
+
+def run(lk, shape, size):
+  '''Runs the steps on one workspace. Returns the seconds taken by each step.'''
+  times = {}
+
+  def timed(step, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    times[step] = time.perf_counter() - start
+    return result
+  ws = timed('build', SHAPES[shape], lk, size)
+  boxes = timed('to_json', ws.to_json, 'benchmark', ws.safename())
+  timed('layout', kite._layout, boxes)
+  deps = timed('dependencies', BoxPath.dependencies, ws.side_effect_paths())
+  order = timed('serialize_deps', kite.serialize_deps, deps)
+  assert len(order) == len(ws.side_effect_paths())
+  return times
+
+
+def exponent(t1, n1, t2, n2):
+  '''The k for which t2 / t1 = (n2 / n1)^k.'''
+  if t1 <= 0 or t2 <= 0:
+    return float('nan')
+  return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def compare(baseline_path, import_seconds, results):
+  baseline = benchmark_results.compare(baseline_path, results, ['shape', 'size'], STEPS)
+  if 'import_seconds' in baseline:
+    print(f'import lynx.kite {import_seconds / baseline["import_seconds"]:6.2f}x')
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--shapes', type=str, default='all',
+                      help=f'Comma separated list of: {", ".join(SHAPES)}. Default: all')
+  parser.add_argument('--sizes', type=str, default='50,100,200',
+                      help='Comma separated list of workspace sizes.')
+  parser.add_argument(
+      '--repeat', type=int, default=3,
+      help='Run each benchmark this many times and keep the fastest time of each step.')
+  parser.add_argument('--import_repeat', type=int, default=10,
+                      help='Measure the time of "import lynx.kite" this many times.')
+  parser.add_argument('--tolerance', type=float,
+                      help='Fail if a step grows faster than size^(expected + tolerance).')
+  parser.add_argument('--output', type=str, help='Save the results to this JSON file.')
+  parser.add_argument('--compare', type=str, help='Compare with the results in this JSON file.')
+  args = parser.parse_args()
+  shapes = list(SHAPES) if args.shapes == 'all' else args.shapes.split(',')
+  unknown = [s for s in shapes if s not in SHAPES]
+  assert not unknown, f'Unknown shape(s): {unknown}\nAvailable: {list(SHAPES)}'
+  sizes = sorted(int(float(s)) for s in args.sizes.split(','))
+  # Deep workspaces are walked recursively.
+  sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * max(sizes) + 1000))
+  lk = offline_lk()
+
+  import_seconds, loaded = import_time(args.import_repeat)
+  print(f'import lynx.kite: {import_seconds:.4f} s')
+  if loaded:
+    print(f'Slow modules loaded by the import: {", ".join(loaded)}')
+  results = []
+  too_slow = []
+  print(f'{"shape":7} {"size":>7}' + ''.join(f' {s + " (s)":>14}' for s in STEPS))
+  for shape in shapes:
+    previous = None
+    for size in sizes:
+      runs = [run(lk, shape, size) for _ in range(args.repeat)]
+      r = dict(shape=shape, size=size, **{s: min(t[s] for t in runs) for s in STEPS})
+      results.append(r)
+      print(f'{shape:7} {size:>7}' + ''.join(f' {r[s]:14.4f}' for s in STEPS))
+      if previous:
+        exponents = {s: exponent(previous[s], previous['size'], r[s], size) for s in STEPS}
+        print(f'{"":7} {"growth":>7}' + ''.join(f' {"n^%.2f" % exponents[s]:>14}' for s in STEPS))
+        if args.tolerance is not None:
+          expected = EXPECTED_EXPONENTS[shape]
+          too_slow.extend(
+              f'{shape} {s}: n^{k:.2f} from {previous["size"]} to {size}, expected n^{expected[s]}'
+              for s, k in exponents.items() if k > expected[s] + args.tolerance)
+      previous = r
+  if args.output:
+    metadata = benchmark_results.metadata(repeat=args.repeat)
+    benchmark_results.save(args.output, metadata, results, import_seconds=import_seconds)
+  if args.compare:
+    compare(args.compare, import_seconds, results)
+  if too_slow:
+    sys.exit('Steps growing faster than expected:\n' + '\n'.join(too_slow))
+
+
+if __name__ == '__main__':
+  sys.path.append(os.path.join(HERE, '..', '..', 'tools'))
+  import benchmark_results
+  main()
@@ -15,7 +15,7 @@ setup(
             'mypy',
         ]
     },
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     packages=find_namespace_packages('src'),
     package_dir={'': 'src'},
     author='Lynx Analytics',
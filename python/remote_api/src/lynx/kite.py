@@ -18,25 +18,33 @@ Example usage::
     lk = lynx.kite.LynxKite()
     lk.createExampleGraph().sql('select * from graph_attributes').df()
 '''
+import concurrent.futures
 import copy
 import functools
+import gzip
+import hashlib
+import heapq
 import json
 import os
 import random
 import sys
+import time
 import types
 import datetime
 import inspect
 import re
 import itertools
-from collections import deque, defaultdict, Counter
+from collections import deque, defaultdict, Counter, OrderedDict
 from typing import (Dict, List, Union, Callable, Any, Tuple, Iterable, Set, NewType, Iterator,
-                    TypeVar, Optional, Collection)
-import requests
+                    TypeVar, Optional, Collection, AsyncIterator, TYPE_CHECKING)
 from tempfile import NamedTemporaryFile, TemporaryDirectory, mkstemp
 import textwrap
+import threading
 import shutil
-import lynx.operations
+# Modules that take long to import are imported where they are used, so that "import lynx.kite"
+# is fast. lynx.operations is only needed for the documentation of the operations.
+if TYPE_CHECKING:
+  import requests
 
 
 if sys.version_info.major < 3 or (sys.version_info.major == 3 and sys.version_info.minor < 6):
@@ -47,8 +55,9 @@ def random_filename() -> str:
   return ''.join(random.choices('0123456789ABCDEF', k=16))
 
 
-def _random_ws_folder() -> str:
-  return 'tmp_workspaces/{}'.format(random_filename())
+def _content_ws_folder(ws: 'Workspace') -> str:
+  '''A folder for saving the workspace that only depends on its contents.'''
+  return 'tmp_workspaces/{}'.format(_json_hash(_workspace_structure(ws))[:32])
 
 
 def _normalize_path(path: str) -> str:
@@ -63,14 +72,18 @@ def _assert_lk_success(output, box_id, plug):
     raise LynxException(msg)
 
 
+@functools.lru_cache(maxsize=None)
+def _operation_docs() -> Dict[str, str]:
+  '''The documentation of the operations by their Python names. Loaded on first use.'''
+  import lynx.operations
+  return {name: fn.__doc__ for (name, fn) in vars(lynx.operations).items()
+          if inspect.isfunction(fn)}
+
+
 def _add_documentation_to_operation(f: Callable, name: str):
   '''Sets the documentation on a given operation.'''
   f.__name__ = name
-
-  if hasattr(lynx.operations, name):
-    f.__doc__ = getattr(lynx.operations, name).__doc__
-  else:
-    f.__doc__ = f'No documentation available for this operation.'
+  f.__doc__ = _operation_docs().get(name, 'No documentation available for this operation.')
 
 
 def escape(s: Union[str, 'ParametricParameter']) -> Union[str, 'ParametricParameter']:
@@ -298,9 +311,15 @@ class BoxCatalog:
   def operation_id(self, name: str) -> str:
     return self.bc[name].operationId
 
+  def category_id(self, name: str) -> Optional[str]:
+    return getattr(self.bc[name], 'categoryId', None)
+
   def box_names(self) -> List[str]:
     return list(self.bc.keys())
 
+  def __contains__(self, name: str) -> bool:
+    return name in self.bc
+
 
 SerializedBox = NewType('SerializedBox', Dict[str, Any])
 
@@ -324,11 +343,23 @@ class LynxKite:
   provided, then a connection is created using the following environment variables:
   ``LYNXKITE_ADDRESS``, ``LYNXKITE_USERNAME``, ``LYNXKITE_PASSWORD``,
   ``LYNXKITE_PUBLIC_SSL_CERT``, ``LYNXKITE_OAUTH_TOKEN``, ``LYNXKITE_SIGNED_TOKEN``.
+
+  The box catalog is cached on disk for each LynxKite address and version, so new connections
+  only need to fetch it once. The cache is in ``LYNXKITE_CACHE_DIR`` or in ``~/.cache/lynxkite``.
+  Set ``cache_box_catalog=False`` to always fetch the box catalog.
+
+  The connection can be used from multiple threads. They share a pool of at most ``pool_size``
+  HTTP connections. Requests time out if the connection cannot be established in
+  ``connect_timeout`` seconds, or if LynxKite does not respond in ``read_timeout`` seconds. By
+  default there is no read timeout, since computations can take a long time. If LynxKite is
+  unavailable, requests are retried up to ``max_retries`` times with exponential backoff.
   '''
 
   def __init__(self, username: str = None, password: str = None, address: str = None,
                certfile: str = None, oauth_token: str = None, signed_token: str = None,
-               box_catalog: BoxCatalog = None) -> None:
+               box_catalog: BoxCatalog = None, pool_size: int = 16,
+               connect_timeout: float = 60, read_timeout: float = None,
+               max_retries: int = 5, cache_box_catalog: bool = True) -> None:
     '''Creates a connection object.'''
     # Authentication and querying environment variables is deferred until the
     # first request.
@@ -339,8 +370,13 @@ class LynxKite:
     self._oauth_token = oauth_token
     self._signed_token = signed_token
     self._session = None
+    self._session_lock = threading.Lock()
     self._pid = None
+    self._pool_size = pool_size
+    self._timeout = (connect_timeout, read_timeout)
+    self._max_retries = max_retries
     self._operation_names: List[str] = []
+    self._operation_name_set: Set[str] = set()
     self._import_box_names: List[str] = [
         'importCSV', 'importJDBC', 'importJSON',
         'importORC', 'importParquet', 'importFromHive',
@@ -348,7 +384,21 @@ class LynxKite:
     self._export_box_names: List[str] = [
         'exportToCSV', 'exportToJSON', 'exportToParquet',
         'exportToJDBC', 'exportToORC', 'exportToHive']
+    self._import_operations = set(self.import_operation_names())
+    self._export_operations = set(self.export_operation_names())
     self._box_catalog = box_catalog  # TODO: create standard offline box catalog
+    self._cache_box_catalog = cache_box_catalog
+    # State IDs by the structural key of the state. Unfinished requests are also here, so concurrent
+    # requests for the same state can wait for the same response. The least recently used ones are
+    # dropped when there are more than STATE_ID_CACHE_SIZE.
+    self._state_ids: 'OrderedDict[str, concurrent.futures.Future]' = OrderedDict()
+    self._state_ids_lock = threading.Lock()
+    # Hashes of the workspaces we have saved, by path.
+    self._saved_workspaces: Dict[str, str] = {}
+    self._saved_workspaces_lock = threading.Lock()
+    # Incremented on every login. Requests rejected before the latest login do not log in again.
+    self._logins = 0
+    self._login_lock = threading.RLock()
 
   def home(self) -> str:
     return f'Users/{self.username()}/'
@@ -357,8 +407,15 @@ class LynxKite:
     if not self._operation_names:
       box_names = self.box_catalog().box_names()
       self._operation_names = box_names + self.import_operation_names() + self.export_operation_names()
+      self._operation_name_set = set(self._operation_names)
     return self._operation_names
 
+  def is_operation(self, name: str) -> bool:
+    '''Whether ``name`` is in ``operation_names()``.'''
+    if not self._operation_name_set:
+      self.operation_names()
+    return name in self._operation_name_set
+
   def import_operation_names(self) -> List[str]:
     '''When we use an import operation instead of an import box,
     "run import" will be triggered automatically.'''
@@ -371,16 +428,36 @@ class LynxKite:
 
   def box_catalog(self) -> BoxCatalog:
     if not self._box_catalog:
-      bc = self._ask(
-          '/ajax/boxCatalog',
-          dict(ref=dict(top='', customBoxStack=[]))).boxes
-      boxes = {}
-      for box in bc:
-        if box.categoryId != 'Custom boxes':
-          boxes[_python_name(box.operationId)] = box
+      path = self._box_catalog_cache_path()
+      boxes = _read_box_catalog_cache(path) if path else None
+      if boxes is None:
+        bc = self._ask(
+            '/ajax/boxCatalog',
+            dict(ref=dict(top='', customBoxStack=[]))).boxes
+        boxes = {}
+        for box in bc:
+          if box.categoryId != 'Custom boxes':
+            boxes[_python_name(box.operationId)] = box
+        if path:
+          _write_box_catalog_cache(path, boxes)
       self._box_catalog = BoxCatalog(boxes)
     return self._box_catalog
 
+  def _box_catalog_cache_path(self) -> Optional[str]:
+    '''The file where the box catalog is cached. None if it should not be cached.'''
+    if not self._cache_box_catalog:
+      return None
+    version = self.server_version().strip()
+    if not version:  # A development version. The boxes can change without a version change.
+      return None
+    key = _json_hash(dict(
+        format=BOX_CATALOG_CACHE_FORMAT, address=self.address().rstrip('/'), version=version))
+    return os.path.join(_cache_dir(), 'box_catalog', key[:32] + '.json')
+
+  def server_version(self) -> str:
+    '''The version of LynxKite. Empty for development versions.'''
+    return self._ask('/ajax/getGlobalSettings').version
+
   def __dir__(self) -> Iterable[str]:
     return itertools.chain(super().__dir__(), self.operation_names())
 
@@ -392,7 +469,7 @@ class LynxKite:
       return box
 
     def f(*args, **kwargs):
-      if name in self.import_operation_names():
+      if name in self._import_operations:
         real_name = name[:-len('Now')]
         box = add_box_with_inputs(real_name, args, kwargs)
         # If it is an import operation, we trigger the import here,
@@ -402,7 +479,7 @@ class LynxKite:
         import_result = self._send('/ajax/importBox', {'box': box_json})
         box.parameters['imported_table'] = import_result.guid
         box.parameters['last_settings'] = import_result.parameterSettings
-      elif name in self.export_operation_names():
+      elif name in self._export_operations:
         # If it is an export operation, we trigger the export here.
         box = getattr(self, name[:-len('Now')])(*args, **kwargs)
         box.trigger()
@@ -412,7 +489,7 @@ class LynxKite:
 
     if name.startswith('_'):  # To avoid infinite recursion in copy/deepcopy
       raise AttributeError()
-    elif name not in self.operation_names():
+    elif not self.is_operation(name):
       raise AttributeError('{} is not defined'.format(name))
     _add_documentation_to_operation(f, name)
     return f
@@ -472,6 +549,8 @@ class LynxKite:
     return self._signed_token or os.environ.get('LYNXKITE_SIGNED_TOKEN')
 
   def _login(self):
+    # We may be talking to a restarted LynxKite that does not know the cached state IDs.
+    self.clear_state_id_cache()
     if self.password():
       r = self._request(
           '/passwordLogin',
@@ -496,29 +575,73 @@ class LynxKite:
   def _get_session(self):
     '''Create a new session or return the cached one. If the process was forked (if the pid
     has changed), then the cache is invalidated. See issue #5436.'''
-    if self._session is None or self._pid != os.getpid():
-      self._session = requests.Session()
-      self._pid = os.getpid()
-    return self._session
+    with self._session_lock:
+      if self._session is None or self._pid != os.getpid():
+        import requests
+        import requests.adapters
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self._pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        self._session = session
+        self._pid = os.getpid()
+      return self._session
 
   def __del__(self) -> None:
     if self._session:
       self._session.close()
 
-  def _method(self, method, endpoint, **kwargs):
-    '''Sends an HTTP request to LynxKite and returns the response when it arrives.'''
-    max_tries = 3
-    for i in range(max_tries):
-      r = getattr(self._get_session(), method)(
-          self.address().rstrip('/') + '/' + endpoint.lstrip('/'),
-          verify=self.certfile(),
-          allow_redirects=False,
-          **kwargs)
+  def _relogin(self, logins: int) -> None:
+    '''Logs in again, unless another thread has logged in since ``logins`` was read.'''
+    with self._login_lock:
+      if self._logins == logins:
+        self._login()
+        self._logins += 1
+
+  def _backoff(self, retries: int) -> None:
+    '''Waits before the next retry. The wait doubles with each retry and is randomized, so that
+    many clients do not retry at the same time.'''
+    wait = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**retries)
+    time.sleep(random.uniform(wait / 2, wait))
+
+  def _method(self, method, endpoint, retry_read_timeout=True, **kwargs):
+    '''Sends an HTTP request to LynxKite and returns the response when it arrives.
+
+    Logs in again if the session has expired. Retries with backoff if LynxKite is unavailable
+    or the connection fails. A POST is only retried if LynxKite cannot have processed it: if the
+    connection failed before it was sent, or if the response is ``POST_RETRY_STATUS_CODES``.
+    With ``retry_read_timeout=False`` a read timeout is raised without retrying.
+    '''
+    import requests
+    kwargs.setdefault('timeout', self._timeout)
+    retry_status_codes = RETRY_STATUS_CODES if method == 'get' else POST_RETRY_STATUS_CODES
+    logins_left = 2
+    retries = 0
+    while True:
+      logins = self._logins
+      try:
+        r = getattr(self._get_session(), method)(
+            self.address().rstrip('/') + '/' + endpoint.lstrip('/'),
+            verify=self.certfile(),
+            allow_redirects=False,
+            **kwargs)
+      except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        retriable = (method == 'get' or not _request_sent(e)) and (
+            retry_read_timeout or not isinstance(e, requests.exceptions.ReadTimeout))
+        if retriable and retries < self._max_retries:
+          self._backoff(retries)
+          retries += 1
+          continue
+        raise
       if r.status_code < 400:
         return r
-      if r.status_code == 401 and i + 1 < max_tries:  # Unauthorized.
-        self._login()
-        # And then retry via the "for" loop.
+      if r.status_code == 401 and logins_left > 0:  # Unauthorized.
+        logins_left -= 1
+        self._relogin(logins)
+        # And then retry via the "while" loop.
+      elif r.status_code in retry_status_codes and retries < self._max_retries:
+        self._backoff(retries)
+        retries += 1
       elif r.status_code == 500:  # Internal server error.
         raise LynxException(r.text)
       else:
@@ -530,26 +653,34 @@ class LynxKite:
   def _get(self, endpoint, **kwargs):
     return self._method('get', endpoint, **kwargs)
 
-  def _request(self, endpoint, payload={}):
-    '''Sends an HTTP JSON request to LynxKite and returns the response when it arrives.'''
-    data = json.dumps(payload, default=_json_encode)
-    return self._post(endpoint, data=data, headers={'Content-Type': 'application/json'})
+  def _request(self, endpoint, payload={}, compress=False):
+    '''Sends an HTTP JSON request to LynxKite and returns the response when it arrives.
 
-  def _send(self, command, payload={}, raw=False):
+    With ``compress=True`` large requests are gzipped.
+    '''
+    data: Union[str, bytes] = json.dumps(payload, default=_json_encode)
+    headers = {'Content-Type': 'application/json'}
+    if compress and len(data) >= GZIP_MIN_BYTES:
+      data = gzip.compress(data.encode())
+      headers['Content-Encoding'] = 'gzip'
+    return self._post(endpoint, data=data, headers=headers)
+
+  def _send(self, command, payload={}, raw=False, compress=False):
     '''Sends a command to LynxKite and returns the response when it arrives.'''
-    data = self._request(command, payload).text
+    data = self._request(command, payload, compress).text
     if raw:
       r = json.loads(data)
     else:
       r = json.loads(data, object_hook=_asobject)
     return r
 
-  def _ask(self, command, payload={}):
-    '''Sends a JSON GET request.'''
+  def _ask(self, command, payload={}, **kwargs):
+    '''Sends a JSON GET request. The keyword arguments are passed to ``_method()``.'''
     resp = self._get(
         command,
         params=dict(q=json.dumps(payload, default=_json_encode)),
-        headers={'X-Requested-With': 'XMLHttpRequest'})
+        headers={'X-Requested-With': 'XMLHttpRequest'},
+        **kwargs)
     return json.loads(resp.text, object_hook=_asobject)
 
   def get_directory_entry(self, path: str):
@@ -574,6 +705,11 @@ class LynxKite:
 
   def remove_name(self, name: str, force: bool = False):
     '''Removes an object named ``name``.'''
+    prefix = _normalize_path(name) + '/'
+    with self._saved_workspaces_lock:
+      self._saved_workspaces = {
+          path: digest for (path, digest) in self._saved_workspaces.items()
+          if path != prefix[:-1] and not path.startswith(prefix)}
     return self._send('/remote/removeName', dict(name=name, force=force))
 
   def change_acl(self, file: str, readACL: str, writeACL: str):
@@ -635,8 +771,19 @@ class LynxKite:
 
   def save_workspace_recursively(self, ws: 'Workspace',
                                  save_under_root: str = None) -> Tuple[str, str]:
+    '''Saves the workspace and the workspaces of its custom boxes under ``save_under_root``.
+
+    If ``save_under_root`` is not set, a folder under ``tmp_workspaces`` is used that is named
+    after the hash of the workspace. Saving an identical workspace again, even from another
+    process, reuses the same folder. Workspaces that are already saved there with the same boxes
+    are not sent again.
+
+    The workspaces of the custom boxes are saved concurrently. Workspaces are not sent again if
+    this connection has already saved them with the same contents.
+    '''
+    content_addressed = save_under_root is None
     if save_under_root is None:
-      ws_root = _random_ws_folder()
+      ws_root = _content_ws_folder(ws)
     else:
       ws_root = save_under_root
     main_name = ws.safename()
@@ -652,28 +799,60 @@ class LynxKite:
     if main_name in names:
       raise Exception(f'Duplicate name: {main_name}')
 
-    for name, rws in needed_ws:
-      self.save_workspace(ws_root + '/' + name, _layout(rws.to_json(ws_root, name)))
-
-    self.save_workspace(
-        ws_root + '/' + main_name, _layout(ws.to_json(ws_root, main_name)))
+    def save(name, rws):
+      self._save_workspace_if_changed(
+          ws_root + '/' + name, _layout(rws.to_json(ws_root, name)), content_addressed)
+    with concurrent.futures.ThreadPoolExecutor(SAVE_WORKSPACE_THREADS) as pool:
+      # Raise the first error, if any.
+      list(pool.map(lambda nw: save(*nw), needed_ws))
+    # The main workspace is saved last, when its custom boxes exist.
+    save(main_name, ws)
 
     # We return the root directory and full name of the saved main workspace
     return (ws_root,
             _normalize_path(ws_root + '/' + main_name))
 
+  def _save_workspace_if_changed(
+          self, path: str, boxes: List[SerializedBox], content_addressed: bool):
+    '''Saves the workspace unless it is already saved with the same boxes.
+
+    A content-addressed path may have been saved by another connection. The boxes saved there are
+    compared with ``boxes``, because an interrupted save can leave an empty or partial workspace.
+    '''
+    path = _normalize_path(path)
+    digest = _boxes_digest(boxes)
+    with self._saved_workspaces_lock:
+      if self._saved_workspaces.get(path) == digest:
+        return
+    if not (content_addressed and self._saved_workspace_digest(path) == digest):
+      self.save_workspace(path, boxes)
+    with self._saved_workspaces_lock:
+      self._saved_workspaces[path] = digest
+
+  def _saved_workspace_digest(self, path: str) -> Optional[str]:
+    '''The ``_boxes_digest()`` of the workspace saved at ``path``. None if there is none.'''
+    entry = self.get_directory_entry(path)
+    if not (entry.exists and entry.isWorkspace):
+      return None
+    return _boxes_digest(to_simple_dicts(self.get_workspace_boxes(path)))
+
   def recursively_collect_customboxes(
           self, ws: 'Workspace', path) -> Set[Tuple[str, 'CustomBox']]:
     collected: Set[Tuple[str, CustomBox]] = set()
-    for box in ws.custom_boxes():
-      if box.workspace.name:
-        box_path = box.workspace.name
-      else:
-        box_path = f'{path}_subs/{ws.id_of(box)}'
-      if (box_path, box.workspace) in collected:
-        continue
-      collected.add((box_path, box))
-      collected.update(self.recursively_collect_customboxes(box.workspace, box_path))
+    # A workspace used by many custom boxes is only walked once for each path.
+    visited: Set[Tuple[str, Workspace]] = set()
+    to_process = [(ws, path)]
+    while to_process:
+      ws, path = to_process.pop()
+      for box in ws.custom_boxes():
+        if box.workspace.name:
+          box_path = box.workspace.name
+        else:
+          box_path = f'{path}_subs/{ws.id_of(box)}'
+        collected.add((box_path, box))
+        if (box_path, box.workspace) not in visited:
+          visited.add((box_path, box.workspace))
+          to_process.append((box.workspace, box_path))
     return collected
 
   def fetch_workspace_output_states(self, ws: 'Workspace',
@@ -684,7 +863,47 @@ class LynxKite:
     # TODO: clean up saved workspaces if save_under_root is not set.
 
   def get_state_id(self, state: 'State') -> str:
+    '''Returns the ID of the state in LynxKite.
+
+    The IDs are cached by the structure of the boxes leading to the state. Asking again for the
+    same state or for an identical one built separately does not send the workspace again. If
+    another thread is already asking for the same state, this waits for its response.
+
+    States that read snapshots or saved workspaces by their path are not cached. (See
+    ``_reads_paths()``.) The same boxes give a different state when the path is overwritten.
+    '''
     ws = Workspace(terminal_boxes=[state.box], name='Anonymous')
+    if _reads_paths(ws):
+      return self._fetch_state_id(ws, state)
+    key = _structural_key(ws, state)
+    with self._state_ids_lock:
+      future = self._state_ids.get(key)
+      owner = future is None
+      if owner:
+        future = concurrent.futures.Future()
+        self._add_state_id(key, future)
+      else:
+        self._state_ids.move_to_end(key)
+    if owner:
+      try:
+        future.set_result(self._fetch_state_id(ws, state))
+      except BaseException as e:
+        future.set_exception(e)
+        with self._state_ids_lock:
+          if self._state_ids.get(key) is future:
+            del self._state_ids[key]  # Failures are not cached.
+    return future.result()
+
+  def _add_state_id(self, key: str, future: concurrent.futures.Future) -> None:
+    '''Adds a state ID to the cache and drops the least recently used ones if it is full.
+
+    Must be called with ``_state_ids_lock`` held.
+    '''
+    self._state_ids[key] = future
+    while len(self._state_ids) > STATE_ID_CACHE_SIZE:
+      self._state_ids.popitem(last=False)
+
+  def _fetch_state_id(self, ws: 'Workspace', state: 'State') -> str:
     workspace_outputs = self.fetch_workspace_output_states(ws)
     box_id = ws.id_of(state.box)
     plug = state.output_plug_name
@@ -692,6 +911,135 @@ class LynxKite:
     _assert_lk_success(output, box_id, plug)
     return output.stateId
 
+  def clear_state_id_cache(self) -> None:
+    '''Forgets the cached state IDs. LynxKite forgets them when it is restarted.'''
+    with self._state_ids_lock:
+      self._state_ids = OrderedDict(
+          (k, f) for (k, f) in self._state_ids.items() if not f.done())
+
+  def _get_state_ids(self, states: List['State']) -> List[Union[str, Exception]]:
+    '''Returns the IDs of the states. The ones that are not cached are fetched with one request.
+
+    If a state fails, its result is the exception instead of an ID.
+    '''
+    keys = [_state_id_cache_key(s) for s in states]
+    ids: List[Union[str, Exception, None]] = [None] * len(states)
+    with self._state_ids_lock:
+      for i, key in enumerate(keys):
+        future = self._state_ids.get(key) if key else None
+        if future and future.done() and not future.exception():
+          ids[i] = future.result()
+          self._state_ids.move_to_end(key)
+    missing = [i for i, state_id in enumerate(ids) if state_id is None]
+    boxes = list(dict.fromkeys(states[i].box for i in missing))
+    if boxes:
+      ws = Workspace(terminal_boxes=boxes, name='Anonymous')
+      outputs = self.fetch_workspace_output_states(ws)
+      for i in missing:
+        box_id = ws.id_of(states[i].box)
+        plug = states[i].output_plug_name
+        try:
+          _assert_lk_success(outputs[box_id, plug], box_id, plug)
+        except LynxException as e:
+          ids[i] = e
+          continue
+        ids[i] = outputs[box_id, plug].stateId
+        if keys[i] is None:
+          continue
+        with self._state_ids_lock:
+          if keys[i] not in self._state_ids:
+            future = concurrent.futures.Future()
+            future.set_result(ids[i])
+            self._add_state_id(keys[i], future)
+    return ids  # type: ignore
+
+  def fetch_many(self, states: List['State'], limit: int = -1, method: str = 'json',
+                 threads: int = 8) -> List[Any]:
+    '''Returns the Pandas DataFrames of many table states.
+
+    The IDs of all the states are fetched with one request. Then the tables are downloaded
+    concurrently on ``threads`` threads. ``limit`` and ``method`` are the same as for
+    ``State.df()``.
+
+    The results are in the order of ``states``. If a state fails, its result is the exception
+    instead of a DataFrame. The other states are not affected.
+    '''
+    method = _df_method(limit, method)
+    if method == 'parquet' and limit >= 0:
+      states = [s.sql(f'select * from input limit {limit}') for s in states]
+
+    def fetch(state_id):
+      if isinstance(state_id, Exception):
+        return state_id
+      try:
+        return self.state_id_to_df(state_id, limit, method)
+      except Exception as e:
+        return e
+    state_ids = self._get_state_ids(states)
+    with concurrent.futures.ThreadPoolExecutor(threads) as pool:
+      return list(pool.map(fetch, state_ids))
+
+  def progress_updates(self, states: List['State'], until_done: bool = True,
+                       timeout: float = None) -> Iterator[Tuple['State', List[float]]]:
+    '''Yields ``(state, progress)`` pairs as the computation of the states progresses.
+
+    The progress is a list of numbers, one for each part of the state. 1 means done, -1 means
+    failed. The state IDs are fetched once, then one long-poll request is kept open for all the
+    states. A state is reported when its progress changes. This does not start the computation.
+
+    Parts shared by multiple states are only listed in the progress of the first of these states.
+    With ``until_done=True`` this returns when all the states are done or failed. Otherwise it
+    keeps watching forever. A state that nobody computes is never done, so this returns after
+    ``timeout`` seconds if it is set, even if the states are not done.
+
+    The long-poll request has no read timeout, because LynxKite only responds when there is a
+    change. The ``read_timeout`` of the connection does not apply to it.
+    '''
+    import requests
+    deadline = None if timeout is None else time.monotonic() + timeout
+    state_ids = self._get_state_ids(states)
+    progress: Dict[int, List[float]] = {}
+    for i, state_id in enumerate(state_ids):
+      if isinstance(state_id, Exception):
+        progress[i] = [-1.0]
+        yield states[i], progress[i]
+    watched = [i for i in range(len(states)) if i not in progress]
+    synced_until = 0
+    while watched:
+      read_timeout = None if deadline is None else deadline - time.monotonic()
+      if read_timeout is not None and read_timeout <= 0:
+        return
+      try:
+        r = self._ask(
+            '/ajax/long-poll',
+            dict(syncedUntil=synced_until, stateIds=[state_ids[i] for i in watched]),
+            timeout=(self._timeout[0], read_timeout), retry_read_timeout=False)
+      except requests.exceptions.ReadTimeout:
+        return  # Only possible with a deadline. Nothing has changed until then.
+      synced_until = r.sparkStatus.timestamp
+      for i in watched:
+        p = r.progress.__dict__[state_ids[i]]
+        if p != progress.get(i):
+          progress[i] = p
+          yield states[i], p
+      if until_done and all(_progress_done(p) for p in progress.values()):
+        return
+
+  def watch(self, states: List['State'], callback: Callable[['State', List[float]], Any],
+            until_done: bool = True, timeout: float = None) -> None:
+    '''Calls ``callback(state, progress)`` with the updates from ``progress_updates()``.'''
+    for state, progress in self.progress_updates(states, until_done, timeout):
+      callback(state, progress)
+
+  def state_id_to_df(self, state: str, limit: int = -1, method: str = 'json'):
+    '''Returns a Pandas DataFrame of a table state by its ID. See ``State.df()``.
+
+    With ``method='parquet'`` the ``limit`` is ignored.
+    '''
+    if _df_method(limit, method) == 'parquet':
+      return _parquet_to_df(self.download_table(state))
+    return _table_data_to_df(self.get_table_data(state, limit))
+
   def get_graph_attribute(self, guid: str) -> types.SimpleNamespace:
     return self._ask('/ajax/scalarValue', dict(scalarId=guid))
 
@@ -704,6 +1052,11 @@ class LynxKite:
   def get_table_data(self, state: str, limit: int = -1) -> types.SimpleNamespace:
     return self._ask('/ajax/getTableOutput', dict(id=state, sampleRows=limit))
 
+  def download_table(self, state: str) -> bytes:
+    '''Returns the whole table as the contents of a Parquet file.'''
+    return self._get(
+        'downloadTable', params=dict(q=json.dumps(dict(id=state, sampleRows=-1)))).content
+
   def get_workspace(self, path: str, stack: List[str] = []) -> types.SimpleNamespace:
     return self._ask('/ajax/getWorkspace', dict(top=path, customBoxStack=stack))
 
@@ -746,7 +1099,8 @@ class LynxKite:
       self._send('/ajax/createWorkspace', dict(name=path))
     return self._send(
         '/ajax/setWorkspace',
-        dict(reference=dict(top=path, customBoxStack=[]), workspace=dict(boxes=boxes)))
+        dict(reference=dict(top=path, customBoxStack=[]), workspace=dict(boxes=boxes)),
+        compress=True)
 
   def save_snapshot(self, path: str, stateId: str):
     return self._send(
@@ -843,6 +1197,98 @@ class LynxKite:
     return self._send('/remote/setExecutors', {'count': count})
 
 
+class AsyncLynxKite:
+  '''An asyncio interface to a LynxKite connection.
+
+  Boxes are built the same way as with ``LynxKite``. The methods that talk to LynxKite are
+  coroutines. They run on a thread pool, so at most ``max_concurrency`` of them are waiting for
+  LynxKite at a time. The session, the login and the caches are shared with the underlying
+  ``LynxKite`` object, available as ``alk.lk``. Example use::
+
+    alk = AsyncLynxKite()
+    eg = alk.createExampleGraph()
+    dfs = await asyncio.gather(*[
+        alk.df(eg.sql(f'select * from vertices where age > {age}')) for age in range(100)])
+
+  The keyword arguments other than ``lk`` and ``max_concurrency`` are passed to ``LynxKite()``.
+  Its ``pool_size`` defaults to ``max_concurrency``.
+  Operations like ``importCSVNow`` block while they talk to LynxKite. Use ``run()`` to run them
+  and other ``LynxKite`` methods on the thread pool.
+  '''
+
+  def __init__(self, lk: LynxKite = None, max_concurrency: int = 16, **kwargs) -> None:
+    assert lk is None or not kwargs, 'Pass either a LynxKite object or its arguments.'
+    if lk is None:
+      # Each thread may need a connection.
+      kwargs.setdefault('pool_size', max_concurrency)
+      lk = LynxKite(**kwargs)
+    self.lk = lk
+    self._executor = concurrent.futures.ThreadPoolExecutor(
+        max_concurrency, thread_name_prefix='lynxkite')
+
+  def __dir__(self) -> Iterable[str]:
+    return itertools.chain(super().__dir__(), ['sql'], self.lk.operation_names())
+
+  def __getattr__(self, name) -> Callable:
+    if name.startswith('_') or not (name == 'sql' or self.lk.is_operation(name)):
+      raise AttributeError(f'{name} is not defined')
+    return getattr(self.lk, name)
+
+  async def __aenter__(self) -> 'AsyncLynxKite':
+    return self
+
+  async def __aexit__(self, *exc_info) -> None:
+    # The running calls are waited for on another thread, so the event loop is not blocked.
+    import asyncio
+    await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+  def close(self) -> None:
+    '''Shuts down the thread pool. Waits for the running calls.'''
+    self._executor.shutdown()
+
+  async def run(self, fn: Callable, *args, **kwargs):
+    '''Runs a blocking function on the thread pool and returns its result.'''
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+  async def get_state_id(self, state: 'State') -> str:
+    return await self.run(self.lk.get_state_id, state)
+
+  async def df(self, state: 'State', limit: int = -1, method: str = 'json'):
+    '''Returns a Pandas DataFrame if the state is a table. See ``State.df()``.'''
+    return await self.run(state.df, limit, method)
+
+  async def compute(self, state: 'State') -> None:
+    '''Triggers the computation of the state.'''
+    await self.run(state.compute)
+
+  async def trigger(self, target: Union['Box', 'Workspace']) -> None:
+    '''Triggers a triggerable box, or all the side effects of a workspace.'''
+    if isinstance(target, Workspace):
+      await self.run(target.trigger_all_side_effects)
+    else:
+      await self.run(target.trigger)
+
+  async def download_file(self, path: str) -> bytes:
+    return await self.run(self.lk.download_file, path)
+
+  async def watch(self, states: List['State'], until_done: bool = True,
+                  timeout: float = None) -> AsyncIterator[Tuple['State', List[float]]]:
+    '''Yields ``(state, progress)`` pairs like ``LynxKite.progress_updates()``. Example use::
+
+      async for state, progress in alk.watch(states):
+        print(state, sum(progress) / len(progress))
+    '''
+    updates = self.lk.progress_updates(states, until_done, timeout)
+    end = object()
+    while True:
+      update = await self.run(next, updates, end)
+      if update is end:
+        return
+      yield update
+
+
 class State:
   '''Represents a named output plug of a box.
 
@@ -860,7 +1306,7 @@ class State:
   def __getattr__(self, name: str) -> Callable:
 
     def f(**kwargs):
-      if name in self.box.lk.export_operation_names():
+      if name in self.box.lk._export_operations:
         export_box = getattr(self, name[:-len('Now')])(**kwargs)
         export_box.trigger()
         return export_box
@@ -879,7 +1325,7 @@ class State:
 
     if name.startswith('_'):  # To avoid infinite recursion in copy/deepcopy
       raise AttributeError()
-    elif name not in self.operation_names():
+    elif not (name in self.box.bc or name in self.box.lk._export_operations):
       raise AttributeError('{} is not defined on {}'.format(name, self))
     _add_documentation_to_operation(f, name)
     return f
@@ -930,25 +1376,23 @@ class State:
     '''Same as ``x.sql('select * from input', persist='yes')``.'''
     return self.sql('select * from input', persist='yes')
 
-  def df(self, limit: int = -1):
-    '''Returns a Pandas DataFrame if this state is a table.'''
-    import pandas
+  def df(self, limit: int = -1, method: str = 'json'):
+    '''Returns a Pandas DataFrame if this state is a table.
 
-    def get(v, t):
-      if not v.defined:
-        return None
-      if hasattr(v, 'double'):
-        return v.double
-      elif t == 'java.math.BigDecimal':
-        return float(v.string)
-      else:
-        return v.string
+    ``method`` selects how the table is fetched:
 
-    table = self.get_table_data(limit)
-    header = [c.name for c in table.header]
-    types = [c.dataType for c in table.header]
-    data = [[get(c, t) for (c, t) in zip(r, types)] for r in table.data]
-    return pandas.DataFrame(data, columns=header)
+    - ``'json'``: The rows are sent as JSON. Numbers are returned as floats, everything else as
+      strings.
+    - ``'parquet'``: LynxKite writes the table to a Parquet file and the file is downloaded. This is
+      much faster for large tables and keeps the column types, including decimals and nulls.
+      Integer and boolean columns with nulls get the nullable Pandas types. Needs PyArrow.
+    - ``'auto'``: Uses Parquet if PyArrow is installed and the result can have more than
+      ``PARQUET_DF_MIN_ROWS`` rows. Uses JSON otherwise.
+    '''
+    method = _df_method(limit, method)
+    if method == 'parquet' and limit >= 0:
+      return self.sql(f'select * from input limit {limit}').df(method='parquet')
+    return self.box.lk.state_id_to_df(self.box.lk.get_state_id(self), limit, method)
 
   def columns(self):
     '''Returns a list of columns if this state is a table.'''
@@ -1006,6 +1450,140 @@ class State:
     tss.save_to_sequence(state_id, date)
 
 
+# The number of workspaces saved at the same time by save_workspace_recursively().
+SAVE_WORKSPACE_THREADS = 8
+# Increment this when the format of the box catalog cache changes.
+BOX_CATALOG_CACHE_FORMAT = 1
+# The number of side effects triggered at the same time by Workspace.trigger_all_side_effects().
+# Side effects can also depend on each other through paths, like a snapshot that one of them
+# saves and another one imports. These dependencies are not visible in the boxes, so by default
+# the side effects are triggered one by one.
+TRIGGER_THREADS = 1
+# The number of state IDs cached by LynxKite.get_state_id().
+STATE_ID_CACHE_SIZE = 10000
+# These boxes read what is saved at a path when they run. Their outputs change when the path is
+# overwritten, so their state IDs are not cached. (The externalComputation boxes also read the
+# snapshot that the external computation saved.)
+PATH_READING_OPERATIONS = {'importSnapshot', 'importUnionOfTableSnapshots'}
+# State.df(method='auto') uses Parquet for tables that can be bigger than this.
+PARQUET_DF_MIN_ROWS = 10000
+# Requests are retried with backoff if LynxKite responds with these status codes.
+RETRY_STATUS_CODES = {502, 503, 504}
+# A proxy can respond with 502 or 504 after LynxKite got the request, so POST requests are only
+# retried on 503 (Service Unavailable).
+POST_RETRY_STATUS_CODES = {503}
+# The first and the longest wait between retries, in seconds.
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30
+# Workspaces bigger than this are gzipped when saved. (In bytes.)
+GZIP_MIN_BYTES = 64 * 1024
+
+
+def _cache_dir() -> str:
+  cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+  return os.environ.get('LYNXKITE_CACHE_DIR') or os.path.join(cache, 'lynxkite')
+
+
+def _read_box_catalog_cache(path: str) -> Optional[Dict[str, types.SimpleNamespace]]:
+  '''Returns the cached box catalog, or None if it is not cached.'''
+  try:
+    with open(path) as f:
+      cached = json.load(f, object_hook=_asobject)
+    if cached.format == BOX_CATALOG_CACHE_FORMAT:
+      return {name: box for (name, box) in cached.boxes}
+  except (OSError, ValueError, AttributeError, TypeError):
+    pass  # A missing or broken cache is the same as no cache.
+  return None
+
+
+def _write_box_catalog_cache(path: str, boxes: Dict[str, types.SimpleNamespace]) -> None:
+  '''Caches the box catalog. Failures are ignored, since the cache is only an optimization.'''
+  try:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = mkstemp(dir=os.path.dirname(path))
+  except OSError:
+    return
+  try:
+    with os.fdopen(fd, 'w') as f:
+      json.dump(dict(format=BOX_CATALOG_CACHE_FORMAT, boxes=list(boxes.items())), f,
+                default=_json_encode)
+    # Readers in other processes only see complete files.
+    os.replace(tmp, path)
+  except OSError:
+    os.remove(tmp)
+
+
+def _request_sent(e: 'requests.exceptions.RequestException') -> bool:
+  '''Whether the failed request may have reached LynxKite.'''
+  import requests
+  import urllib3
+  if isinstance(e, requests.exceptions.ConnectTimeout):
+    return False
+  reason = getattr(e.args[0], 'reason', None) if e.args else None
+  return not isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def _progress_done(progress: List[float]) -> bool:
+  '''Whether a state with this progress is done or failed.'''
+  return all(p == 1 for p in progress) or any(p < 0 for p in progress)
+
+
+def _df_method(limit: int, method: str) -> str:
+  '''Resolves the method for State.df().'''
+  assert method in ['json', 'parquet', 'auto'], f'Unknown method: {method}'
+  if method == 'auto':
+    big = limit < 0 or limit > PARQUET_DF_MIN_ROWS
+    return 'parquet' if big and _has_pyarrow() else 'json'
+  return method
+
+
+def _table_data_to_df(table: types.SimpleNamespace):
+  '''Converts the table data returned by LynxKite to a Pandas DataFrame.'''
+  import pandas
+
+  def get(v, t):
+    if not v.defined:
+      return None
+    if hasattr(v, 'double'):
+      return v.double
+    elif t == 'java.math.BigDecimal':
+      return float(v.string)
+    else:
+      return v.string
+
+  header = [c.name for c in table.header]
+  types = [c.dataType for c in table.header]
+  data = [[get(c, t) for (c, t) in zip(r, types)] for r in table.data]
+  return pandas.DataFrame(data, columns=header)
+
+
+def _has_pyarrow() -> bool:
+  try:
+    import pyarrow
+    return True
+  except ImportError:
+    return False
+
+
+def _parquet_to_df(data: bytes):
+  '''Converts the contents of a Parquet file to a Pandas DataFrame.'''
+  import io
+  import pandas
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+  table = pq.read_table(io.BytesIO(data))
+  df = table.to_pandas()
+  # Integers and booleans with nulls would become floats and objects. Use the nullable types.
+  nullable = {
+      pa.int8(): pandas.Int8Dtype(), pa.int16(): pandas.Int16Dtype(),
+      pa.int32(): pandas.Int32Dtype(), pa.int64(): pandas.Int64Dtype(),
+      pa.bool_(): pandas.BooleanDtype()}
+  for name, column in zip(table.column_names, table.columns):
+    if column.null_count and column.type in nullable:
+      df[name] = column.to_pandas(types_mapper=nullable.get)
+  return df
+
+
 class Placeholder:
   '''Universal placeholder. Use it whenever you need to hold a place.'''
 
@@ -1573,7 +2151,33 @@ class BoxPath:
 
   def __init__(self, base: Box, stack: List[CustomBox] = []) -> None:
     self.base = base
-    self.stack = stack
+    self._stack: Optional[List[CustomBox]] = stack
+    # Set instead of _stack by add_box_as_prefix(): the outermost box and the rest of the path.
+    self._prefix: Optional[Tuple[CustomBox, BoxPath]] = None
+    # BoxPaths are used as dict keys a lot, so we compute the hash only once. It is built from
+    # the inside out, so that add_box_as_prefix() can compute it without walking the stack.
+    h = hash(base)
+    for box in reversed(stack):
+      h = hash((box, h))
+    self._hash = h
+
+  @property
+  def stack(self) -> List[CustomBox]:
+    if self._stack is not None:
+      return self._stack
+    # Collect the prefixes without building the stacks of the intermediate paths. Nested custom
+    # boxes create many paths that only differ in their outer boxes.
+    stack: List[CustomBox] = []
+    bp = self
+    rest = None
+    while rest is None:
+      assert bp._prefix is not None
+      box, bp = bp._prefix
+      stack.append(box)
+      rest = bp._stack
+    self._stack = stack = stack + rest
+    self._prefix = None
+    return stack
 
   def __str__(self) -> str:
     workspaces = [cb.workspace for cb in self.stack]
@@ -1598,7 +2202,12 @@ class BoxPath:
     return '/'.join(ws.id_of(box) for ws, box in zip(workspaces, self.stack_and_base()))
 
   def add_box_as_prefix(self, box: CustomBox) -> 'BoxPath':
-    return BoxPath(self.base, [box] + self.stack)
+    bp = BoxPath.__new__(BoxPath)
+    bp.base = self.base
+    bp._stack = None
+    bp._prefix = (box, self)
+    bp._hash = hash((box, self._hash))
+    return bp
 
   def add_box_as_base(self, new_base: Box) -> 'BoxPath':
     """Takes a box inside the current base as the new base and puts the current base
@@ -1673,10 +2282,14 @@ class BoxPath:
     return dict(operation=op, params=op_param, nested_in=parent)
 
   def __hash__(self):
-    return hash(','.join([str(box) for box in self.stack] + [str(self.base)]))
+    return self._hash
 
   def __eq__(self, other):
-    return self.base == other.base and self.stack == other.stack
+    if not isinstance(other, BoxPath):
+      return NotImplemented
+    # Boxes are compared by identity.
+    return self is other or (
+        self._hash == other._hash and self.base is other.base and self.stack == other.stack)
 
   @staticmethod
   def dependencies(bps: Collection['BoxPath']) -> Dict['BoxPath', Set['BoxPath']]:
@@ -1686,25 +2299,59 @@ class BoxPath:
     dag: Dict[BoxPath, Set[BoxPath]] = {bp: set() for bp in bps}
     for bp, rep in bp_to_rep.items():
       rep_to_bps[rep].add(bp)
+    upstream = _UpstreamIndex(rep_to_bps)
     for bp in bps:
-      # Find dependencies of "bp" by searching the nodes upstream from its representative for
-      # representatives of other boxes in "bps".
+      # The dependencies of "bp" are the boxes in "bps" whose representatives are upstream from
+      # its representative.
       rep = bp_to_rep[bp]
-      if bp is not rep and rep in bps:
+      if bp is not rep and rep in bp_to_rep:
         assert bp_to_rep[rep] == rep, \
             f'If {rep} is the representative of {bp} it must also be its own representative.'
         dag[bp].add(rep)  # Our representative is in "bps". Depend on it.
-      to_process = deque(rep.parents())
-      visited: Set[BoxPath] = set()
-      while to_process:
-        box_path = to_process.pop()
-        visited.add(box_path)
-        if box_path in rep_to_bps:
-          dag[bp].update(rep_to_bps[box_path])
-        to_process.extend(p for p in box_path.parents() if p not in visited)
+      dag[bp].update(upstream.find(rep))
     return dag
 
 
+class _UpstreamIndex:
+  '''Finds the targets upstream from box paths.
+
+  The results are memoized for every box path visited, so the parents of each box path are only
+  computed once, no matter how many box paths share them upstream.
+  '''
+
+  def __init__(self, targets: Dict[BoxPath, Set[BoxPath]]) -> None:
+    self.targets = targets  # The boxes to collect when their key is found upstream.
+    self.parents: Dict[BoxPath, List[BoxPath]] = {}
+    self.upstream: Dict[BoxPath, Set[BoxPath]] = {}
+
+  def find(self, root: BoxPath) -> Set[BoxPath]:
+    '''Returns the targets of all the box paths upstream from "root". Do not modify the result.'''
+    # A depth-first search with an explicit stack, because workspaces can be very deep.
+    stack = [root]
+    while stack:
+      box_path = stack[-1]
+      if box_path in self.upstream:
+        stack.pop()
+        continue
+      if box_path not in self.parents:
+        self.parents[box_path] = box_path.parents()
+      parents = self.parents[box_path]
+      missing = [p for p in parents if p not in self.upstream]
+      if missing:
+        stack.extend(missing)
+        continue
+      stack.pop()
+      if len(parents) == 1 and parents[0] not in self.targets:
+        found = self.upstream[parents[0]]  # Nothing new. Share the set.
+      else:
+        found = set()
+        for p in parents:
+          found.update(self.targets.get(p, ()))
+          found.update(self.upstream[p])
+      self.upstream[box_path] = found
+    return self.upstream[root]
+
+
 class SideEffectCollector:
 
   AUTO: 'SideEffectCollector'  # For @subworkspace.
@@ -1767,6 +2414,7 @@ class Workspace:
     self._side_effect_paths = side_effect_paths
     self._terminal_boxes = terminal_boxes
     self._bc = self._terminal_boxes[0].bc
+    self._box_paths_by_id_base: Optional[Dict[str, List[Tuple[int, BoxPath]]]] = None
     for box in _reverse_bfs_on_boxes(self._terminal_boxes):
       self._add_box(box)
     # Check uniqueness of box ids
@@ -1835,28 +2483,33 @@ class Workspace:
     """Returns the BoxPaths for all boxes nested in the workspace whose
     box_id_base is the given string.
     """
-    found: List[BoxPath] = []
-    for box in self.all_boxes:
-      found.extend(self._find_all(box_id_base, BoxPath(box)))
-    return found
+    if box_id_base == 'sql':
+      bases = [f'sql{i+1}' for i in range(10)]
+    else:
+      bases = [box_id_base]
+    index = self._box_path_index()
+    # Merge the lists in the order of the walk.
+    return [bp for (_, bp) in heapq.merge(*[index.get(base, []) for base in bases])]
 
-  def _find_all(self, box_id_base: str, current_boxpath: BoxPath) -> List[BoxPath]:
+  def _box_path_index(self) -> Dict[str, List[Tuple[int, BoxPath]]]:
+    '''The BoxPaths of all the nested boxes by box_id_base, numbered in a depth-first order.
 
-    def good_box(box):
-      if box_id_base == 'sql':
-        return box.box_id_base() in [f'sql{i+1}' for i in range(10)]
-      else:
-        return box.box_id_base() == box_id_base
-
-    found = []
-    current_base = current_boxpath.base
-    if good_box(current_base):
-      found.append(current_boxpath)
-    if isinstance(current_base, CustomBox):
-      for box in current_base.workspace.all_boxes:
-        box_path = current_boxpath.add_box_as_base(box)
-        found.extend(self._find_all(box_id_base, box_path))
-    return found
+    Built on first use. The workspace is immutable, so the index never changes.
+    '''
+    if self._box_paths_by_id_base is None:
+      index: Dict[str, List[Tuple[int, BoxPath]]] = defaultdict(list)
+      to_process = [BoxPath(box) for box in reversed(list(self.all_boxes))]
+      i = 0
+      while to_process:
+        box_path = to_process.pop()
+        index[box_path.base.box_id_base()].append((i, box_path))
+        i += 1
+        if isinstance(box_path.base, CustomBox):
+          to_process.extend(
+              box_path.add_box_as_base(box)
+              for box in reversed(list(box_path.base.workspace.all_boxes)))
+      self._box_paths_by_id_base = dict(index)
+    return self._box_paths_by_id_base
 
   def side_effect_paths(self) -> List[BoxPath]:
     return self._side_effect_paths
@@ -1879,7 +2532,11 @@ class Workspace:
     # The last id is a "normal" box id, the rest are the custom box stack.
     box_to_trigger.base._trigger_in_ws(full_path, box_ids[-1], box_ids[:-1])
 
-  def save(self, saved_under_folder: str) -> str:
+  def save(self, saved_under_folder: str = None) -> str:
+    '''Saves the workspace and returns its full path.
+
+    If no folder is given, it is saved in a folder named after the hash of its contents.
+    '''
     lk = self.lk
     _, full_path = lk.save_workspace_recursively(self, saved_under_folder)
     return full_path
@@ -1895,37 +2552,193 @@ class Workspace:
   def trigger(self, box_to_trigger: BoxPath):
     ''' Triggers one side effect.
 
-    Assumes the workspace is not saved, so saves it under a random folder.
+    Assumes the workspace is not saved, so saves it under a temporary folder.
     '''
-    random_folder = _random_ws_folder()
-    full_path = self.save(random_folder)
+    full_path = self.save()
     self._trigger_box(box_to_trigger, full_path)
 
-  def trigger_all_side_effects(self):
+  def trigger_all_side_effects(self, threads: int = TRIGGER_THREADS) -> 'TriggerReport':
     ''' Triggers all side effects.
 
-    Also saves the workspace under a temporary folder.
+    Also saves the workspace under a temporary folder. Each side effect is triggered as soon as
+    the side effects it depends on are done, with at most ``threads`` of them running at a time.
+    By default (``threads=1``) they are triggered one by one in the order of ``serialize_deps()``.
+    Only use more threads if the side effects do not depend on each other through paths.
+
+    If a side effect fails, no more are started. When the running ones are done, the error of the
+    first failed side effect is raised. Its ``trigger_report`` attribute is the ``TriggerReport``.
+    Otherwise the ``TriggerReport`` is returned.
     '''
-    temporary_folder = _random_ws_folder()
-    self.save(temporary_folder)
-    for btt in serialize_deps(BoxPath.dependencies(self._side_effect_paths)):
-      self.trigger_saved(btt, temporary_folder)
+    temporary_folder, _ = self.lk.save_workspace_recursively(self)
+    deps = BoxPath.dependencies(self._side_effect_paths)
+    order = serialize_deps(deps)
+    position = {btt: i for (i, btt) in enumerate(order)}
+    missing = {btt: len(deps[btt]) for btt in order}
+    dependents: Dict[BoxPath, List[BoxPath]] = defaultdict(list)
+    for btt in order:
+      for d in deps[btt]:
+        dependents[d].append(btt)
+    ready = [position[btt] for btt in order if missing[btt] == 0]
+    report = TriggerReport(self)
+    start = time.perf_counter()
+
+    def trigger(btt):
+      began = time.perf_counter()
+      error = None
+      try:
+        self.trigger_saved(btt, temporary_folder)
+      except Exception as e:
+        error = e
+      return types.SimpleNamespace(
+          box_path=btt, start=began - start, seconds=time.perf_counter() - began, error=error)
+    running: Dict[concurrent.futures.Future, BoxPath] = {}
+    with concurrent.futures.ThreadPoolExecutor(threads) as pool:
+      while ready or running:
+        while ready and len(running) < threads and not report.failed():
+          btt = order[heapq.heappop(ready)]
+          running[pool.submit(trigger, btt)] = btt
+        if not running:
+          break
+        done, _ = concurrent.futures.wait(
+            running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in sorted(done, key=lambda f: position[running[f]]):
+          del running[future]
+          timing = future.result()
+          report.timings.append(timing)
+          if timing.error is None:
+            for d in dependents[timing.box_path]:
+              missing[d] -= 1
+              if missing[d] == 0:
+                heapq.heappush(ready, position[d])
+    finished = {t.box_path for t in report.timings}
+    report.not_started = [btt for btt in order if btt not in finished]
+    failed = report.failed()
+    if failed:
+      error = failed[0].error
+      error.trigger_report = report
+      if hasattr(error, 'add_note'):  # Python 3.11 and later.
+        error.add_note(str(report))
+      raise error
+    return report
+
+
+class TriggerReport:
+  '''The outcome of ``Workspace.trigger_all_side_effects()`` in workspace ``ws``.
+
+  ``timings`` has an item for each side effect that was triggered, in the order they finished.
+  Each item has a ``box_path``, a ``start`` time (in seconds since the triggering started), its
+  duration in ``seconds`` and an ``error``, which is ``None`` if the side effect succeeded.
+  ``not_started`` lists the side effects that were skipped because of a failure.
+  '''
+
+  def __init__(self, ws: 'Workspace') -> None:
+    self.ws = ws
+    self.timings: List[types.SimpleNamespace] = []
+    self.not_started: List[BoxPath] = []
+
+  def failed(self) -> List[types.SimpleNamespace]:
+    return [t for t in self.timings if t.error is not None]
+
+  def __str__(self) -> str:
+    lines = [f'{"start (s)":>10} {"time (s)":>10}  side effect']
+    for t in sorted(self.timings, key=lambda t: t.start):
+      error = '' if t.error is None else f'  FAILED: {t.error!r}'
+      lines.append(f'{t.start:10.2f} {t.seconds:10.2f}  {self._name(t.box_path)}{error}')
+    lines.extend(f'{"":>10} {"":>10}  {self._name(btt)}  NOT STARTED' for btt in self.not_started)
+    return '\n'.join(lines)
+
+  def _name(self, box_path: BoxPath) -> str:
+    return box_path.to_string_id(self.ws)
+
+
+def _workspace_structure(ws: Workspace, memo: Dict[Workspace, Any] = None) -> Dict[str, Any]:
+  '''The serialized boxes of the workspace and of its custom boxes, recursively.
+
+  It does not depend on where the workspace is saved or on the order of the boxes.
+  '''
+  if memo is None:
+    memo = {}
+  if ws not in memo:
+    boxes = sorted(ws.to_json('', ws.safename()), key=lambda box: box['id'])
+    custom = {ws.id_of(box): _workspace_structure(box.workspace, memo) for box in ws.custom_boxes()}
+    memo[ws] = dict(name=ws.safename(), boxes=boxes, custom=custom)
+  return memo[ws]
+
+
+def _json_hash(obj) -> str:
+  return hashlib.sha256(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+
+def _boxes_digest(boxes: List[SerializedBox]) -> str:
+  '''A hash of the boxes of a workspace. The layout and the order of the boxes do not matter.'''
+  return _json_hash(sorted(
+      [{k: v for (k, v) in box.items() if k not in ['x', 'y']} for box in boxes],
+      key=lambda box: box['id']))
+
+
+def _structural_key(ws: Workspace, state: State) -> str:
+  '''A hash of the boxes leading to ``state`` in ``ws``, including the insides of custom boxes.
+
+  Identical states built separately have the same key. Changing a parameter changes the key.
+  '''
+  return _json_hash(dict(
+      box=ws.id_of(state.box), plug=state.output_plug_name, workspace=_workspace_structure(ws)))
+
+
+def _reads_paths(ws: Workspace, memo: Dict[Workspace, bool] = None) -> bool:
+  '''True if a box in ``ws`` or inside its custom boxes reads a snapshot or a saved workspace
+  by its path. These are the boxes in ``PATH_READING_OPERATIONS``, the external computations and
+  the custom boxes of the box catalog, which refer to workspaces saved in LynxKite.
+  '''
+  if memo is None:
+    memo = {}
+  if ws not in memo:
+    memo[ws] = any(
+        _reads_paths(box.workspace, memo) if isinstance(box, CustomBox) else
+        isinstance(box, AtomicBox) and (
+            box.operation in PATH_READING_OPERATIONS or
+            box.operation.startswith('externalComputation') or
+            box.bc.category_id(box.operation) == 'Custom boxes')
+        for box in ws.all_boxes)
+  return memo[ws]
+
+
+def _state_id_cache_key(state: State) -> Optional[str]:
+  '''The key of ``state`` in the state ID cache. None if its ID is not cached.'''
+  ws = Workspace(terminal_boxes=[state.box], name='Anonymous')
+  return None if _reads_paths(ws) else _structural_key(ws, state)
 
 
 def serialize_deps(deps: Dict[Any, Set[Any]]) -> List[Any]:
-  '''Returns the keys of ``deps`` in an execution order that respects the dependencies.'''
-  deps = {k: set(v) for (k, v) in deps.items()}  # Create a copy.
+  '''Returns the keys of ``deps`` in an execution order that respects the dependencies.
+
+  Of the keys whose dependencies are all done, the one that comes first in ``deps`` is picked
+  each time.
+  '''
+  keys = list(deps)
+  index = {k: i for (i, k) in enumerate(keys)}
+  # Dependencies that are not keys are never done.
+  missing = [len(v) for v in deps.values()]
+  dependents: List[List[int]] = [[] for _ in keys]
+  for i, v in enumerate(deps.values()):
+    for d in v:
+      j = index.get(d)
+      if j is not None:
+        dependents[j].append(i)
+  ready = [i for (i, n) in enumerate(missing) if n == 0]
+  heapq.heapify(ready)
   ordering = []
-  while deps:
-    for k, v in deps.items():
-      if not v:
-        ordering.append(k)
-        del deps[k]
-        for v in deps.values():
-          v.discard(k)
-        break
-    else:
-      raise Exception(f'No ordering possible: {deps}')
+  while ready:
+    i = heapq.heappop(ready)
+    ordering.append(keys[i])
+    for j in dependents[i]:
+      missing[j] -= 1
+      if missing[j] == 0:
+        heapq.heappush(ready, j)
+  if len(ordering) < len(deps):
+    done = set(ordering)
+    rest = {k: set(v) - done for (k, v) in deps.items() if k not in done}
+    raise Exception(f'No ordering possible: {rest}')
   return ordering
 
 
@@ -1973,13 +2786,21 @@ def _topological_sort(dependencies: Dict[T, Set[T]]) -> Iterable[Set[T]]:
 
   dependencies[x] = set(), if x does not depend on anything
   '''
-  deps = dependencies
-  while True:
-    next_group = set(box_id for box_id, dep in deps.items() if len(dep) == 0)
-    if not next_group:
-      break
+  missing = {box_id: len(dep) for box_id, dep in dependencies.items()}
+  dependents: Dict[T, List[T]] = defaultdict(list)
+  for box_id, dep in dependencies.items():
+    for d in dep:
+      dependents[d].append(box_id)
+  next_group = set(box_id for box_id, n in missing.items() if n == 0)
+  while next_group:
     yield next_group
-    deps = {box_id: dep - next_group for box_id, dep in deps.items() if box_id not in next_group}
+    group = next_group
+    next_group = set()
+    for d in group:
+      for box_id in dependents[d]:
+        missing[box_id] -= 1
+        if missing[box_id] == 0:
+          next_group.add(box_id)
 
 
 class LynxException(Exception):
@@ -0,0 +1,45 @@
+'''Tests of AsyncLynxKite that do not need a LynxKite server.'''
+import asyncio
+import threading
+import time
+import unittest
+from lynx.kite import AsyncLynxKite
+from client_benchmark import offline_lk
+
+
+class TestAsyncClient(unittest.TestCase):
+
+  def test_run(self):
+    async def main():
+      async with AsyncLynxKite(offline_lk(), max_concurrency=2) as alk:
+        return await asyncio.gather(*[alk.run(lambda x: x * x, i) for i in range(5)])
+    # Each asyncio.run() has a new event loop.
+    self.assertEqual(asyncio.run(main()), [0, 1, 4, 9, 16])
+    self.assertEqual(asyncio.run(main()), [0, 1, 4, 9, 16])
+
+  def test_exit_does_not_block_the_loop(self):
+    release = threading.Event()
+    ticks = []
+
+    async def tick():
+      while not release.is_set():
+        ticks.append(1)
+        await asyncio.sleep(0.01)
+
+    async def main():
+      ticker = asyncio.ensure_future(tick())
+      async with AsyncLynxKite(offline_lk()) as alk:
+        slow = asyncio.ensure_future(alk.run(release.wait))
+        await asyncio.sleep(0)
+        threading.Timer(0.2, release.set).start()
+        start = time.monotonic()
+      # Leaving the block waited for the running call, but the ticker kept running meanwhile.
+      self.assertTrue(slow.done())
+      self.assertGreater(time.monotonic() - start, 0.1)
+      self.assertGreater(len(ticks), 5)
+      await ticker
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+  unittest.main()
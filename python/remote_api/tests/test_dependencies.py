@@ -0,0 +1,223 @@
+'''Tests of the dependency ordering of side effects. They do not need a LynxKite server.'''
+import random
+import threading
+import time
+import unittest
+from lynx.kite import (
+    BoxPath, SideEffectCollector, Workspace, serialize_deps, subworkspace, _UpstreamIndex)
+from client_benchmark import offline_lk, deep
+
+
+def reference_order(deps):
+  '''A slow but obvious serialize_deps: always picks the first key whose dependencies are done.'''
+  done = []
+  while len(done) < len(deps):
+    ready = [k for k, v in deps.items() if k not in done and all(d in done for d in v)]
+    if not ready:
+      raise Exception('No ordering possible')
+    done.append(ready[0])
+  return done
+
+
+class TestSerializeDeps(unittest.TestCase):
+
+  def test_independent_keys_keep_their_order(self):
+    self.assertEqual(serialize_deps({'c': set(), 'b': set(), 'a': set()}), ['c', 'b', 'a'])
+
+  def test_ties_are_broken_by_index(self):
+    # "b" becomes ready after "a", but it still comes before "c".
+    self.assertEqual(serialize_deps({'b': {'a'}, 'a': set(), 'c': set()}), ['a', 'b', 'c'])
+    self.assertEqual(
+        serialize_deps({'d': {'a'}, 'c': set(), 'a': set(), 'b': set()}), ['c', 'a', 'd', 'b'])
+
+  def test_matches_reference(self):
+    rnd = random.Random(1)
+    for _ in range(100):
+      n = rnd.randint(1, 30)
+      names = [f'k{i}' for i in range(n)]
+      # Each key may depend on the keys before it in "names". The dict is in a different order.
+      deps = {k: set(rnd.sample(names[:i], rnd.randint(0, i))) for i, k in enumerate(names)}
+      keys = list(deps)
+      rnd.shuffle(keys)
+      deps = {k: deps[k] for k in keys}
+      self.assertEqual(serialize_deps(deps), reference_order(deps))
+
+  def test_does_not_depend_on_set_order(self):
+    deps1 = {'x': {'a', 'b', 'c'}, 'a': set(), 'b': {'a'}, 'c': set()}
+    deps2 = {'x': {'c', 'b', 'a'}, 'a': set(), 'b': {'a'}, 'c': set()}
+    self.assertEqual(serialize_deps(deps1), ['a', 'b', 'c', 'x'])
+    self.assertEqual(serialize_deps(deps2), ['a', 'b', 'c', 'x'])
+
+  def test_cycle(self):
+    with self.assertRaises(Exception) as cm:
+      serialize_deps({'c': set(), 'a': {'b'}, 'b': {'a', 'c'}})
+    message = str(cm.exception)
+    self.assertIn('No ordering possible', message)
+    self.assertIn("'a'", message)
+    self.assertIn("'b'", message)
+    # Finished keys and dependencies are not listed.
+    self.assertNotIn("'c'", message)
+
+  def test_missing_dependency(self):
+    with self.assertRaises(Exception) as cm:
+      serialize_deps({'a': set(), 'b': {'a', 'nowhere'}})
+    self.assertIn("'nowhere'", str(cm.exception))
+
+  def test_empty(self):
+    self.assertEqual(serialize_deps({}), [])
+
+
+class TestBoxPath(unittest.TestCase):
+
+  def nested_path(self, lk):
+    '''A box path with two custom boxes on its stack.'''
+    @subworkspace
+    def inner(t, sec=SideEffectCollector.AUTO):
+      sec.compute(t.sql('select * from input'))
+      return t
+
+    @subworkspace
+    def outer(t, sec=SideEffectCollector.AUTO):
+      return inner(t).register(sec)
+    sec = SideEffectCollector()
+    outer(lk.createExampleGraph()).register(sec)
+    [path] = sec.all_triggerables()
+    return path
+
+  def test_equality_and_hash(self):
+    lk = offline_lk()
+    path = self.nested_path(lk)
+    self.assertEqual(len(path.stack), 2)
+    built = BoxPath(path.base, list(path.stack))
+    prefixed = BoxPath(path.base, path.stack[1:]).add_box_as_prefix(path.stack[0])
+    for other in [built, prefixed]:
+      self.assertIsNot(other, path)
+      self.assertEqual(other, path)
+      self.assertEqual(hash(other), hash(path))
+      self.assertEqual(other.stack, path.stack)
+    self.assertEqual(len({path, built, prefixed}), 1)
+    self.assertEqual({path: 1}[prefixed], 1)
+
+  def test_inequality(self):
+    lk = offline_lk()
+    path = self.nested_path(lk)
+    self.assertNotEqual(BoxPath(path.base, path.stack[1:]), path)
+    self.assertNotEqual(BoxPath(path.base, path.stack[::-1]), path)
+    self.assertNotEqual(BoxPath(path.stack[-1], path.stack[:-1]), path)
+    self.assertNotEqual(path, 'computeInputs')
+    # Boxes are compared by identity, not by their parameters.
+    eg = lk.createExampleGraph()
+    a = eg.sql('select 1')
+    b = eg.sql('select 1')
+    self.assertNotEqual(BoxPath(a.box), BoxPath(b.box))
+    self.assertEqual(BoxPath(a.box), BoxPath(a.box))
+
+
+class TestUpstreamIndex(unittest.TestCase):
+
+  def test_chain(self):
+    lk = offline_lk()
+    eg = lk.createExampleGraph()
+    t1 = eg.sql('select * from vertices')
+    t2 = t1.sql('select * from input')
+    t3 = t2.sql('select * from input')
+    p0, p1, p2, p3 = [BoxPath(s.box) for s in [eg, t1, t2, t3]]
+    index = _UpstreamIndex({p0: {'eg'}, p2: {'t2'}})
+    self.assertEqual(index.find(p3), {'eg', 't2'})
+    self.assertEqual(index.find(p2), {'eg'})  # Not itself.
+    self.assertEqual(index.find(p1), {'eg'})
+    self.assertEqual(index.find(p0), set())
+    # An equal BoxPath finds the same.
+    self.assertEqual(index.find(BoxPath(t3.box)), {'eg', 't2'})
+
+  def test_diamond(self):
+    lk = offline_lk()
+    eg = lk.createExampleGraph()
+    a = eg.sql('select 1')
+    b = eg.sql('select 2')
+    c = lk.sql2(a, b)
+    pe, pa, pb, pc = [BoxPath(s.box) for s in [eg, a, b, c]]
+    index = _UpstreamIndex({pe: {'eg'}, pa: {'a'}, pb: {'b'}})
+    self.assertEqual(index.find(pc), {'eg', 'a', 'b'})
+    self.assertEqual(index.find(pa), {'eg'})
+
+  def test_deep_chain(self):
+    # Deeper than the recursion limit.
+    lk = offline_lk()
+    t = lk.createExampleGraph()
+    first = BoxPath(t.box)
+    for i in range(5000):
+      t = t.sql(f'select {i}')
+    self.assertEqual(_UpstreamIndex({first: {'first'}}).find(BoxPath(t.box)), {'first'})
+
+  def test_dependencies(self):
+    lk = offline_lk()
+    ws = deep(lk, 5)
+    paths = ws.side_effect_paths()
+    deps = BoxPath.dependencies(paths)
+    # Each computed box depends on the ones computed before it.
+    for i, p in enumerate(paths):
+      self.assertEqual(deps[p], set(paths[:i]))
+    self.assertEqual(serialize_deps(deps), paths)
+
+
+class TestTriggerAllSideEffects(unittest.TestCase):
+
+  def workspace(self, lk):
+    '''Two independent chains and a side effect that depends on both.'''
+    eg = lk.createExampleGraph()
+    sec = SideEffectCollector()
+    a = sec.compute(sec.compute(eg.sql('select 1 as a')).sql('select a + 1 as a from input'))
+    b = sec.compute(sec.compute(eg.sql('select 2 as b')).sql('select b + 1 as b from input'))
+    sec.compute(lk.sql2(a, b, sql='select * from one cross join two'))
+    return Workspace(
+        name='chains', terminal_boxes=sec.top_level_side_effects,
+        side_effect_paths=list(sec.all_triggerables()))
+
+  def trigger(self, **kwargs):
+    '''Triggers the side effects offline. Returns the dependencies and the events.'''
+    lk = offline_lk()
+    ws = self.workspace(lk)
+    lk.save_workspace_recursively = lambda ws: ('folder', 'folder/chains')
+    events = []
+    lock = threading.Lock()
+
+    def trigger_saved(btt, folder):
+      with lock:
+        events.append(('start', btt))
+      time.sleep(0.02)
+      with lock:
+        events.append(('end', btt))
+    ws.trigger_saved = trigger_saved
+    report = ws.trigger_all_side_effects(**kwargs)
+    self.assertEqual(len(report.timings), 5)
+    return BoxPath.dependencies(ws.side_effect_paths()), events
+
+  def assert_dependencies_done_first(self, deps, events):
+    for btt, ds in deps.items():
+      for d in ds:
+        self.assertLess(events.index(('end', d)), events.index(('start', btt)))
+
+  def max_running(self, events):
+    running = most = 0
+    for (event, _) in events:
+      running += 1 if event == 'start' else -1
+      most = max(most, running)
+    return most
+
+  def test_one_by_one_by_default(self):
+    deps, events = self.trigger()
+    self.assert_dependencies_done_first(deps, events)
+    self.assertEqual(self.max_running(events), 1)
+    order = [btt for (event, btt) in events if event == 'start']
+    self.assertEqual(order, serialize_deps(deps))
+
+  def test_dependents_wait_for_dependencies(self):
+    deps, events = self.trigger(threads=4)
+    self.assert_dependencies_done_first(deps, events)
+    # The two chains run in parallel.
+    self.assertEqual(self.max_running(events), 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
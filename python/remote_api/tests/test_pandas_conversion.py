@@ -44,3 +44,26 @@ class TestPandasConversion(unittest.TestCase):
   def test_lk_table_to_dataframe(self):
     df = dummy_table.df()
     self.assert_best_sauce_for_df(df, 'fish and chips', 'tartar sauce')
+
+  def test_lk_table_to_dataframe_with_parquet(self):
+    from decimal import Decimal
+    t = lk.createExampleGraph().sql('''
+        select name, cast(age as decimal(10, 1)) as age, cast(income as bigint) as income
+        from vertices order by name''')
+    df = t.df(method='parquet')
+    self.assertEqual(list(df['name']), ['Adam', 'Bob', 'Eve', 'Isolated Joe'])
+    self.assertEqual(
+        list(df['age']), [Decimal('20.3'), Decimal('50.3'), Decimal('18.2'), Decimal('2.0')])
+    self.assertEqual(str(df['income'].dtype), 'Int64')
+    self.assertEqual(list(df['income'].isna()), [False, False, True, True])
+    self.assertEqual(t.df(limit=2, method='parquet').shape, (2, 3))
+
+  def test_fetch_many(self):
+    eg = lk.createExampleGraph()
+    states = [eg.sql(f'select name from vertices where age > {age} order by name')
+              for age in [10, 20, 30]]
+    bad = eg.sql('select no_such_column from vertices')
+    dfs = lk.fetch_many(states + [bad, states[0]])
+    self.assertEqual([len(df) for df in dfs[:3]], [3, 2, 1])
+    self.assertIsInstance(dfs[3], lynx.kite.LynxException)
+    self.assertEqual(list(dfs[4]['name']), list(dfs[0]['name']))
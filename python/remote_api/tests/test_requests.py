@@ -0,0 +1,207 @@
+'''Tests of how the Python API sends requests. They use a fake HTTP session instead of LynxKite.'''
+import gzip
+import json
+import types
+import unittest
+from unittest import mock
+import requests
+import urllib3
+from lynx import kite
+from lynx.kite import LynxKite, LynxException
+from client_benchmark import offline_box_catalog
+
+
+def response(status, text='{}'):
+  r = requests.Response()
+  r.status_code = status
+  r._content = text.encode()
+  r.url = 'http://lynxkite.invalid/test'
+  return r
+
+
+def not_sent():
+  '''The error of a connection that could not be established.'''
+  reason = urllib3.exceptions.NewConnectionError(None, 'Connection refused')
+  return requests.exceptions.ConnectionError(
+      urllib3.exceptions.MaxRetryError(None, 'http://lynxkite.invalid/test', reason))
+
+
+def sent():
+  '''The error of a connection that was lost after the request was sent.'''
+  return requests.exceptions.ConnectionError('Connection aborted.')
+
+
+class FakeSession:
+  '''Returns or raises the given responses in order and records the requests.'''
+
+  def __init__(self, responses):
+    self.responses = list(responses)
+    self.requests = []
+
+  def request(self, method, url, **kwargs):
+    self.requests.append(types.SimpleNamespace(method=method, url=url, **kwargs))
+    r = self.responses.pop(0)
+    if isinstance(r, Exception):
+      raise r
+    return r
+
+  def get(self, url, **kwargs):
+    return self.request('get', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('post', url, **kwargs)
+
+
+def fake_lk(*responses, **kwargs):
+  '''A LynxKite that gets the responses from a FakeSession and records the backoffs.'''
+  lk = LynxKite(
+      address='http://lynxkite.invalid/', box_catalog=offline_box_catalog(), max_retries=3,
+      **kwargs)
+  lk.session = FakeSession(responses)
+  lk._get_session = lambda: lk.session
+  lk.waits = []
+  lk._backoff = lk.waits.append
+  return lk
+
+
+class TestRequests(unittest.TestCase):
+
+  def test_timeouts(self):
+    lk = fake_lk(response(200), response(200), connect_timeout=5, read_timeout=7)
+    lk._get('/test')
+    lk._get('/test', timeout=1)
+    self.assertEqual([r.timeout for r in lk.session.requests], [(5, 7), 1])
+    # There is no read timeout by default.
+    lk = fake_lk(response(200))
+    lk._post('/test')
+    self.assertEqual(lk.session.requests[0].timeout, (60, None))
+
+  def test_get_retries(self):
+    lk = fake_lk(response(502), sent(), response(504), response(200, '{"a": 1}'))
+    self.assertEqual(lk._get('/test').text, '{"a": 1}')
+    self.assertEqual(lk.waits, [0, 1, 2])
+    self.assertEqual(len(lk.session.requests), 4)
+    lk = fake_lk(requests.exceptions.ReadTimeout(), response(200))
+    lk._get('/test')
+    self.assertEqual(lk.waits, [0])
+
+  def test_retries_run_out(self):
+    lk = fake_lk(*[response(503)] * 4)
+    with self.assertRaises(requests.exceptions.HTTPError):
+      lk._get('/test')
+    self.assertEqual(lk.waits, [0, 1, 2])
+    lk = fake_lk(*[not_sent()] * 4)
+    with self.assertRaises(requests.exceptions.ConnectionError):
+      lk._post('/test')
+    self.assertEqual(lk.waits, [0, 1, 2])
+
+  def test_post_retried_on_503(self):
+    lk = fake_lk(response(503), response(200))
+    lk._post('/test')
+    self.assertEqual(lk.waits, [0])
+
+  def test_post_not_retried_on_gateway_errors(self):
+    # LynxKite may have processed the request behind the proxy.
+    for status in [502, 504]:
+      lk = fake_lk(response(status), response(200))
+      with self.assertRaises(requests.exceptions.HTTPError):
+        lk._post('/test')
+      self.assertEqual(len(lk.session.requests), 1)
+      self.assertEqual(lk.waits, [])
+
+  def test_post_retried_if_not_sent(self):
+    lk = fake_lk(not_sent(), requests.exceptions.ConnectTimeout(), response(200))
+    lk._post('/test')
+    self.assertEqual(lk.waits, [0, 1])
+
+  def test_post_not_retried_if_sent(self):
+    for error in [sent(), requests.exceptions.ReadTimeout()]:
+      lk = fake_lk(error, response(200))
+      with self.assertRaises(type(error)):
+        lk._post('/test')
+      self.assertEqual(len(lk.session.requests), 1)
+
+  def test_server_error(self):
+    lk = fake_lk(response(500, 'Something went wrong.'), response(200))
+    with self.assertRaises(LynxException) as cm:
+      lk._post('/test')
+    self.assertIn('Something went wrong.', str(cm.exception))
+    self.assertEqual(len(lk.session.requests), 1)
+
+  def test_login_again(self):
+    lk = fake_lk(response(401), response(200))
+    lk._login = mock.Mock()
+    lk._post('/test')
+    lk._login.assert_called_once_with()
+    self.assertEqual(len(lk.session.requests), 2)
+
+  def test_gzip(self):
+    payload = dict(boxes=['x' * 100] * (kite.GZIP_MIN_BYTES // 100 + 1))
+    lk = fake_lk(response(200), response(200), response(200))
+    lk._request('/test', payload, compress=True)
+    lk._request('/test', payload)
+    lk._request('/test', dict(boxes=[]), compress=True)
+    gzipped, big, small = lk.session.requests
+    self.assertEqual(gzipped.headers['Content-Encoding'], 'gzip')
+    self.assertEqual(json.loads(gzip.decompress(gzipped.data)), payload)
+    self.assertLess(len(gzipped.data), len(big.data) / 10)
+    for r in [big, small]:
+      self.assertNotIn('Content-Encoding', r.headers)
+      self.assertIsInstance(r.data, str)
+    self.assertEqual(json.loads(big.data), payload)
+
+  def test_backoff(self):
+    lk = LynxKite(address='http://lynxkite.invalid/', box_catalog=offline_box_catalog())
+    for (retries, wait) in [(0, 0.5), (1, 1), (3, 4), (6, 30), (50, 30)]:
+      with mock.patch.object(kite.time, 'sleep') as sleep, \
+              mock.patch.object(kite.random, 'uniform', side_effect=lambda a, b: (a, b)):
+        lk._backoff(retries)
+      sleep.assert_called_once_with((wait / 2, wait))
+
+
+def long_poll_response(timestamp, progress):
+  return response(200, json.dumps(dict(sparkStatus=dict(timestamp=timestamp), progress=progress)))
+
+
+class TestLongPoll(unittest.TestCase):
+
+  def lk(self, *responses):
+    lk = fake_lk(*responses, read_timeout=7)
+    lk._get_state_ids = lambda states: [f'id-{s}' for s in states]
+    return lk
+
+  def test_no_read_timeout(self):
+    lk = self.lk(
+        long_poll_response(1, {'id-a': [0.0]}),
+        long_poll_response(2, {'id-a': [1.0]}))
+    self.assertEqual(list(lk.progress_updates(['a'])), [('a', [0.0]), ('a', [1.0])])
+    self.assertEqual([r.timeout for r in lk.session.requests], [(60, None), (60, None)])
+    self.assertEqual(json.loads(lk.session.requests[1].params['q'])['syncedUntil'], 1)
+
+  def test_timeout(self):
+    # The state is never computed, so the second long-poll does not get a response.
+    lk = self.lk(long_poll_response(1, {'id-a': [0.0]}), requests.exceptions.ReadTimeout())
+    self.assertEqual(list(lk.progress_updates(['a'], timeout=5)), [('a', [0.0])])
+    [connect, read] = lk.session.requests[1].timeout
+    self.assertEqual(connect, 60)
+    self.assertLessEqual(read, 5)
+    # Not retried.
+    self.assertEqual(len(lk.session.requests), 2)
+    self.assertEqual(lk.waits, [])
+
+  def test_zero_timeout(self):
+    lk = self.lk()
+    self.assertEqual(list(lk.progress_updates(['a'], timeout=0)), [])
+    self.assertEqual(lk.session.requests, [])
+
+  def test_read_timeout_not_retried(self):
+    lk = self.lk(requests.exceptions.ReadTimeout(), response(200))
+    with self.assertRaises(requests.exceptions.ReadTimeout):
+      lk._get('/test', retry_read_timeout=False)
+    lk = self.lk(sent(), response(200))
+    lk._get('/test', retry_read_timeout=False)
+    self.assertEqual(lk.waits, [0])
+
+
+if __name__ == '__main__':
+  unittest.main()
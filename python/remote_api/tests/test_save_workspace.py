@@ -0,0 +1,68 @@
+'''Tests of saving workspaces in content-addressed folders. They do not need a LynxKite server.'''
+import types
+import unittest
+from lynx.kite import to_simple_dicts, _boxes_digest
+from client_benchmark import offline_lk
+
+
+def fake_server_lk(saved):
+  '''An offline LynxKite that saves workspaces into the ``saved`` dictionary.'''
+  lk = offline_lk()
+  lk.sent = []
+
+  def get_directory_entry(path):
+    return types.SimpleNamespace(exists=path in saved, isWorkspace=path in saved)
+
+  def save_workspace(path, boxes):
+    lk.sent.append(path)
+    saved[path] = to_simple_dicts(boxes)
+  lk.get_directory_entry = get_directory_entry
+  lk.get_workspace_boxes = lambda path: saved[path]
+  lk.save_workspace = save_workspace
+  return lk
+
+
+def names(lk):
+  @lk.workspace()
+  def names():
+    return dict(names=lk.createExampleGraph().sql('select name from vertices'))
+  return names
+
+
+class TestSaveContentAddressed(unittest.TestCase):
+
+  def test_saved_once(self):
+    saved = {}
+    lk = fake_server_lk(saved)
+    _, path = lk.save_workspace_recursively(names(lk))
+    self.assertEqual(lk.sent, [path])
+    lk.save_workspace_recursively(names(lk))
+    # Another connection finds the same boxes there.
+    other = fake_server_lk(saved)
+    other.save_workspace_recursively(names(other))
+    self.assertEqual(lk.sent + other.sent, [path])
+
+  def test_interrupted_save(self):
+    saved = {}
+    lk = fake_server_lk(saved)
+    _, path = lk.save_workspace_recursively(names(lk))
+    complete = saved[path]
+    for broken in [[], complete[:1], [dict(b, parameters={}) for b in complete]]:
+      saved[path] = broken
+      other = fake_server_lk(saved)
+      other.save_workspace_recursively(names(other))
+      self.assertEqual(other.sent, [path])
+      self.assertEqual(_boxes_digest(saved[path]), _boxes_digest(complete))
+
+  def test_layout_does_not_matter(self):
+    saved = {}
+    lk = fake_server_lk(saved)
+    _, path = lk.save_workspace_recursively(names(lk))
+    saved[path] = [dict(box, x=box['x'] + 1.0) for box in reversed(saved[path])]
+    other = fake_server_lk(saved)
+    other.save_workspace_recursively(names(other))
+    self.assertEqual(other.sent, [])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,100 @@
+'''Tests of the state ID cache. They do not need a LynxKite server.'''
+import types
+import unittest
+from unittest import mock
+from lynx import kite
+from lynx.kite import subworkspace, external
+from client_benchmark import offline_lk
+
+
+def counting_lk():
+  '''An offline LynxKite that makes up a new state ID for every state it is asked about.'''
+  lk = offline_lk()
+  lk.fetched = []
+
+  def fetch_workspace_output_states(ws, save_under_root=None):
+    outputs = {}
+    for box in ws.all_boxes:
+      for plug in box.outputs:
+        lk.fetched.append((box, plug))
+        outputs[ws.id_of(box), plug] = types.SimpleNamespace(
+            success=types.SimpleNamespace(enabled=True), stateId=f'state-{len(lk.fetched)}')
+    return outputs
+  lk.fetch_workspace_output_states = fetch_workspace_output_states
+  return lk
+
+
+class TestStateIdCache(unittest.TestCase):
+
+  def test_identical_states_are_cached(self):
+    lk = counting_lk()
+    eg = lk.createExampleGraph()
+    names = lk.get_state_id(eg.sql('select name from vertices'))
+    fetched = len(lk.fetched)
+    self.assertEqual(names, lk.get_state_id(eg.sql('select name from vertices')))
+    self.assertEqual([names], lk._get_state_ids([eg.sql('select name from vertices')]))
+    self.assertEqual(len(lk.fetched), fetched)
+
+  def test_snapshots_are_not_cached(self):
+    # The snapshot can be overwritten between the two calls.
+    lk = counting_lk()
+    snapshot = lk.importSnapshot(path='snapshot')
+    first = lk.get_state_id(snapshot)
+    self.assertNotEqual(first, lk.get_state_id(snapshot))
+    self.assertNotIn(first, lk._get_state_ids([snapshot]))
+    t = snapshot.sql('select * from input')
+    self.assertNotEqual(lk.get_state_id(t), lk.get_state_id(t))
+    self.assertEqual(len(lk._state_ids), 0)
+
+  def test_snapshots_in_custom_boxes_are_not_cached(self):
+    lk = counting_lk()
+
+    @subworkspace
+    def inner(t):
+      return lk.sql2(t, lk.importSnapshot(path='snapshot'), sql='select * from one')
+
+    @subworkspace
+    def outer(t):
+      return inner(t)
+    t = outer(lk.createExampleGraph())
+    self.assertNotEqual(lk.get_state_id(t), lk.get_state_id(t))
+    self.assertEqual(len(lk._state_ids), 0)
+
+  def test_external_computations_are_not_cached(self):
+    # The output is the snapshot that the computation saves each time it is triggered.
+    lk = counting_lk()
+
+    @external
+    def names(table):
+      return table.pandas()
+    t = names(lk.createExampleGraph().sql('select name from vertices'))
+    self.assertNotEqual(lk.get_state_id(t), lk.get_state_id(t))
+    self.assertEqual(len(lk._state_ids), 0)
+
+  def test_saved_custom_boxes_are_not_cached(self):
+    # Custom boxes of the box catalog run the workspace that is saved under their name.
+    lk = counting_lk()
+    lk.box_catalog().bc['myBox'] = types.SimpleNamespace(
+        operationId='my_box', inputs=['input'], outputs=['output'], categoryId='Custom boxes')
+    t = lk.myBox(lk.createExampleGraph())
+    self.assertNotEqual(lk.get_state_id(t), lk.get_state_id(t))
+
+  def test_cache_is_bounded(self):
+    lk = counting_lk()
+    eg = lk.createExampleGraph()
+    with mock.patch.object(kite, 'STATE_ID_CACHE_SIZE', 3):
+      ids = [lk.get_state_id(eg.sql(f'select {i}')) for i in range(3)]
+      # Using the first one makes the second one the least recently used.
+      self.assertEqual(ids[0], lk.get_state_id(eg.sql('select 0')))
+      lk.get_state_id(eg.sql('select 3'))
+      self.assertEqual(len(lk._state_ids), 3)
+      fetched = len(lk.fetched)
+      self.assertEqual(ids[0], lk.get_state_id(eg.sql('select 0')))
+      self.assertEqual(ids[2], lk.get_state_id(eg.sql('select 2')))
+      self.assertEqual(len(lk.fetched), fetched)
+      self.assertNotEqual(ids[1], lk.get_state_id(eg.sql('select 1')))
+      self.assertEqual(len(lk._state_ids), 3)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -1,6 +1,8 @@
+import gzip
 import unittest
 import lynx.kite
 import json
+import requests
 import time
 from lynx.kite import subworkspace
 
@@ -365,3 +367,113 @@ class TestWorkspaceBuilder(unittest.TestCase):
     lk.exportToParquetNow(eg, path='DATA$/triggered/now/parquet2')
     data = lk.importParquetNow(filename='DATA$/triggered/now/parquet2').get_table_data().data
     self.assertEqual([row[0].string for row in data], ['Adam', 'Bob'])
+
+  def test_state_id_cache(self):
+    lk = lynx.kite.LynxKite()
+    runs = []
+    fetch_states = lk.fetch_states
+    lk.fetch_states = lambda *args, **kwargs: runs.append(1) or fetch_states(*args, **kwargs)
+    eg = lk.createExampleGraph()
+    names = lk.get_state_id(eg.sql('select name from vertices'))
+    # An identical state built separately.
+    self.assertEqual(names, lk.get_state_id(eg.sql('select name from vertices')))
+    self.assertEqual(len(runs), 1)
+    ages = eg.sql('select age from vertices')
+    self.assertNotEqual(names, lk.get_state_id(ages))
+    self.assertEqual(len(runs), 2)
+    ages.parameters['sql'] = 'select name from vertices'
+    self.assertEqual(names, lk.get_state_id(ages))
+    self.assertEqual(len(runs), 2)
+
+  def test_state_id_cache_snapshot_overwritten(self):
+    lk = lynx.kite.LynxKite()
+    eg = lk.createExampleGraph()
+    lk.remove_name('state_id_cache_snapshot', force=True)
+    eg.sql('select name from vertices').save_snapshot('state_id_cache_snapshot')
+    snapshot = lk.importSnapshot(path='state_id_cache_snapshot')
+    names = lk.get_state_id(snapshot)
+    lk.remove_name('state_id_cache_snapshot', force=True)
+    eg.sql('select age from vertices').save_snapshot('state_id_cache_snapshot')
+    # The same boxes read the new snapshot.
+    ages = lk.get_state_id(snapshot)
+    self.assertNotEqual(names, ages)
+    self.assertEqual(ages, lk.get_state_id(eg.sql('select age from vertices')))
+    self.assertEqual(['age'], list(snapshot.df().columns))
+
+  def test_save_content_addressed(self):
+    lk = lynx.kite.LynxKite()
+
+    def build(sql):
+      @lk.workspace()
+      def names():
+        return dict(names=lk.createExampleGraph().sql(sql))
+      return names
+    names = 'select name from vertices'
+    root, path = lk.save_workspace_recursively(build(names))
+    self.assertTrue(root.startswith('tmp_workspaces/'))
+    self.assertTrue(lk.get_directory_entry(path).isWorkspace)
+    # An identical workspace built separately is saved to the same place.
+    self.assertEqual(lk.save_workspace_recursively(build(names)), (root, path))
+    self.assertNotEqual(lk.save_workspace_recursively(build(names + ' limit 1'))[0], root)
+    # An interrupted save can leave an empty workspace there. Another connection saves it again.
+    lk.remove_name(path, force=True)
+    lk._send('/ajax/createWorkspace', dict(name=path))
+    saved = lynx.kite.LynxKite()
+    self.assertEqual(saved.save_workspace_recursively(build(names)), (root, path))
+    self.assertEqual(
+        sorted(box.operationId for box in saved.get_workspace_boxes(path)),
+        ['Anchor', 'Create example graph', 'Output', 'SQL1'])
+
+  def test_gzipped_requests(self):
+    lk = lynx.kite.LynxKite()
+    headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    data = gzip.compress(json.dumps(dict(path='')).encode())
+    r = lk._post('/remote/getDirectoryEntry', data=data, headers=headers)
+    self.assertTrue(json.loads(r.text)['isDirectory'])
+    for data in [b'not gzipped', gzip.compress(b'{not json')]:
+      with self.assertRaises(requests.exceptions.HTTPError) as cm:
+        lk._post('/remote/getDirectoryEntry', data=data, headers=headers)
+      self.assertEqual(cm.exception.response.status_code, 400)
+
+  def test_async_client(self):
+    import asyncio
+
+    async def run():
+      async with lynx.kite.AsyncLynxKite(max_concurrency=4) as alk:
+        eg = alk.createExampleGraph()
+        ages = [10, 20, 30]
+        dfs = await asyncio.gather(*[
+            alk.df(eg.sql(f'select name from vertices where age > {age}')) for age in ages])
+        self.assertEqual([len(df) for df in dfs], [3, 2, 1])
+        snapshot = 'async client test snapshot'
+        await alk.run(alk.lk.remove_name, snapshot, force=True)
+        await alk.trigger(eg.saveToSnapshot(path=snapshot))
+        self.assertTrue(alk.lk.get_directory_entry(snapshot).isSnapshot)
+    asyncio.run(run())
+
+  def test_watch(self):
+    lk = lynx.kite.LynxKite()
+    seed = str(int(round(time.time() * 1000)))[-8:]
+    g = lk.createVertices().createRandomEdges(seed=seed).computeDegree()
+    states = [g.sql('select degree from vertices'), g.sql('select max(degree) from vertices')]
+    bad = g.sql('select no_such_column from vertices')
+    states[0].compute()
+    states[1].compute()
+    updates = []
+    lk.watch(states + [bad], lambda state, progress: updates.append((state, progress)))
+    self.assertEqual([p for (s, p) in updates if s is bad], [[-1.0]])
+    last = {s: p for (s, p) in updates}
+    self.assertEqual([last[s] for s in states], [[1.0], [1.0]])
+
+  def test_box_catalog_cache(self):
+    import tempfile
+    from unittest import mock
+    with tempfile.TemporaryDirectory() as cache_dir:
+      with mock.patch.dict('os.environ', LYNXKITE_CACHE_DIR=cache_dir):
+        with mock.patch.object(lynx.kite.LynxKite, 'server_version', return_value='test'):
+          lk = lynx.kite.LynxKite()
+          catalog = lk.box_catalog().bc
+          lk = lynx.kite.LynxKite()
+          lk._ask = mock.Mock(side_effect=AssertionError('Should not send requests.'))
+          self.assertEqual(lk.box_catalog().bc.keys(), catalog.keys())
+          self.assertEqual(lk.box_catalog().inputs('sql2'), ['one', 'two'])
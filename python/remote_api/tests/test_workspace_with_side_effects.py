@@ -97,3 +97,23 @@ class TestWorkspaceWithSideEffects(unittest.TestCase):
     entries = lk.list_dir('single')
     expected = ['single/a', 'single/b']
     self.assertEqual([e.name for e in entries], expected)
+
+  def test_side_effects_in_parallel(self):
+    lk = lynx.kite.LynxKite()
+
+    @lk.workspace_with_side_effects()
+    def exports(sec):
+      eg = lk.createExampleGraph()
+      for name in 'abc':
+        eg.sql('select * from vertices').saveToSnapshot(path=f'parallel/{name}').register(sec)
+      eg.sql('select * from vertices').exportToCSV(path='WRONG_PREFIX$/x').register(sec)
+
+    lk.remove_name('parallel', force=True)
+    with self.assertRaises(lynx.kite.LynxException) as cm:
+      exports.trigger_all_side_effects(threads=4)
+    report = cm.exception.trigger_report
+    self.assertEqual(len(report.failed()), 1)
+    self.assertEqual(len(report.timings), 4)
+    self.assertEqual(report.not_started, [])
+    self.assertEqual(
+        [e.name for e in lk.list_dir('parallel')], ['parallel/a', 'parallel/b', 'parallel/c'])
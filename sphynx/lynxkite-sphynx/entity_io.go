@@ -20,6 +20,8 @@ type Entity interface {
 type TabularEntity interface {
 	toOrderedRows() array.Record
 	// readFromOrdered is only called on freshly constructed objects to load them from disk.
+	// It is called once for each record in the file and appends the rows of the record.
+	// The slices are grown once for each record. (Usually there is only one.)
 	readFromOrdered(rec array.Record) error
 	unorderedRow() interface{}
 }
@@ -65,10 +67,7 @@ func (v *VertexSet) toOrderedRows() array.Record {
 func (v *VertexSet) readFromOrdered(rec array.Record) error {
 	data := rec.Column(0).(*array.Int64).Int64Values()
 	// Make a copy because counting references is harder.
-	v.MappingToUnordered = make([]int64, len(data))
-	for i, d := range data {
-		v.MappingToUnordered[i] = d
-	}
+	v.MappingToUnordered = append(v.MappingToUnordered, data...)
 	return nil
 }
 
@@ -121,13 +120,13 @@ func (eb *EdgeBundle) readFromOrdered(rec array.Record) error {
 	dst := rec.Column(1).(*array.Uint32).Uint32Values()
 	ids := rec.Column(2).(*array.Int64).Int64Values()
 	// Make a copy because counting references is harder.
-	eb.Src = make([]SphynxId, len(src))
-	eb.Dst = make([]SphynxId, len(dst))
-	eb.EdgeMapping = make([]int64, len(ids))
-	for i, id := range ids {
-		eb.Src[i] = SphynxId(src[i])
-		eb.Dst[i] = SphynxId(dst[i])
-		eb.EdgeMapping[i] = id
+	base := len(eb.Src)
+	eb.Src = append(eb.Src, make([]SphynxId, len(ids))...)
+	eb.Dst = append(eb.Dst, make([]SphynxId, len(ids))...)
+	eb.EdgeMapping = append(eb.EdgeMapping, ids...)
+	for i := range ids {
+		eb.Src[base+i] = SphynxId(src[i])
+		eb.Dst[base+i] = SphynxId(dst[i])
 	}
 	return nil
 }
@@ -197,11 +196,12 @@ func fieldIndex(t reflect.Type, name string) int {
 func (a *StringAttribute) readFromOrdered(rec array.Record) error {
 	col := rec.Column(0).(*array.String)
 	defer col.Release()
-	a.Values = make([]string, col.Len())
-	a.Defined = make([]bool, col.Len())
+	base := len(a.Values)
+	a.Values = append(a.Values, make([]string, col.Len())...)
+	a.Defined = append(a.Defined, make([]bool, col.Len())...)
 	for i := 0; i < col.Len(); i++ {
-		a.Values[i] = col.Value(i)
-		a.Defined[i] = col.IsValid(i)
+		a.Values[base+i] = col.Value(i)
+		a.Defined[base+i] = col.IsValid(i)
 	}
 	return nil
 }
@@ -217,11 +217,11 @@ func (a *StringAttribute) toOrderedRows() array.Record {
 func (a *DoubleAttribute) readFromOrdered(rec array.Record) error {
 	col := rec.Column(0).(*array.Float64)
 	defer col.Release()
-	a.Values = make([]float64, col.Len())
-	a.Defined = make([]bool, col.Len())
-	for i, v := range col.Float64Values() {
-		a.Values[i] = v
-		a.Defined[i] = col.IsValid(i)
+	base := len(a.Values)
+	a.Values = append(a.Values, col.Float64Values()...)
+	a.Defined = append(a.Defined, make([]bool, col.Len())...)
+	for i := 0; i < col.Len(); i++ {
+		a.Defined[base+i] = col.IsValid(i)
 	}
 	return nil
 }
@@ -237,21 +237,22 @@ func (a *DoubleAttribute) toOrderedRows() array.Record {
 func (a *DoubleVectorAttribute) readFromOrdered(rec array.Record) error {
 	col := rec.Column(0).(*array.List)
 	defer col.Release()
-	a.Values = make([]DoubleVectorAttributeValue, col.Len())
-	a.Defined = make([]bool, col.Len())
+	base := len(a.Values)
+	a.Values = append(a.Values, make([]DoubleVectorAttributeValue, col.Len())...)
+	a.Defined = append(a.Defined, make([]bool, col.Len())...)
 	offsets := col.Offsets()
 	values := col.ListValues().(*array.Float64)
 	defer values.Release()
 	for i := 0; i < col.Len(); i++ {
-		a.Defined[i] = col.IsValid(i)
-		if a.Defined[i] {
+		a.Defined[base+i] = col.IsValid(i)
+		if a.Defined[base+i] {
 			start := int(offsets[i])
 			end := int(offsets[i+1])
 			list := make([]float64, end-start)
 			for j := 0; j < end-start; j++ {
 				list[j] = values.Value(start + j)
 			}
-			a.Values[i] = DoubleVectorAttributeValue(list)
+			a.Values[base+i] = DoubleVectorAttributeValue(list)
 		}
 	}
 	return nil
@@ -277,11 +278,11 @@ func (a *DoubleVectorAttribute) toOrderedRows() array.Record {
 func (a *LongAttribute) readFromOrdered(rec array.Record) error {
 	col := rec.Column(0).(*array.Int64)
 	defer col.Release()
-	a.Values = make([]int64, col.Len())
-	a.Defined = make([]bool, col.Len())
-	for i, v := range col.Int64Values() {
-		a.Values[i] = v
-		a.Defined[i] = col.IsValid(i)
+	base := len(a.Values)
+	a.Values = append(a.Values, col.Int64Values()...)
+	a.Defined = append(a.Defined, make([]bool, col.Len())...)
+	for i := 0; i < col.Len(); i++ {
+		a.Defined[base+i] = col.IsValid(i)
 	}
 	return nil
 }
@@ -297,21 +298,22 @@ func (a *LongAttribute) toOrderedRows() array.Record {
 func (a *LongVectorAttribute) readFromOrdered(rec array.Record) error {
 	col := rec.Column(0).(*array.List)
 	defer col.Release()
-	a.Values = make([]LongVectorAttributeValue, col.Len())
-	a.Defined = make([]bool, col.Len())
+	base := len(a.Values)
+	a.Values = append(a.Values, make([]LongVectorAttributeValue, col.Len())...)
+	a.Defined = append(a.Defined, make([]bool, col.Len())...)
 	offsets := col.Offsets()
 	values := col.ListValues().(*array.Int64)
 	defer values.Release()
 	for i := 0; i < col.Len(); i++ {
-		a.Defined[i] = col.IsValid(i)
-		if a.Defined[i] {
+		a.Defined[base+i] = col.IsValid(i)
+		if a.Defined[base+i] {
 			start := int(offsets[i])
 			end := int(offsets[i+1])
 			list := make([]int64, end-start)
 			for j := 0; j < end-start; j++ {
 				list[j] = values.Value(start + j)
 			}
-			a.Values[i] = LongVectorAttributeValue(list)
+			a.Values[base+i] = LongVectorAttributeValue(list)
 		}
 	}
 	return nil
@@ -44,4 +44,16 @@ func init() {
 	diskOperationRepository["PredictWithGCN"] = pythonOperation("predict_with_GCN")
 	diskOperationRepository["DerivePython"] = pythonOperation("derive")
 	diskOperationRepository["CreateGraphInPython"] = pythonOperation("create_graph_in_python")
+	diskOperationRepository["PersonalizedPageRank"] = pythonOperation("pagerank")
+	diskOperationRepository["HITS"] = pythonOperation("hits")
+	diskOperationRepository["SphynxEmbeddedness"] = pythonOperation("triangles")
+	diskOperationRepository["SphynxClusteringCoefficient"] = pythonOperation("triangles")
+	diskOperationRepository["TriangleCount"] = pythonOperation("triangles")
+	diskOperationRepository["LouvainClustering"] = pythonOperation("louvain")
+	diskOperationRepository["SphynxConcatenateBundlesMulti"] = pythonOperation("triadic_closure")
+	diskOperationRepository["SphynxConnectedComponents"] = pythonOperation("connected_components")
+	diskOperationRepository["StronglyConnectedComponents"] = pythonOperation("connected_components")
+	diskOperationRepository["SphynxShortestPath"] = pythonOperation("shortest_path")
+	diskOperationRepository["SphynxIntervalBucketing"] = pythonOperation("interval_bucketing")
+	diskOperationRepository["SphynxDoubleBucketing"] = pythonOperation("interval_bucketing")
 }
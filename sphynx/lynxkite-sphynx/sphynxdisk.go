@@ -129,19 +129,17 @@ func loadFromOrderedDisk(dataDir string, guid GUID) (Entity, error) {
 			return nil, fmt.Errorf("Failed to open %v: %v", dirName, err)
 		}
 		defer r.Close()
-		// Arrow files can have multiple records. We user zero records for empty
-		// entities or one record. We never use more than one record.
-		if r.NumRecords() == 1 {
-			rec, err := r.Record(0)
+		// Arrow files can have multiple records. We write zero records for empty
+		// entities and one record otherwise. Python operations that stream their
+		// outputs can write more records. These are appended in order.
+		for i := 0; i < r.NumRecords(); i++ {
+			rec, err := r.Record(i)
 			if err != nil {
 				return nil, fmt.Errorf("Failed to read %v: %v", dirName, err)
 			}
-			defer rec.Release()
 			if err = e.readFromOrdered(rec); err != nil {
 				return nil, fmt.Errorf("Could not read %v: %v", dirName, err)
 			}
-		} else if r.NumRecords() > 1 {
-			return nil, fmt.Errorf("%v has %v records, expected 1.", dirName, r.NumRecords())
 		}
 	case *Scalar:
 		*e, err = readScalar(dirName)
@@ -0,0 +1,16 @@
+'''Weakly or strongly connected components with SciPy.
+
+Used for the SphynxConnectedComponents operation, where the input is already symmetric, and for the
+StronglyConnectedComponents operation, where edge directions matter.
+'''
+import numpy as np
+import scipy.sparse.csgraph
+from . import util
+
+op = util.Op()
+a = op.input_csr('es')
+connection = 'strong' if op.name == 'StronglyConnectedComponents' else 'weak'
+count, components = scipy.sparse.csgraph.connected_components(a, connection=connection)
+print('found', count, 'components')
+op.output_vs('segments', count)
+op.output_es('belongsTo', np.stack([np.arange(len(components)), components]))
@@ -2,6 +2,7 @@
 import numpy as np
 import pandas as pd
 import os
+import pyarrow as pa
 import types
 from . import util
 
@@ -36,20 +37,6 @@ def assert_no_extra(columns, name):
     sys.exit(1)
 
 
-assert_no_extra(vs.columns, 'vs')
-assert_no_extra(set(es.columns) - set(['src', 'dst']), 'es')
-assert_no_extra(graph_attributes.__dict__.keys(), 'graph_attributes')
-# Save outputs.
-field_names = {f['parent'] + '.' + f['name'] for f in op.params['outputFields']}
-if 'src' in es.columns and 'dst' in es.columns:
-  op.output_es('edges', np.stack([es.src, es.dst]))
-elif len(es.columns) != 0:
-  import sys
-  print("To output edges you have to set es['src'] and es['dst'].", file=sys.stderr)
-  sys.exit(1)
-else:
-  op.output_es('edges', ([], []))
-op.output_vs('vertices', len(vs))
 typenames = {
     f['parent'] + '.' + f['name']: f['tpe']['typename'] for f in op.params['outputFields']}
 typemapping = {
@@ -57,10 +44,83 @@ typemapping = {
     'Double': util.DoubleAttribute,
     'Vector[Double]': util.DoubleVectorAttribute,
 }
+
+
+def output_batches(parent, batches):
+  '''Writes "vs" or "es" and their attributes from an iterable of batches.
+
+  Each batch is a dict of arrays or a DataFrame. The batches are appended to the outputs
+  as they are generated, so the whole graph never has to be in memory.
+  '''
+  names = [fullname.split('.')[1] for fullname in op.outputs if fullname.startswith(parent + '.')]
+  attr_types = {name: typemapping[typenames[parent + '.' + name]] for name in names}
+  attrs = {name: op.open_attribute(parent + '.' + name, attr_types[name]) for name in names}
+  if parent == 'vs':
+    ids = [op.open_vs('vertices')]
+  else:
+    ids = [op.open_es('edges')]
+    if 'edges-idSet' in op.outputs:
+      ids.append(op.open_vs('edges-idSet'))
+  count = 0
+  for batch in batches:
+    columns = set(batch.keys())
+    if parent == 'es':
+      assert 'src' in columns and 'dst' in columns, 'Every es batch must have "src" and "dst".'
+      columns -= set(['src', 'dst'])
+    assert_no_extra(columns, parent)
+    missing = set(names) - columns
+    assert not missing, f'{parent} batch does not have columns named: {", ".join(missing)}'
+    sizes = set(len(batch[c]) for c in batch.keys())
+    assert len(sizes) == 1, f'Each {parent} batch must have columns of the same length.'
+    size = sizes.pop()
+    sparkId = pa.array(np.arange(count, count + size), pa.int64())
+    if parent == 'vs':
+      ids[0].write(sparkId)
+    else:
+      ids[0].write(
+          pa.array(batch['src'], pa.uint32()), pa.array(batch['dst'], pa.uint32()), sparkId)
+      if len(ids) > 1:
+        ids[1].write(sparkId)
+    for name, writer in attrs.items():
+      writer.write(util.to_arrow(batch[name], attr_types[name]))
+    count += size
+  for w in ids + list(attrs.values()):
+    w.close()
+
+
+streamed = set()
+for parent, data in [('vs', vs), ('es', es)]:
+  if not isinstance(data, pd.DataFrame):
+    try:
+      output_batches(parent, data)
+    except BaseException:
+      import sys
+      print(f'\nCould not output {parent}:\n', file=sys.stderr)
+      raise
+    streamed.add(parent)
+if 'vs' not in streamed:
+  assert_no_extra(vs.columns, 'vs')
+if 'es' not in streamed:
+  assert_no_extra(set(es.columns) - set(['src', 'dst']), 'es')
+assert_no_extra(graph_attributes.__dict__.keys(), 'graph_attributes')
+# Save outputs.
+if 'es' not in streamed:
+  if 'src' in es.columns and 'dst' in es.columns:
+    op.output_es('edges', np.stack([es.src, es.dst]))
+  elif len(es.columns) != 0:
+    import sys
+    print("To output edges you have to set es['src'] and es['dst'].", file=sys.stderr)
+    sys.exit(1)
+  else:
+    op.output_es('edges', ([], []))
+if 'vs' not in streamed:
+  op.output_vs('vertices', len(vs))
 for fullname in op.outputs.keys():
   if '.' not in fullname:
     continue
   parent, name = fullname.split('.')
+  if parent in streamed:
+    continue
   try:
     if parent == 'vs':
       assert name in vs.columns, f'vs does not have a column named "{name}"'
@@ -1,16 +1,35 @@
-'''Makes some PyTorch-Geometric datasets available in LynxKite.'''
-import torch_geometric.datasets as ds
+'''Makes some PyTorch-Geometric datasets available in LynxKite.
+
+If SPHYNX_DATASET_CACHE_DIR is set, the converted outputs are cached there in
+<cache>/<name>/v<VERSION>/<output>/. Later loads just hard-link the cached files.
+The cache directory can be pre-seeded to make the datasets available offline.
+'''
+import os
 from . import util
 
+# Increase this when the outputs change to invalidate the existing caches.
+VERSION = 1
+
 op = util.Op()
 name = op.params["name"]
-print('loading dataset', name)
-if name == 'Karate Club':
-  data = ds.KarateClub().data
+cache_root = os.environ.get('SPHYNX_DATASET_CACHE_DIR')
+cache = f'{cache_root}/{name}/v{VERSION}' if cache_root else None
+if cache and os.path.exists(cache + '/_SUCCESS'):
+  print('loading dataset', name, 'from', cache)
+  for o in op.outputs:
+    op.output_from_directory(o, f'{cache}/{o}')
 else:
-  data = ds.Planetoid('/tmp/' + name, name).data
+  import torch_geometric.datasets as ds
+  print('loading dataset', name)
+  if name == 'Karate Club':
+    data = ds.KarateClub().data
+  else:
+    root = f'{cache_root}/{name}/pyg' if cache_root else '/tmp/' + name
+    data = ds.Planetoid(root, name).data
 
-op.output_vs('vs', len(data.x))
-op.output_es('es', data.edge_index)
-op.output('x', data.x, type=util.DoubleVectorAttribute)
-op.output('y', data.y, type=util.DoubleAttribute)
+  op.output_vs('vs', len(data.x))
+  op.output_es('es', data.edge_index)
+  op.output('x', data.x, type=util.DoubleVectorAttribute)
+  op.output('y', data.y, type=util.DoubleAttribute)
+  if cache:
+    op.save_outputs_to_directory(cache)
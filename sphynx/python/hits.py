@@ -0,0 +1,30 @@
+'''Hub and authority scores (HITS) with sparse matrix-vector products.'''
+import numpy as np
+from . import util
+
+op = util.Op()
+a = op.input_csr('es', weights='weights')
+a.data[a.data <= 0] = 0
+a.eliminate_zeros()
+at = a.T.tocsr()
+n = a.shape[0]
+# An empty graph gets empty outputs.
+hub = np.full(n, 1 / n) if n else np.zeros(0)
+authority = hub.copy()
+
+
+def normalized(x):
+  s = x.sum()
+  return x / s if s > 0 else x
+
+
+for i in range(op.params['maxIterations'] if n else 0):
+  new_authority = normalized(at @ hub)
+  new_hub = normalized(a @ new_authority)
+  change = np.abs(new_hub - hub).sum() + np.abs(new_authority - authority).sum()
+  hub, authority = new_hub, new_authority
+  print('iteration', i, 'change', change)
+  if change < op.params['tolerance']:
+    break
+op.output('hub', hub, type=util.DoubleAttribute)
+op.output('authority', authority, type=util.DoubleAttribute)
@@ -0,0 +1,75 @@
+'''Segments vertices by the buckets their intervals (or values) fall into.
+
+Implements SphynxIntervalBucketing and SphynxDoubleBucketing. Each vertex belongs to a contiguous
+range of buckets. The segments are the union of these ranges, found by sorting them. Then the first
+segment of each vertex is found with a binary search and the memberships are expanded in chunks.
+'''
+import numpy as np
+import pyarrow as pa
+from . import util
+
+# The number of belongsTo edges to generate at once.
+CHUNK_SIZE = 10_000_000
+
+
+def expand_ranges(starts, counts):
+  '''Concatenated ranges of integers: starts[i], starts[i] + 1, ... (counts[i] numbers).'''
+  offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+  return np.repeat(starts, counts) + offsets
+
+
+op = util.Op()
+width = op.params['bucketWidth']
+overlap = op.params['overlap']
+step = width / 2 if overlap else width
+if op.name == 'SphynxDoubleBucketing':
+  begins = ends = op.input('attr')
+else:
+  begins = op.input('beginAttr')
+  ends = op.input('endAttr')
+vertices = np.flatnonzero(~np.isnan(begins) & ~np.isnan(ends))
+first = np.floor(begins[vertices] / step).astype(np.int64)
+last = np.floor(ends[vertices] / step).astype(np.int64)
+if overlap:
+  first -= 1
+nonempty = first <= last
+vertices, first, last = vertices[nonempty], first[nonempty], last[nonempty]
+
+# Merge the overlapping and adjacent ranges to get the set of used buckets.
+order = np.argsort(first, kind='stable')
+sorted_first = first[order]
+reach = np.maximum.accumulate(last[order])
+new_block = np.ones(len(order), dtype=bool)
+new_block[1:] = sorted_first[1:] > reach[:-1] + 1
+block_starts = np.flatnonzero(new_block)
+block_ends = np.r_[block_starts[1:], len(order)][:len(block_starts)] - 1
+block_first = sorted_first[block_starts]
+buckets = expand_ranges(block_first, reach[block_ends] - block_first + 1)
+print('vertices:', len(vertices), 'segments:', len(buckets))
+op.output_vs('segments', len(buckets))
+op.output('bottom', buckets * step, type=util.DoubleAttribute)
+op.output('top', buckets * step + width, type=util.DoubleAttribute)
+
+# Each vertex belongs to a contiguous range of segments.
+segment_start = np.searchsorted(buckets, first)
+counts = last - first + 1
+cost = np.cumsum(counts)
+writers = [op.open_es('belongsTo')]
+if 'belongsTo-idSet' in op.outputs:
+  writers.append(op.open_vs('belongsTo-idSet'))
+start = 0
+done = 0
+while start < len(vertices):
+  end = max(start + 1, np.searchsorted(cost, done + CHUNK_SIZE, side='right'))
+  c = counts[start:end]
+  ids = pa.array(np.arange(done, done + c.sum()), pa.int64())
+  writers[0].write(
+      pa.array(np.repeat(vertices[start:end], c), pa.uint32()),
+      pa.array(expand_ranges(segment_start[start:end], c), pa.uint32()),
+      ids)
+  for w in writers[1:]:
+    w.write(ids)
+  done += len(ids)
+  start = end
+for w in writers:
+  w.close()
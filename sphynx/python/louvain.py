@@ -0,0 +1,115 @@
+'''Finds a modular clustering with the Louvain method.
+
+Edge directions are ignored. The local moving phase is vectorized: in each sweep a random subset
+of the vertices moves to the neighboring cluster with the highest modularity gain at the same time.
+Sweeps that decrease modularity are rejected and retried with a smaller subset. Accepted sweeps
+let the subset grow again. The local moving stops when a sweep gains less than the minimum
+increment. Then the clusters are merged into single vertices and the process is repeated on the
+smaller graph.
+'''
+import numpy as np
+import scipy.sparse
+from . import util
+
+op = util.Op()
+rng = np.random.default_rng(op.params['seed'])
+max_iterations = op.params['maxIterations']
+min_increment = op.params['minIncrementPerIteration']
+# The limit on the number of sweeps in one local moving phase.
+MAX_SWEEPS = 20
+
+
+def indicator(clusters, k):
+  '''The vertex-cluster incidence matrix.'''
+  n = len(clusters)
+  return scipy.sparse.csr_matrix((np.ones(n), (np.arange(n), clusters)), shape=(n, k))
+
+
+def modularity(a, clusters, m2):
+  '''The modularity of a clustering of the symmetric weighted adjacency matrix "a".'''
+  p = indicator(clusters, clusters.max() + 1)
+  inside = (p.T @ a @ p).diagonal()
+  total = p.T @ np.asarray(a.sum(axis=1)).ravel()
+  return (inside / m2 - (total / m2)**2).sum()
+
+
+def relabel(clusters):
+  return np.unique(clusters, return_inverse=True)[1]
+
+
+def local_moving(a, m2):
+  '''Moves vertices between clusters until the modularity no longer improves.'''
+  n = a.shape[0]
+  clusters = np.arange(n)
+  degree = np.asarray(a.sum(axis=1)).ravel()
+  noloop = a - scipy.sparse.diags(a.diagonal())
+  q = modularity(a, clusters, m2)
+  fraction = 0.5
+  for _ in range(MAX_SWEEPS):
+    total = np.bincount(clusters, weights=degree, minlength=n)
+    # Weights from each vertex to each neighboring cluster.
+    links = (noloop @ indicator(clusters, n)).tocoo()
+    v, c, w = links.row, links.col, links.data
+    own = clusters[v] == c
+    # The modularity gain of moving v into c, up to a constant factor and per-vertex offset.
+    gain = w - (total[c] - np.where(own, degree[v], 0)) * degree[v] / m2
+    stay = np.zeros(n)
+    stay_total = total[clusters] - degree
+    stay[:] = -stay_total * degree / m2
+    stay[v[own]] = gain[own]
+    # Pick the best cluster for every vertex.
+    order = np.lexsort((-gain, v))
+    v, c, gain = v[order], c[order], gain[order]
+    first = np.r_[True, v[1:] != v[:-1]]
+    v, c, gain = v[first], c[first], gain[first]
+    movers = (gain > stay[v] + 1e-12) & (c != clusters[v]) & (rng.random(len(v)) < fraction)
+    if not movers.any():
+      break
+    candidate = clusters.copy()
+    candidate[v[movers]] = c[movers]
+    new_q = modularity(a, candidate, m2)
+    if new_q > q:
+      gained = new_q - q
+      clusters, q = candidate, new_q
+      if gained < min_increment:
+        break
+      fraction = min(0.5, fraction * 2)
+    else:
+      fraction /= 2
+      if fraction < 0.01:
+        break
+  return relabel(clusters), q
+
+
+def louvain(a):
+  '''Returns the cluster of each vertex and the modularity of the clustering.'''
+  m2 = a.sum()
+  clusters = np.arange(a.shape[0])
+  q = modularity(a, clusters, m2)
+  iteration = 0
+  while iteration != max_iterations:
+    iteration += 1
+    level, new_q = local_moving(a, m2)
+    print('iteration', iteration, 'modularity', new_q, 'clusters', level.max() + 1)
+    if level.max() + 1 == a.shape[0] or new_q - q < min_increment:
+      if new_q > q:
+        clusters, q = level[clusters], new_q
+      break
+    clusters, q = level[clusters], new_q
+    # Merge each cluster into a single vertex.
+    p = indicator(level, level.max() + 1)
+    a = (p.T @ a @ p).tocsr()
+  return clusters, q
+
+
+a = op.input_csr('es', weights='weights')
+a.data[a.data <= 0] = 0
+a.eliminate_zeros()
+a = (a + a.T).tocsr()
+if a.nnz == 0:
+  clusters, q = np.arange(a.shape[0]), 0.0
+else:
+  clusters, q = louvain(a)
+op.output_vs('clusters', clusters.max() + 1 if len(clusters) else 0)
+op.output_es('belongsTo', np.stack([np.arange(len(clusters)), clusters]))
+op.output_scalar('modularity', q)
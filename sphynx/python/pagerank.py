@@ -0,0 +1,32 @@
+'''Personalized PageRank with sparse matrix-vector products.'''
+import numpy as np
+import scipy.sparse
+from . import util
+
+op = util.Op()
+damping = op.params['dampingFactor']
+# Like in the Spark PageRank we only keep positive weights.
+a = op.input_csr('es', weights='weights')
+a.data[a.data <= 0] = 0
+a.eliminate_zeros()
+n = a.shape[0]
+out_weight = np.asarray(a.sum(axis=1)).ravel()
+dangling = out_weight == 0
+# Row-normalized transition matrix, transposed so that p @ rank gives the incoming rank.
+p = (scipy.sparse.diags(1 / np.where(dangling, 1, out_weight)) @ a).T.tocsr()
+seed = np.nan_to_num(op.input('personalization'))
+seed[seed < 0] = 0
+assert seed.sum() > 0, 'The personalization weights must be positive for at least one vertex.'
+seed = seed / seed.sum()
+
+rank = seed.copy()
+for i in range(op.params['maxIterations']):
+  # The random walk jumps to a seed vertex when it stops or reaches a dead end.
+  new_rank = damping * (p @ rank) + (1 - damping * (1 - rank[dangling].sum())) * seed
+  change = np.abs(new_rank - rank).sum()
+  rank = new_rank
+  print('iteration', i, 'change', change)
+  if change < op.params['tolerance']:
+    break
+# Scale it like the Spark PageRank, where the average rank is 1.
+op.output('pagerank', rank * n, type=util.DoubleAttribute)
@@ -0,0 +1,42 @@
+'''Shortest path distances from a set of starting vertices.
+
+Like the Spark implementation, each iteration extends the paths by one edge, so "maxIterations"
+limits the number of edges on the paths. In the common case of unit edge distances and equal
+starting distances (like in snowball sampling) this is a multi-source breadth-first search, which
+we run with SciPy. Otherwise we do the same synchronous Bellman-Ford iterations as Spark,
+vectorized.
+'''
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import scipy.sparse.csgraph
+from . import util
+
+op = util.Op()
+max_iterations = int(op.params['maxIterations'])
+n = op.input_arrow('vs').length()
+es = op.input('es')
+edge_distance = op.input('edgeDistance')
+start = op.input('startingDistance')
+defined = ~np.isnan(edge_distance)
+src = es.src.values[defined].astype(np.int64)
+dst = es.dst.values[defined].astype(np.int64)
+w = edge_distance[defined]
+sources = np.flatnonzero(~np.isnan(start))
+distance = np.where(np.isnan(start), np.inf, start)
+
+if len(sources) and (w == 1).all() and (start[sources] == start[sources[0]]).all():
+  a = scipy.sparse.csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+  hops = scipy.sparse.csgraph.dijkstra(
+      a, indices=sources, unweighted=True, min_only=True, limit=max_iterations)
+  distance = start[sources[0]] + hops
+else:
+  for i in range(max_iterations):
+    new_distance = distance.copy()
+    np.minimum.at(new_distance, dst, distance[src] + w)
+    if np.array_equal(new_distance, distance):
+      break
+    distance = new_distance
+    print('iteration', i, 'reached', np.isfinite(distance).sum(), 'vertices')
+distance[np.isinf(distance)] = np.nan
+op.output('distance', pd.Series(distance), type=util.DoubleAttribute)
@@ -0,0 +1,69 @@
+'''Concatenates two edge bundles: for n A->B edges and m B->C edges creates n*m A->C edges.
+
+This is the sparse matrix product of the two adjacency matrices, but keeping each path separately.
+The A->B edges are processed in blocks of rows, ordered by source, so that the output can be
+written in bounded memory. Each new edge is mapped back to the A->B and B->C edges it was made of,
+so the original edge attributes of both hops can be pulled over to it.
+'''
+import numpy as np
+import pyarrow as pa
+from . import util
+
+# The number of output edges to generate at once.
+CHUNK_SIZE = 10_000_000
+
+op = util.Op()
+n_b = op.input_arrow('vsB').length()
+ab = op.input_arrow('edgesAB')
+bc = op.input_arrow('edgesBC')
+ab_src = ab.column('src').to_numpy().astype(np.int64)
+ab_dst = ab.column('dst').to_numpy().astype(np.int64)
+bc_src = bc.column('src').to_numpy().astype(np.int64)
+bc_dst = bc.column('dst').to_numpy().astype(np.int64)
+# B->C edges in CSR layout: the edges from b are bc_order[bc_start[b]:bc_start[b + 1]].
+bc_order = np.argsort(bc_src, kind='stable')
+bc_start = np.r_[0, np.cumsum(np.bincount(bc_src, minlength=n_b))]
+# A->B edges ordered by source, and the number of paths each of them starts.
+ab_order = np.argsort(ab_src, kind='stable')
+paths = (bc_start[ab_dst + 1] - bc_start[ab_dst])[ab_order]
+cost = np.cumsum(paths)
+
+
+def open_edges(name):
+  '''Writers for an edge bundle and its ID set.'''
+  writers = [op.open_es(name)]
+  if name + '-idSet' in op.outputs:
+    writers.append(op.open_vs(name + '-idSet'))
+  return writers
+
+
+def write_edges(writers, src, dst, ids):
+  ids = pa.array(ids, pa.int64())
+  writers[0].write(pa.array(src, pa.uint32()), pa.array(dst, pa.uint32()), ids)
+  for w in writers[1:]:
+    w.write(ids)
+
+
+ac = open_edges('edgesAC')
+first = open_edges('projectionFirst')
+second = open_edges('projectionSecond')
+start = 0
+done = 0
+while start < len(ab_order):
+  end = max(start + 1, np.searchsorted(cost, done + CHUNK_SIZE, side='right'))
+  block = ab_order[start:end]
+  counts = paths[start:end]
+  total = counts.sum()
+  # Each A->B edge is repeated for every B->C edge that continues it.
+  ab_ids = np.repeat(block, counts)
+  offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+  bc_ids = bc_order[np.repeat(bc_start[ab_dst[block]], counts) + offsets]
+  ac_ids = np.arange(done, done + total)
+  write_edges(ac, ab_src[ab_ids], bc_dst[bc_ids], ac_ids)
+  write_edges(first, ac_ids, ab_ids, ac_ids)
+  write_edges(second, ac_ids, bc_ids, ac_ids)
+  print('generated', done + total, 'of', cost[-1], 'edges')
+  done += total
+  start = end
+for w in ac + first + second:
+  w.close()
@@ -0,0 +1,87 @@
+'''Embeddedness, clustering coefficient, and triangle count for every vertex or edge.
+
+The graph is treated as undirected and without loop and parallel edges. We orient each edge
+from the lower-degree vertex to the higher-degree vertex. Then every triangle is found exactly once
+by intersecting the out-neighbors of the two ends of an oriented edge. Out-degrees are at most
+sqrt(2 * edges) in this orientation. The intersections are computed in chunks with sparse matrix
+products.
+'''
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from . import util
+
+# The number of adjacency list elements to intersect at once.
+CHUNK_SIZE = 10_000_000
+
+op = util.Op()
+n = op.input_arrow('vs').length()
+es = op.input('es')
+src = es.src.values.astype(np.int64)
+dst = es.dst.values.astype(np.int64)
+nonloop = src != dst
+# Directed simple graph. Its values count the directions (1 or 2) between two vertices.
+d = scipy.sparse.csr_matrix(
+    (np.ones(nonloop.sum()), (src[nonloop], dst[nonloop])), shape=(n, n))
+d.data[:] = 1
+a = d + d.T
+degree = np.diff(a.indptr)
+# Orient every edge towards the vertex with the higher (degree, id).
+rank = np.empty(n, dtype=np.int64)
+rank[np.lexsort((np.arange(n), degree))] = np.arange(n)
+coo = a.tocoo()
+forward = rank[coo.row] < rank[coo.col]
+o = scipy.sparse.csr_matrix(
+    (coo.data[forward], (coo.row[forward], coo.col[forward])), shape=(n, n))
+o.sort_indices()
+o_rows = np.repeat(np.arange(n), np.diff(o.indptr))
+o_keys = o_rows.astype(np.uint64) * np.uint64(n) + o.indices.astype(np.uint64)
+
+
+def edge_index(x, y):
+  '''Positions of the oriented edges x -> y in "o".'''
+  return np.searchsorted(o_keys, x.astype(np.uint64) * np.uint64(n) + y.astype(np.uint64))
+
+
+# Find all triangles.
+edge_triangles = np.zeros(o.nnz)
+vertex_triangles = np.zeros(n)
+neighbor_edges = np.zeros(n)
+out_degree = np.diff(o.indptr)
+cost = np.cumsum(out_degree[o_rows] + out_degree[o.indices])
+start = 0
+while start < o.nnz:
+  end = max(start + 1, np.searchsorted(cost, cost[start] + CHUNK_SIZE))
+  u = o_rows[start:end]
+  v = o.indices[start:end]
+  # Row i lists the vertices w for which u[i] -> w and v[i] -> w. Together they form a triangle.
+  common = o[u].multiply(o[v]).tocoo()
+  u, v, w = u[common.row], v[common.row], common.col
+  uv = np.arange(start, end)[common.row]
+  uw = edge_index(u, w)
+  vw = edge_index(v, w)
+  edge_triangles += np.bincount(np.concatenate([uv, uw, vw]), minlength=o.nnz)
+  vertex_triangles += np.bincount(np.concatenate([u, v, w]), minlength=n)
+  # The number of directed edges between the neighbors of each vertex.
+  neighbor_edges += np.bincount(
+      np.concatenate([u, v, w]),
+      weights=np.concatenate([o.data[vw], o.data[uw], o.data[uv]]),
+      minlength=n)
+  start = end
+
+if 'embeddedness' in op.outputs:
+  emb = np.full(len(src), np.nan)
+  s, t = src[nonloop], dst[nonloop]
+  s, t = np.where(rank[s] < rank[t], s, t), np.where(rank[s] < rank[t], t, s)
+  emb[nonloop] = edge_triangles[edge_index(s, t)]
+  # The embeddedness of a loop edge is the number of neighbors. Undefined if there are none.
+  loop_degree = degree[src[~nonloop]].astype(float)
+  loop_degree[loop_degree == 0] = np.nan
+  emb[~nonloop] = loop_degree
+  op.output('embeddedness', pd.Series(emb), type=util.DoubleAttribute)
+if 'clustering' in op.outputs:
+  with np.errstate(divide='ignore', invalid='ignore'):
+    clustering = np.where(degree > 1, neighbor_edges / degree / (degree - 1), 1.0)
+  op.output('clustering', clustering, type=util.DoubleAttribute)
+if 'triangles' in op.outputs:
+  op.output('triangles', vertex_triangles, type=util.DoubleAttribute)
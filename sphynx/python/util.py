@@ -24,6 +24,8 @@ class Op:
       argv = sys.argv
     self.datadir = sys.argv[1]
     op = json.loads(sys.argv[2])
+    # The short class name, for modules that implement several operations.
+    self.name = op['Operation']['Class'].split('.')[-1]
     self.params = op['Operation']['Data']
     self.inputs = op['Inputs']
     self.outputs = op['Outputs']
@@ -41,6 +43,24 @@ class Op:
     '''Reads a DoubleVectorAttribute into a Numpy array.'''
     return np.array(self.input_arrow(name).to_pylist())
 
+  def input_csr(self, name, weights=None, vs='vs'):
+    '''Reads an edge bundle as a SciPy CSR matrix. Row i lists the outgoing edges of vertex i.
+
+    The values are the weights if a weight attribute is given, otherwise 1.
+    Parallel edges are summed. Edges with undefined weights are left out.
+    '''
+    import scipy.sparse
+    n = self.input_arrow(vs).length()
+    es = self.input(name)
+    src, dst = es.src.values, es.dst.values
+    if weights is None:
+      w = np.ones(len(src))
+    else:
+      w = self.input(weights)
+      defined = ~np.isnan(w)
+      src, dst, w = src[defined], dst[defined], w[defined]
+    return scipy.sparse.csr_matrix((w, (src, dst)), shape=(n, n))
+
   def input(self, name):
     '''Reads the input as a Numpy Array or Pandas DataFrame.'''
     # Makes a copy if the data has nulls or is not a primitive type.
@@ -87,15 +107,18 @@ class Op:
     with open(path + '/type_name', 'w') as f:
       f.write(type)
 
+  def output_path(self, name):
+    return self.datadir + '/' + self.outputs[name]
+
   def write_columns(self, name, type, columns):
-    path = self.datadir + '/' + self.outputs[name]
+    path = self.output_path(name)
     self.write_type(path, type)
     schema = pa.schema([
         pa.field(name, a.type) for (name, a) in columns.items()])
     t = pa.Table.from_arrays(list(columns.values()), schema=schema)
     with pa.output_stream(path + '/data.arrow') as sink:
       writer = pa.RecordBatchFileWriter(sink, t.schema)
-      batches = t.to_batches(max_chunksize=len(t))
+      batches = t.to_batches(max_chunksize=max(len(t), 1))
       if batches:
         assert len(batches) == 1
         writer.write_batch(batches[0])
@@ -103,9 +126,28 @@ class Op:
     with open(path + '/_SUCCESS', 'w'):
       pass
 
+  def open_output(self, name, type, fields):
+    '''Opens an output for writing it in batches. Returns a BatchWriter.'''
+    path = self.output_path(name)
+    self.write_type(path, type)
+    return BatchWriter(path, pa.schema(fields))
+
+  def open_vs(self, name):
+    '''Opens a vertex set for writing in batches. Write the sparkId columns.'''
+    return self.open_output(name, 'VertexSet', [('sparkId', pa.int64())])
+
+  def open_es(self, name):
+    '''Opens an edge bundle for writing in batches. Write the src, dst, and sparkId columns.'''
+    return self.open_output(name, 'EdgeBundle', [
+        ('src', pa.uint32()), ('dst', pa.uint32()), ('sparkId', pa.int64())])
+
+  def open_attribute(self, name, type):
+    '''Opens an attribute for writing in batches. Write the value columns.'''
+    return self.open_output(name, type, [('value', PA_TYPES[type])])
+
   def output_vs(self, name, count):
     '''Writes a vertex set to disk. You just specify the vertex count.'''
-    self.write_columns(name, 'VertexSet', {'sparkId': pa.array(range(count), pa.int64())})
+    self.write_columns(name, 'VertexSet', {'sparkId': pa.array(np.arange(count), pa.int64())})
 
   def output_es(self, name, edge_index):
     '''Writes an edge bundle specified as a 2xN matrix to disk.'''
@@ -115,16 +157,16 @@ class Op:
     self.write_columns(name, 'EdgeBundle', {
         'src': pa.array(src, pa.uint32()),
         'dst': pa.array(dst, pa.uint32()),
-        'sparkId': pa.array(range(len(src)), pa.int64()),
+        'sparkId': pa.array(np.arange(len(src)), pa.int64()),
     })
     if name + '-idSet' in self.outputs:
       self.write_columns(name + '-idSet', 'VertexSet', {
-          'sparkId': pa.array(range(len(src)), pa.int64()),
+          'sparkId': pa.array(np.arange(len(src)), pa.int64()),
       })
 
   def output_scalar(self, name, value):
     '''Writes a scalar to disk.'''
-    path = self.datadir + '/' + self.outputs[name]
+    path = self.output_path(name)
     self.write_type(path, 'Scalar')
     with open(path + '/serialized_data', 'w') as f:
       json.dump(value, f)
@@ -134,11 +176,32 @@ class Op:
   def output_model(self, name, model, description):
     '''Writes PyTorch model to disk.'''
     import torch
-    path = self.datadir + '/' + self.outputs[name]
+    path = self.output_path(name)
     os.makedirs(path, exist_ok=True)
     torch.save(model, path + '/model.pt')
     self.output_scalar(name, description)
 
+  def output_from_directory(self, name, src):
+    '''Writes an output by hard-linking (or copying) the files of an earlier output.'''
+    path = self.output_path(name)
+    os.makedirs(path, exist_ok=True)
+    link_or_copy_files(src, path)
+
+  def save_outputs_to_directory(self, dst):
+    '''Hard-links (or copies) all written outputs to a directory. Use it for caching.'''
+    tmp = f'{dst}.tmp-{os.getpid()}'
+    for name in self.outputs:
+      os.makedirs(f'{tmp}/{name}', exist_ok=True)
+      link_or_copy_files(self.output_path(name), f'{tmp}/{name}')
+    with open(tmp + '/_SUCCESS', 'w'):
+      pass
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+      os.rename(tmp, dst)
+    except OSError:  # Another process has saved it first.
+      import shutil
+      shutil.rmtree(tmp, ignore_errors=True)
+
   def run_in_chroot(self):
     '''Runs this operation in a chroot environment.
 
@@ -186,3 +249,49 @@ class Op:
         shutil.move(f'{jail}/data/{e}', f'{self.datadir}/{e}')
       subprocess.run(['rm', '-rf', jail], check=True)
       sys.exit(0)
+
+
+class BatchWriter:
+  '''Writes an output one batch at a time, so it never has to be in memory as a whole.'''
+
+  def __init__(self, path, schema):
+    self.path = path
+    self.schema = schema
+    self.sink = pa.output_stream(path + '/data.arrow')
+    self.writer = pa.RecordBatchFileWriter(self.sink, schema)
+    self.count = 0
+
+  def write(self, *columns):
+    '''Appends a batch. The columns are PyArrow Arrays in the order of the schema.'''
+    batch = pa.RecordBatch.from_arrays(list(columns), schema=self.schema)
+    if batch.num_rows:
+      self.writer.write_batch(batch)
+      self.count += batch.num_rows
+
+  def close(self):
+    self.writer.close()
+    self.sink.close()
+    with open(self.path + '/_SUCCESS', 'w'):
+      pass
+
+
+def to_arrow(values, type):
+  '''Converts a list, Numpy array, or Pandas Series to a PyArrow Array of the given type.'''
+  if hasattr(values, 'numpy'):  # Turn PyTorch Tensors into Numpy arrays.
+    values = values.numpy()
+  if isinstance(values, np.ndarray) and values.ndim > 1:
+    values = list(values)
+  # Pandas uses nan for missing values, but PyArrow uses None.
+  return pa.array(values, PA_TYPES[type], from_pandas=True)
+
+
+def link_or_copy_files(src, dst):
+  '''Hard-links the files from one directory to another. Falls back to copying.'''
+  import shutil
+  for f in os.listdir(src):
+    if os.path.exists(f'{dst}/{f}'):
+      os.remove(f'{dst}/{f}')
+    try:
+      os.link(f'{src}/{f}', f'{dst}/{f}')
+    except OSError:  # Different file systems, for example.
+      shutil.copyfile(f'{src}/{f}', f'{dst}/{f}')
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+'''
+Benchmarks the Python operations of Sphynx without LynxKite and Sphynx.
+
+   ./python_benchmark.py --benchmarks pagerank,derive --sizes 10000,100000,1000000
+
+For each benchmark and size this writes synthetic inputs to a temporary directory in the layout
+that util.Op expects and runs the module like python.go does. It reports the wall-clock time,
+the peak memory use (RSS) of the process, and the size of the outputs. The size is the number of
+edges (or vertices for operations without edges). The inputs are generated with a fixed seed.
+
+Save the results with --output and compare them with an earlier run with --compare, for example
+before and after a change. Benchmarks whose dependencies are not installed are reported as failed.
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import numpy as np
+import pyarrow as pa
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OP_PREFIX = 'com.lynxanalytics.biggraph.graph_operations.'
+
+
+class DataDir:
+  '''A temporary Sphynx data directory with synthetic inputs.'''
+
+  def __init__(self, path, rng):
+    self.path = path
+    self.rng = rng
+    self.inputs = {}
+
+  def write(self, name, type_name, columns):
+    guid = str(uuid.uuid4())
+    self.inputs[name] = guid
+    path = f'{self.path}/{guid}'
+    os.makedirs(path)
+    with open(path + '/type_name', 'w') as f:
+      f.write(type_name)
+    t = pa.table(columns)
+    with pa.OSFile(path + '/data.arrow', 'wb') as sink:
+      with pa.ipc.new_file(sink, t.schema) as writer:
+        writer.write_table(t)
+    with open(path + '/_SUCCESS', 'w'):
+      pass
+
+  def vertices(self, name, n):
+    self.write(name, 'VertexSet', {'sparkId': pa.array(np.arange(n), pa.int64())})
+
+  def edges(self, name, n, m):
+    self.write(name, 'EdgeBundle', {
+        'src': pa.array(self.rng.integers(0, n, m), pa.uint32()),
+        'dst': pa.array(self.rng.integers(0, n, m), pa.uint32()),
+        'sparkId': pa.array(np.arange(m), pa.int64()),
+    })
+
+  def graph(self, size):
+    '''A random graph with "size" edges and an average degree of 10.'''
+    n = max(1, size // 10)
+    self.vertices('vs', n)
+    self.edges('es', n, size)
+    return n
+
+  def doubles(self, name, values):
+    self.write(name, 'DoubleAttribute', {'value': pa.array(values, pa.float64())})
+
+  def vectors(self, name, values):
+    t = pa.list_(pa.field('element', pa.float64(), nullable=False))
+    self.write(name, 'DoubleVectorAttribute', {'value': pa.array(list(values), t)})
+
+
+def derive(d, size):
+  d.vertices('vs', size)
+  d.doubles('vs.x', d.rng.random(size))
+  field = {'parent': 'vs', 'tpe': {'typename': 'Double'}}
+  return 'derive', 'DerivePython', {
+      'code': "vs['y'] = vs.x * 2",
+      'inputFields': [dict(field, name='x')],
+      'outputFields': [dict(field, name='y')],
+  }, ['vs.y']
+
+
+def pca(d, size):
+  d.vertices('vs', size)
+  d.vectors('vector', d.rng.random((size, 16)))
+  return 'pca', 'PCA', {'dimensions': 2}, ['embedding']
+
+
+def node2vec(d, size):
+  d.graph(size)
+  return 'node2vec', 'Node2Vec', {
+      'dimensions': 16, 'iterations': 1, 'walkLength': 10, 'walksPerNode': 1, 'contextSize': 5,
+  }, ['embedding']
+
+
+def pagerank(d, size):
+  n = d.graph(size)
+  d.doubles('weights', np.ones(size))
+  d.doubles('personalization', d.rng.random(n))
+  return 'pagerank', 'PersonalizedPageRank', {
+      'dampingFactor': 0.85, 'maxIterations': 30, 'tolerance': 0.0}, ['pagerank']
+
+
+def hits(d, size):
+  d.graph(size)
+  d.doubles('weights', np.ones(size))
+  return 'hits', 'HITS', {'maxIterations': 30, 'tolerance': 0.0}, ['hub', 'authority']
+
+
+def triangles(d, size):
+  d.graph(size)
+  return 'triangles', 'TriangleCount', {}, ['triangles']
+
+
+def louvain(d, size):
+  d.graph(size)
+  d.doubles('weights', np.ones(size))
+  return 'louvain', 'LouvainClustering', {
+      'maxIterations': -1, 'minIncrementPerIteration': 0.0001, 'seed': 1,
+  }, ['clusters', 'belongsTo', 'modularity']
+
+
+def connected_components(d, size):
+  d.graph(size)
+  return 'connected_components', 'StronglyConnectedComponents', {}, ['segments', 'belongsTo']
+
+
+def shortest_path(d, size):
+  n = d.graph(size)
+  start = np.full(n, np.nan)
+  start[:10] = 0
+  d.doubles('edgeDistance', np.ones(size))
+  d.doubles('startingDistance', start)
+  return 'shortest_path', 'SphynxShortestPath', {'maxIterations': 10}, ['distance']
+
+
+def interval_bucketing(d, size):
+  d.vertices('vs', size)
+  begin = d.rng.normal(size=size)
+  d.doubles('beginAttr', begin)
+  d.doubles('endAttr', begin + np.abs(d.rng.normal(size=size)))
+  return 'interval_bucketing', 'SphynxIntervalBucketing', {'bucketWidth': 0.1, 'overlap': True}, [
+      'segments', 'belongsTo', 'bottom', 'top']
+
+
+def triadic_closure(d, size):
+  # The closure of the graph with itself. Its average degree is 3, so the output is 3 times
+  # larger than the input.
+  n = max(1, size // 3)
+  d.vertices('vsA', n)
+  d.edges('edgesAB', n, size)
+  d.inputs.update(vsB=d.inputs['vsA'], vsC=d.inputs['vsA'], edgesBC=d.inputs['edgesAB'])
+  return 'triadic_closure', 'SphynxConcatenateBundlesMulti', {}, [
+      'edgesAC', 'projectionFirst', 'projectionSecond']
+
+
+BENCHMARKS = {f.__name__: f for f in [
+    derive, pca, node2vec, pagerank, hits, triangles, louvain, connected_components,
+    shortest_path, interval_bucketing, triadic_closure]}
+
+
+def directory_size(path):
+  total = 0
+  for root, _, files in os.walk(path):
+    total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+  return total
+
+
+def prepare(benchmark, size, seed, datadir):
+  '''Writes the inputs of a benchmark. Prints the operation to run as JSON.'''
+  d = DataDir(datadir, np.random.default_rng(seed))
+  module, op_name, params, output_names = BENCHMARKS[benchmark](d, size)
+  print(json.dumps(dict(
+      module=module, op_name=op_name, params=params, inputs=d.inputs, outputs=output_names)))
+
+
+def run(benchmark, size, seed):
+  '''Runs one benchmark in a new data directory. Returns the measurements.'''
+  with tempfile.TemporaryDirectory() as datadir:
+    # The inputs are generated in a separate process. A child process inherits the peak RSS of
+    # its parent on Linux, so this process must stay small.
+    prepared = json.loads(subprocess.check_output([
+        sys.executable, __file__, '--prepare', benchmark, str(size), str(seed), datadir]))
+    outputs = {name: str(uuid.uuid4()) for name in prepared['outputs']}
+    op = dict(
+        GUID=str(uuid.uuid4()), Inputs=prepared['inputs'], Outputs=outputs,
+        Operation=dict(Class=OP_PREFIX + prepared['op_name'], Data=prepared['params']))
+    start = time.monotonic()
+    p = subprocess.Popen(
+        [sys.executable, '-m', 'python.' + prepared['module'], datadir, json.dumps(op)],
+        cwd=HERE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    # Read the output before waiting, so the process cannot block on a full pipe.
+    log = p.stdout.read().decode(errors='replace')
+    # Unlike Popen.wait(), wait4() also returns the resource usage of the process.
+    _, status, usage = os.wait4(p.pid, 0)
+    elapsed = time.monotonic() - start
+    p.returncode = os.waitstatus_to_exitcode(status)
+    if p.returncode != 0:
+      lines = log.strip().splitlines()
+      return dict(error=lines[-1] if lines else f'exit code {p.returncode}')
+    return dict(
+        seconds=elapsed,
+        # ru_maxrss is in kilobytes on Linux.
+        peak_rss_mb=usage.ru_maxrss / 1024,
+        output_mb=sum(directory_size(f'{datadir}/{g}') for g in outputs.values()) / 1e6)
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--benchmarks', type=str, default='all',
+                      help=f'Comma separated list of: {", ".join(BENCHMARKS)}. Default: all')
+  parser.add_argument('--sizes', type=str, default='10000,100000,1000000',
+                      help='Comma separated list of input sizes.')
+  parser.add_argument('--repeat', type=int, default=1,
+                      help='Run each benchmark this many times and keep the fastest run.')
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--output', type=str, help='Save the results to this JSON file.')
+  parser.add_argument('--compare', type=str, help='Compare with the results in this JSON file.')
+  parser.add_argument('--prepare', nargs=4, help=argparse.SUPPRESS)
+  args = parser.parse_args()
+  if args.prepare:
+    benchmark, size, seed, datadir = args.prepare
+    prepare(benchmark, int(size), int(seed), datadir)
+    return
+  benchmarks = list(BENCHMARKS) if args.benchmarks == 'all' else args.benchmarks.split(',')
+  unknown = [b for b in benchmarks if b not in BENCHMARKS]
+  assert not unknown, f'Unknown benchmark(s): {unknown}\nAvailable: {list(BENCHMARKS)}'
+  sizes = [int(float(s)) for s in args.sizes.split(',')]
+
+  results = []
+  print(f'{"benchmark":22} {"size":>11} {"seconds":>9} {"peak MB":>9} {"output MB":>9}')
+  for benchmark in benchmarks:
+    for size in sizes:
+      runs = [run(benchmark, size, args.seed) for _ in range(args.repeat)]
+      ok = [r for r in runs if 'error' not in r]
+      r = min(ok, key=lambda r: r['seconds']) if ok else runs[0]
+      r = dict(benchmark=benchmark, size=size, **r)
+      results.append(r)
+      if 'error' in r:
+        print(f'{benchmark:22} {size:>11}  failed: {r["error"]}')
+      else:
+        print(f'{benchmark:22} {size:>11} {r["seconds"]:9.2f} {r["peak_rss_mb"]:9.1f}'
+              f' {r["output_mb"]:9.1f}')
+  if args.output:
+    metadata = benchmark_results.metadata(seed=args.seed, repeat=args.repeat)
+    benchmark_results.save(args.output, metadata, results)
+  if args.compare:
+    benchmark_results.compare(
+        args.compare, results, ['benchmark', 'size'], ['seconds', 'peak_rss_mb'])
+
+
+if __name__ == '__main__':
+  sys.path.append(os.path.join(HERE, '..', 'tools'))
+  import benchmark_results
+  main()
@@ -202,6 +202,18 @@ class SQLControllerTest extends BigGraphControllerTestBase with OperationsTestBa
 
   }
 
+  test("export table for download again after the file was deleted") {
+    val table = box("Create example graph")
+      .box("SQL1", Map("sql" -> "select name from vertices")).table
+    val request = sqlController.exportTableForDownload(user, table)
+    val file = HadoopFile(request.path)
+    assert((file / "_SUCCESS").exists)
+    file.delete()
+    assert(sqlController.exportTableForDownload(user, table) == request)
+    assert((file / "_SUCCESS").exists)
+    file.delete()
+  }
+
   def getMeta(box: TestBox) = {
     val name = "tmp"
     workspaceController.createWorkspace(user, CreateWorkspaceRequest(name))
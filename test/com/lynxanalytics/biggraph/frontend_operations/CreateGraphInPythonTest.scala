@@ -32,4 +32,27 @@ graph_attributes.hello = 'hello'
         Map(0 -> 1, 1 -> 2, 2 -> 3))
     assert(get(p.scalars("hello").runtimeSafeCast[String]) == "hello")
   }
+
+  test("graph from batches", SphynxOnly) {
+    val p = box("Create graph in Python", Map(
+      "outputs" -> "vs.name: str, es.weight: float",
+      "code" -> """
+vs = (pd.DataFrame({'name': names}) for names in [['Alice', 'Bob'], ['Cecil', 'Drew']])
+def edges():
+  yield {'src': [0, 1], 'dst': [0, 2], 'weight': [1, 2]}
+  yield {'src': np.array([2]), 'dst': np.array([1]), 'weight': np.array([3.0])}
+es = edges()
+          """))
+      .box("Compute degree", Map("direction" -> "all edges"))
+      .project
+    assert(
+      get(p.vertexAttributes("name").runtimeSafeCast[String]) ==
+        Map(0 -> "Alice", 1 -> "Bob", 2 -> "Cecil", 3 -> "Drew"))
+    assert(
+      get(p.vertexAttributes("degree").runtimeSafeCast[Double]) ==
+        Map(0 -> 2, 1 -> 2, 2 -> 2, 3 -> 0))
+    assert(
+      get(p.edgeAttributes("weight").runtimeSafeCast[Double]) ==
+        Map(0 -> 1, 1 -> 2, 2 -> 3))
+  }
 }
@@ -0,0 +1,52 @@
+package com.lynxanalytics.biggraph.frontend_operations
+
+import com.lynxanalytics.biggraph.SphynxOnly
+import com.lynxanalytics.biggraph.graph_api.Scripting._
+import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
+
+class SparseCentralityTest extends OperationsTestBase {
+  def rounded(m: Map[Long, Double]) = m.mapValues(x => (x * 1000).round / 1000.0)
+
+  test("personalized PageRank with constant personalization is PageRank", SphynxOnly) {
+    val p = box("Create example graph")
+      .box("Add constant vertex attribute", Map("name" -> "one", "value" -> "1"))
+      .box("Compute PageRank", Map("iterations" -> "30", "damping" -> "0.5"))
+      .box("Compute personalized PageRank", Map(
+        "personalization" -> "one", "iterations" -> "30", "tolerance" -> "0", "damping" -> "0.5"))
+      .project
+    val expected = rounded(get(p.vertexAttributes("page_rank").runtimeSafeCast[Double]))
+    assert(rounded(get(p.vertexAttributes("personalized_page_rank").runtimeSafeCast[Double])) == expected)
+  }
+
+  test("personalized PageRank", SphynxOnly) {
+    val p = box("Create example graph")
+      .box("Derive vertex attribute", Map(
+        "output" -> "seed", "expr" -> "if (name == \"Bob\") 1.0 else 0.0"))
+      .box("Compute personalized PageRank", Map("personalization" -> "seed"))
+      .project
+    val pr = get(p.vertexAttributes("personalized_page_rank").runtimeSafeCast[Double])
+    assert(pr(3) == 0.0) // Isolated Joe is not reachable from Bob.
+    assert(pr(2) > 0.0)
+    assert(pr(0) > pr(2) && pr(1) > pr(2))
+    assert((pr.values.sum - 4.0).abs < 0.001)
+  }
+
+  test("hub and authority scores", SphynxOnly) {
+    val p = box("Create example graph")
+      .box("Compute hub and authority scores")
+      .project
+    assert(rounded(get(p.vertexAttributes("hub").runtimeSafeCast[Double])) ==
+      Map(0 -> 0.25, 1 -> 0.25, 2 -> 0.5, 3 -> 0.0))
+    assert(rounded(get(p.vertexAttributes("authority").runtimeSafeCast[Double])) ==
+      Map(0 -> 0.5, 1 -> 0.5, 2 -> 0.0, 3 -> 0.0))
+  }
+
+  test("hub and authority scores on an empty graph", SphynxOnly) {
+    val p = box("Create example graph")
+      .box("Filter by attributes", Map("filterva_age" -> "< 0"))
+      .box("Compute hub and authority scores")
+      .project
+    assert(get(p.vertexAttributes("hub").runtimeSafeCast[Double]).isEmpty)
+    assert(get(p.vertexAttributes("authority").runtimeSafeCast[Double]).isEmpty)
+  }
+}
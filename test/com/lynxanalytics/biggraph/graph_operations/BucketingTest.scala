@@ -2,6 +2,7 @@ package com.lynxanalytics.biggraph.graph_operations
 
 import org.scalatest.FunSuite
 
+import com.lynxanalytics.biggraph.SphynxOnly
 import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
 import com.lynxanalytics.biggraph.graph_api.Scripting._
@@ -55,16 +56,12 @@ class BucketingTest extends FunSuite with TestGraphOp {
   }
 
   def getSegmentsWithSizes(bucketing: IntervalBucketing.Output): Seq[((Double, Double), Int)] = {
-    val segmentSizes = bucketing
-      .belongsTo
-      .rdd
-      .map { case (_, edge) => (edge.dst, 1) }
-      .reduceByKey(_ + _)
+    val segmentSizes = get(bucketing.belongsTo).values.groupBy(_.dst).mapValues(_.size)
+    val bottom = get(bucketing.bottom)
+    val top = get(bucketing.top)
     segmentSizes
-      .join(bucketing.bottom.rdd.join(bucketing.top.rdd))
-      .collect
       .toSeq
-      .map { case (_, (size, (bottom, top))) => ((bottom, top), size) }
+      .map { case (segment, size) => ((bottom(segment), top(segment)), size) }
       .sorted
   }
 
@@ -114,4 +111,35 @@ class BucketingTest extends FunSuite with TestGraphOp {
       ((70.0, 80.0), 1),
       ((75.0, 85.0), 1)))
   }
+
+  test("example graph by age intervals on Sphynx", SphynxOnly) {
+    val g = ExampleGraph()().result
+    val ageTimes1_5 = DeriveScala.derive[Double](
+      "age * 1.5",
+      Seq("age" -> g.age.entity))
+    val bucketing = {
+      val op = SphynxIntervalBucketing(bucketWidth = 10.0, overlap = false)
+      op(op.beginAttr, g.age)(op.endAttr, ageTimes1_5).result
+    }
+    assert(getSegmentsWithSizes(bucketing) == Seq(
+      ((0.0, 10.0), 1),
+      ((10.0, 20.0), 1),
+      ((20.0, 30.0), 2),
+      ((30.0, 40.0), 1),
+      ((50.0, 60.0), 1),
+      ((60.0, 70.0), 1),
+      ((70.0, 80.0), 1)))
+  }
+
+  test("example graph by age with overlap on Sphynx", SphynxOnly) {
+    val g = ExampleGraph()().result
+    val bucketing = {
+      val op = SphynxDoubleBucketing(bucketWidth = 20.0, overlap = true)
+      op(op.attr, g.age).result
+    }
+    val segmentSizes = get(bucketing.belongsTo).values.groupBy(_.dst).values.map(_.size).toSeq
+    assert(segmentSizes.sorted == Seq(1, 1, 1, 1, 2, 2))
+    assert(get(bucketing.bottom).values.toSeq.sorted == Seq(-10.0, 0.0, 10.0, 20.0, 40.0, 50.0))
+    assert(get(bucketing.top).values.toSeq.sorted == Seq(10.0, 20.0, 30.0, 40.0, 60.0, 70.0))
+  }
 }
@@ -2,6 +2,7 @@ package com.lynxanalytics.biggraph.graph_operations
 
 import org.scalatest.FunSuite
 
+import com.lynxanalytics.biggraph.SphynxOnly
 import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_api.Scripting._
 import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
@@ -13,4 +14,11 @@ class ClusteringCoefficientTest extends FunSuite with TestGraphOp {
     val out = op(op.vs, g.vertices)(op.es, g.edges).result
     assert(out.clustering.rdd.collect.toMap == Map(0 -> 0.5, 1 -> 0.5, 2 -> 1.0, 3 -> 1.0))
   }
+
+  test("example graph on Sphynx", SphynxOnly) {
+    val g = ExampleGraph()().result
+    val op = SphynxClusteringCoefficient()
+    val out = op(op.vs, g.vertices)(op.es, g.edges).result
+    assert(get(out.clustering) == Map(0 -> 0.5, 1 -> 0.5, 2 -> 1.0, 3 -> 1.0))
+  }
 }
@@ -4,12 +4,14 @@ import org.scalatest.FunSuite
 
 import scala.language.implicitConversions
 
+import com.lynxanalytics.biggraph.SphynxOnly
 import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_api.Scripting._
 import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
 
 class ConcatenateBundlesMultiTest extends FunSuite with TestGraphOp {
-  def concatEdges(abSeq: Seq[(Int, Int)], bcSeq: Seq[(Int, Int)]): Seq[(Int, Int)] = {
+  def concatEdges(
+    abSeq: Seq[(Int, Int)], bcSeq: Seq[(Int, Int)], sphynx: Boolean = false): Seq[(Int, Int)] = {
     val abES = abSeq.map { case (a, b) => a.toLong -> b.toLong }
     val bcES = bcSeq.map { case (a, b) => a.toLong -> b.toLong }
     val aVS = abSeq.map(_._1)
@@ -25,16 +27,19 @@ class ConcatenateBundlesMultiTest extends FunSuite with TestGraphOp {
     val bcOp = AddWeightedEdges(bcES, 1.0)
     val bc = bcOp(bcOp.src, b.vs)(bcOp.dst, c.vs).result
     // Concatenate!
-    val acOp = ConcatenateBundlesMulti()
-    val ac = acOp(
-      acOp.edgesAB, ab.es)(
-        acOp.edgesBC, bc.es).result
+    val ac =
+      if (sphynx) {
+        val acOp = SphynxConcatenateBundlesMulti()
+        acOp(acOp.edgesAB, ab.es)(acOp.edgesBC, bc.es).result
+      } else {
+        val acOp = ConcatenateBundlesMulti()
+        acOp(
+          acOp.edgesAB, ab.es)(
+            acOp.edgesBC, bc.es).result
+      }
 
     // create readable output
-    ac.edgesAC.rdd.map {
-      case (id, edge) =>
-        (edge.src.toInt, edge.dst.toInt)
-    }.collect.toSeq.sorted
+    get(ac.edgesAC).values.map(edge => (edge.src.toInt, edge.dst.toInt)).toSeq.sorted
   }
 
   test("no edge") {
@@ -71,4 +76,11 @@ class ConcatenateBundlesMultiTest extends FunSuite with TestGraphOp {
     assert(concatEdges(ab, bc) === Seq(
       (1, 100), (1, 100), (2, 100), (3, 100), (1, 200), (3, 200), (4, 300)).sorted)
   }
+
+  test("mix of the above on Sphynx", SphynxOnly) {
+    val ab = Seq(1 -> 10, 2 -> 10, 1 -> 20, 3 -> 20, 4 -> 30)
+    val bc = Seq(10 -> 100, 20 -> 100, 20 -> 200, 30 -> 300, 40 -> 400)
+    assert(concatEdges(ab, bc, sphynx = true) === Seq(
+      (1, 100), (1, 100), (2, 100), (3, 100), (1, 200), (3, 200), (4, 300)).sorted)
+  }
 }
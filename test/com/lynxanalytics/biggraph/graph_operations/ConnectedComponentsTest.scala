@@ -9,6 +9,7 @@ import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
 import com.lynxanalytics.biggraph.graph_api.Scripting._
 import com.lynxanalytics.biggraph.spark_util.Implicits._
+import com.lynxanalytics.biggraph.SphynxOnly
 import com.lynxanalytics.biggraph.Timed
 
 object ConnectedComponentsTest {
@@ -74,6 +75,13 @@ class ConnectedComponentsTest extends FunSuite with TestGraphOp {
     assertSameComponents(getComponents(nodes, local = false), expectation)
   }
 
+  test("island and line on Sphynx", SphynxOnly) {
+    val g = SmallTestGraph(Map(0 -> Seq(), 1 -> Seq(2), 2 -> Seq(1))).result
+    val op = SphynxConnectedComponents()
+    val cc = op(op.es, g.es).result
+    assertSameComponents(cc.belongsTo.toPairSeq.toMap, Map(0 -> 0, 1 -> 1, 2 -> 1))
+  }
+
   test("benchmark cc", com.lynxanalytics.biggraph.Benchmark) {
     class Demo(outdegree: Int, vSize: Int, seed: Int) {
       val rand = new Random(seed)
@@ -2,6 +2,7 @@ package com.lynxanalytics.biggraph.graph_operations
 
 import org.scalatest.FunSuite
 
+import com.lynxanalytics.biggraph.SphynxOnly
 import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_api.Scripting._
 import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
@@ -13,4 +14,11 @@ class EmbeddednessTest extends FunSuite with TestGraphOp {
     val out = op(op.es, g.es).result
     assert(out.embeddedness.rdd.collect.toMap == Map(0 -> 1, 1 -> 1, 2 -> 2, 3 -> 1, 4 -> 1))
   }
+
+  test("two triangles sharing a common edge on Sphynx", SphynxOnly) {
+    val g = SmallTestGraph(Map(0 -> Seq(1, 2), 1 -> Seq(2, 3), 2 -> Seq(3), 3 -> Seq()))().result
+    val op = SphynxEmbeddedness()
+    val out = op(op.es, g.es).result
+    assert(get(out.embeddedness) == Map(0 -> 1.0, 1 -> 1.0, 2 -> 2.0, 3 -> 1.0, 4 -> 1.0))
+  }
 }
@@ -0,0 +1,20 @@
+package com.lynxanalytics.biggraph.graph_operations
+
+import org.scalatest.FunSuite
+
+import com.lynxanalytics.biggraph.SphynxOnly
+import com.lynxanalytics.biggraph.graph_api._
+import com.lynxanalytics.biggraph.graph_api.Scripting._
+import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
+
+class LouvainClusteringTest extends FunSuite with TestGraphOp {
+  test("two triangles connected by an edge", SphynxOnly) {
+    val g = SmallTestGraph(
+      Map(0 -> Seq(1), 1 -> Seq(2), 2 -> Seq(0, 3), 3 -> Seq(4), 4 -> Seq(5), 5 -> Seq(3)))().result
+    val op = LouvainClustering(maxIterations = -1, minIncrementPerIteration = 0.0001, seed = 1)
+    val out = op(op.es, g.es)(op.weights, g.es.const(1.0)).result
+    val clusters = out.belongsTo.toPairSeq.groupBy(_._2).values.map(_.map(_._1).toSet).toSet
+    assert(clusters == Set(Set(0L, 1L, 2L), Set(3L, 4L, 5L)))
+    assert(Math.abs(out.modularity.value - (6.0 / 7 - 0.5)) < 1e-9)
+  }
+}
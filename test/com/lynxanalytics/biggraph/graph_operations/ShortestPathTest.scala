@@ -2,6 +2,7 @@ package com.lynxanalytics.biggraph.graph_operations
 
 import org.scalatest.FunSuite
 
+import com.lynxanalytics.biggraph.SphynxOnly
 import com.lynxanalytics.biggraph.graph_api._
 import com.lynxanalytics.biggraph.graph_api.Scripting._
 import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
@@ -56,6 +57,18 @@ class ShortestPathTest extends FunSuite with TestGraphOp {
       5 -> 110.0))
   }
 
+  test("one-line graph on Sphynx", SphynxOnly) {
+    val graph = SmallTestGraph(
+      Map(0 -> Seq(1), 1 -> Seq(2), 2 -> Seq(3), 3 -> Seq(4), 4 -> Seq(5), 5 -> Seq())).result
+    val startingDistance = AddVertexAttribute.run(graph.vs, Map(0 -> 100.0))
+    val edgeDistance = AddConstantAttribute.run(graph.es.idSet, 2.0)
+    val distance = {
+      val op = SphynxShortestPath(3)
+      op(op.vs, graph.vs)(op.es, graph.es)(op.edgeDistance, edgeDistance)(op.startingDistance, startingDistance).result.distance
+    }
+    assert(get(distance) == Map(0 -> 100.0, 1 -> 102.0, 2 -> 104.0, 3 -> 106.0))
+  }
+
   test("graph with two paths with different weights") {
     val graph = SmallTestGraph(
       Map(
@@ -0,0 +1,19 @@
+package com.lynxanalytics.biggraph.graph_operations
+
+import org.scalatest.FunSuite
+
+import com.lynxanalytics.biggraph.SphynxOnly
+import com.lynxanalytics.biggraph.graph_api._
+import com.lynxanalytics.biggraph.graph_api.Scripting._
+import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
+
+class StronglyConnectedComponentsTest extends FunSuite with TestGraphOp {
+  test("cycles connected by a one-way edge", SphynxOnly) {
+    val g = SmallTestGraph(
+      Map(0 -> Seq(1), 1 -> Seq(2), 2 -> Seq(0, 3), 3 -> Seq(4), 4 -> Seq(3), 5 -> Seq()))().result
+    val op = StronglyConnectedComponents()
+    val out = op(op.es, g.es).result
+    val components = out.belongsTo.toPairSeq.groupBy(_._2).values.map(_.map(_._1).toSet).toSet
+    assert(components == Set(Set(0L, 1L, 2L), Set(3L, 4L), Set(5L)))
+  }
+}
@@ -0,0 +1,17 @@
+package com.lynxanalytics.biggraph.graph_operations
+
+import org.scalatest.FunSuite
+
+import com.lynxanalytics.biggraph.SphynxOnly
+import com.lynxanalytics.biggraph.graph_api._
+import com.lynxanalytics.biggraph.graph_api.Scripting._
+import com.lynxanalytics.biggraph.graph_api.GraphTestUtils._
+
+class TriangleCountTest extends FunSuite with TestGraphOp {
+  test("two triangles sharing a common edge", SphynxOnly) {
+    val g = SmallTestGraph(Map(0 -> Seq(1, 2), 1 -> Seq(2, 3), 2 -> Seq(3), 3 -> Seq(), 4 -> Seq(4)))().result
+    val op = TriangleCount()
+    val out = op(op.es, g.es).result
+    assert(get(out.triangles) == Map(0 -> 1.0, 1 -> 2.0, 2 -> 2.0, 3 -> 1.0, 4 -> 0.0))
+  }
+}
@@ -0,0 +1,51 @@
+'''
+Saving and comparing the results of the benchmark scripts.
+
+Used by sphynx/python_benchmark.py and python/remote_api/client_benchmark.py. The results are
+saved as JSON: a "metadata" object that describes the run, and a "results" list. Each result is
+a dictionary of the benchmark parameters (like the size) and the measured values (like seconds).
+'''
+import json
+import os
+import platform
+import socket
+import subprocess
+import time
+
+
+def git_commit():
+  try:
+    return subprocess.check_output(
+        ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+        stderr=subprocess.DEVNULL).decode().strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def metadata(**extra):
+  '''Describes the code and the machine the benchmark ran on.'''
+  return dict(
+      commit=git_commit(), host=socket.gethostname(), platform=platform.platform(),
+      python=platform.python_version(), cpu_count=os.cpu_count(),
+      time=time.strftime('%Y-%m-%dT%H:%M:%S%z'), **extra)
+
+
+def save(path, metadata, results, **extra):
+  with open(path, 'w') as f:
+    json.dump(dict(metadata=metadata, results=results, **extra), f, indent=2)
+
+
+def compare(baseline_path, results, keys, values):
+  '''Prints the ratio of each of the "values" in "results" to the baseline. The results are
+  matched to the baseline by their "keys". Returns the loaded baseline.'''
+  with open(baseline_path) as f:
+    baseline = json.load(f)
+  print(f'\nCompared to {baseline_path} (commit {baseline["metadata"]["commit"]}):')
+  old = {tuple(r[k] for k in keys): r for r in baseline['results']}
+  for r in results:
+    b = old.get(tuple(r[k] for k in keys))
+    if b:
+      ratios = [f'{v} {r[v] / b[v]:6.2f}x' for v in values if b.get(v) and r.get(v) is not None]
+      name = ' '.join(str(r[k]) for k in keys)
+      print(f'{name:34}', '  '.join(ratios))
+  return baseline